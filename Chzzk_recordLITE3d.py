@@ -40,6 +40,10 @@ install_missing_modules()
 import httpx
 import backoff
 
+# 'module' 디렉토리를 sys.path에 추가 (녹화 프로그램과 같은 재탐색 주기 스케줄러 사용)
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), "module"))
+from poll_scheduler import AdaptivePollScheduler
+
 # 타이틀 출력문구
 print("내맘대로 Chzzk 자동녹화 LITE3d_1225")
 
@@ -73,6 +77,10 @@ moveAfterProcessingEnabled = False  # 후처리 최종완료 후 파일이동 
 moveAfterProcessing = "D:/test"  # 후처리 최종완료 후 이동할 경로(예시:"D:/test")
 dscMinimize = False  # 후처리 명령창이 새창으로 나올 때 최소화 모드로 실행 (True=사용 / False=사용안함)
 recheckInterval = 60  # 방송 재탐색 주기(초)
+adaptivePolling = True  # 채널별 방송 시작 기록에 따라 재탐색 주기 자동 조절 (True=사용 / False=사용안함)
+hotRecheckInterval = 5  # 평소 방송 시작 시각 근처의 재탐색 주기(초)
+dormantRecheckInterval = 300  # 14일 이상 방송 기록이 없는 채널의 재탐색 주기(초)
+hotWindowMinutes = 30  # 평소 방송 시작 시각 전후로 자주 확인할 범위(분)
 filenamePattern = "[{start_time}] {channel_name} {safe_live_title} {record_quality}{frame_rate}{file_extension}"  # 파일명 생성 규칙
 autoStopInterval = 0  # 분할녹화 시간 (초), 0 으로 설정시 분할 없이 연속녹화(예시: 1시간 입력방법 : 3600 혹은 60 * 60)
 
@@ -214,6 +222,16 @@ async def get_live_metadata(channel, cookies):
 
 
 
+# 채널별 재탐색 주기 (방송 시작 기록은 json/live_history.json에 저장되어 재시작 후에도 유지)
+poll_scheduler = AdaptivePollScheduler(
+    base_interval=recheckInterval,
+    hot_interval=hotRecheckInterval,
+    dormant_interval=dormantRecheckInterval,
+    hot_window=hotWindowMinutes,
+    enabled=adaptivePolling,
+)
+
+
 # 파일명 중복 방지 함수
 def get_unique_filename(output_dir, filename, add_suffix=True):
     base, ext = os.path.splitext(filename)
@@ -289,11 +307,12 @@ async def start_recording(channel, cookies):
         metadata = await get_live_metadata(channel, cookies)
         if metadata is None:
             print(f"{channel['name']} 채널의 메타데이터를 가져오는 데 실패했습니다. 재시도합니다.")
-            await asyncio.sleep(recheckInterval)  # 방송 재탐색 주기(초)
+            await asyncio.sleep(poll_scheduler.interval_for(channel['id']))  # 방송 재탐색 주기(초)
             continue
         
         if metadata.get("status") == "OPEN":
             print(f"{channel['name']} 채널은 방송중입니다. 녹화를 시작합니다.")
+            poll_scheduler.record_start(channel['id'], metadata.get("openDate"))
             # 녹화 시작 시간 가져오기
             recording_time = datetime.now().strftime("%y%m%d_%H%M%S")
             cmd = buildCommand(channel, metadata, cookies, recording_time)
@@ -322,7 +341,7 @@ async def start_recording(channel, cookies):
                 asyncio.create_task(copy_stream(channel)) 
         else:
             print(f"{channel['name']} 채널은 방송중이 아닙니다.")
-            await asyncio.sleep(recheckInterval)  # 방송 재탐색 주기(초)
+            await asyncio.sleep(poll_scheduler.interval_for(channel['id']))  # 방송 재탐색 주기(초)
 
 
 
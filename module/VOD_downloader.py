@@ -13,13 +13,14 @@ from concurrent.futures import ThreadPoolExecutor
 # path_config 모듈 임포트 시도
 try:
     from path_config import getFFmpeg, getFFprobe  # FFmpeg 및 FFprobe 경로 가져오는 함수 임포트
+    from channel_manager import load_config
 except ImportError:
     print("[ERROR] path_config.py 파일을 찾을 수 없습니다. 프로그램을 종료합니다.")
     sys.exit(1)
 
 # 필수 모듈 설치 함수
 def installMissingModules():
-    missing_modules = ["PyQt5", "aiohttp"]
+    missing_modules = ["PyQt5", "httpx"]
     installed_modules = []
 
     # 각 모듈을 시도하여 불러오고, 실패하면 설치 리스트에 추가
@@ -46,7 +47,12 @@ def installMissingModules():
 installMissingModules()
 
 
-import aiohttp
+import httpx
+from api import get_async_client, close_async_client, load_cookies  # 연결을 재사용하는 공유 API 클라이언트, 캐시된 쿠키
+from container_probe import probe_container
+from dash_downloader import DashDownloader, RangeNotSupportedError
+from hls_recorder import close_media_client
+from vod_batch import parse_batch_input, run_batch
 from PyQt5.QtCore import QThread, pyqtSignal, Qt
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton, QLineEdit, QFileDialog, QMessageBox, QLabel, QComboBox, QCheckBox
 
@@ -74,6 +80,31 @@ class DownloadThread(QThread):
             self.error.emit(str(e))
 
 
+class BatchDownloadThread(QThread):
+    finished = pyqtSignal()
+    error = pyqtSignal(str)
+
+    def __init__(self, batchText, savePath, quality):
+        super().__init__()
+        self.batchText = batchText
+        self.savePath = savePath
+        self.quality = quality
+
+    def run(self):
+        def factory(quality, savePath, bandwidthLimiter, onProgress):
+            return VODDownloader(quality, savePath, bandwidthLimiter=bandwidthLimiter, onProgress=onProgress)
+
+        try:
+            jobs = asyncio.run(run_batch(factory, self.batchText, self.savePath, self.quality))
+            failed = [job["vod"] for job in jobs if job["state"] == "failed"]
+            if failed:
+                self.error.emit(f"일부 VOD를 받지 못했습니다: {', '.join(failed)}")
+            else:
+                self.finished.emit()
+        except Exception as e:
+            self.error.emit(str(e))
+
+
 class VODDownloaderApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -103,7 +134,7 @@ class VODDownloaderApp(QMainWindow):
         self.layout = QVBoxLayout()
         self.layout.setSpacing(10)
 
-        vodLabel = QLabel("VOD 번호: chzzk.naver.com/video/[VOD번호]")
+        vodLabel = QLabel("VOD 번호: chzzk.naver.com/video/[VOD번호]\n(일괄 다운로드: 쉼표로 구분, 채널 ID는 다시보기 전체)")
         self.vodEdit = QLineEdit()
         self.layout.addWidget(vodLabel)
         self.layout.addWidget(self.vodEdit)
@@ -279,6 +310,17 @@ class VODDownloaderApp(QMainWindow):
 
         mergeMethod = mergeMethodIndex
 
+        vodNumbers, channelIds = parse_batch_input(vodNumber)
+        if savePath and (len(vodNumbers) > 1 or channelIds):
+            # 일괄 다운로드: 전체 VOD만 받음 (구간/분할/병합 설정은 사용하지 않음)
+            if startTime or endTime:
+                QMessageBox.warning(self, "경고", "일괄 다운로드에서는 구간 설정을 사용하지 않고 전체 VOD를 받습니다.")
+            self.downloadThread = BatchDownloadThread(vodNumber, savePath, quality)
+            self.downloadThread.finished.connect(self.onDownloadFinished)
+            self.downloadThread.error.connect(self.onDownloadError)
+            self.downloadThread.start()
+            return
+
         if vodNumber and savePath:
             self.downloadThread = DownloadThread(vodNumber, savePath, quality, startTime, endTime, segmentOption, mergeMethod)
             self.downloadThread.finished.connect(self.onDownloadFinished)
@@ -302,7 +344,7 @@ class VODDownloader:
     CHZZK_VOD_URI_API = "https://apis.naver.com/neonplayer/vodplay/v2/playback/{videoId}?key={inKey}"
     CHZZK_VOD_INFO_API = "https://api.chzzk.naver.com/service/v2/videos/{videoNo}"
 
-    def __init__(self, quality, savePath):
+    def __init__(self, quality, savePath, bandwidthLimiter=None, onProgress=None):
         BASE_DIR = os.path.dirname(os.path.realpath(__file__))
         BASE_DIR = os.path.dirname(BASE_DIR)  
         self.FFMPEG_PATH = getFFmpeg()  # path_config에서 경로 가져오기
@@ -310,6 +352,15 @@ class VODDownloader:
         self.COOKIE_PATH = os.path.join(BASE_DIR, "json", "cookie.json").replace("\\", "/")
         self.savePath = savePath
         self.quality = quality 
+        config = load_config()
+        self.nativeDownload = config.get("vodNativeDownload", True)  # 전체 VOD를 내장 병렬 다운로더로 받을지 여부
+        self.downloadConcurrency = int(config.get("vodDownloadConcurrency", 8))
+        self.resumableDownload = config.get("vodResumableDownload", True)  # 실패 후 다시 받을 때 받은 구간은 건너뜀
+        self.probeCache = {}  # URL/경로 -> ffprobe 결과를 돌려주는 작업 (같은 입력은 한 번만 검사)
+        self.deepVerify = config.get("vodDeepVerify", False)  # True면 분할 파일을 항상 ffprobe로 검증
+        self.bandwidthLimiter = bandwidthLimiter  # 일괄 다운로드에서 여러 VOD가 함께 쓰는 속도 제한
+        self.onProgress = onProgress  # onProgress(받은 바이트, 전체 바이트), 내장 병렬 다운로더에서만 호출
+        self.skippedExisting = False  # skipExisting으로 이미 있는 파일을 받지 않고 넘어갔는지 여부
 
 
     def getAuthHeaders(self, cookies):
@@ -324,46 +375,64 @@ class VODDownloader:
             print(f"쿠키 파일을 찾을 수 없습니다: {self.COOKIE_PATH}")
             return None
 
-        with open(self.COOKIE_PATH, 'r') as cookie_file:
-            cookies = json.load(cookie_file)
-        return cookies
-
-
-    async def getFrameRate(self, videoUrl):
+        return load_cookies()  # 공유 쿠키 저장소 (파일이 바뀐 경우에만 다시 읽음)
+
+
+    async def probeMedia(self, target):
+        """
+        ffprobe 한 번으로 길이와 스트림 정보(코덱, 해상도, 프레임 레이트, 프레임 수)를 JSON으로 읽습니다.
+        결과는 URL/경로별로 캐시하므로 다운로드, 검증 단계에서 같은 입력을 다시 검사하지 않습니다.
+        로컬 파일은 크기나 수정 시각이 바뀌면 다시 검사합니다. 실패하면 None을 반환하며 캐시하지 않습니다.
+        """
+        key = target
+        if os.path.exists(target):
+            stat = os.stat(target)
+            key = (target, stat.st_size, stat.st_mtime_ns)
+        task = self.probeCache.get(key)
+        if task is None:
+            task = self.probeCache[key] = asyncio.ensure_future(self.runProbe(target))
+        info = await task
+        if info is None:
+            self.probeCache.pop(key, None)
+        return info
+
+    async def runProbe(self, target):
         ffprobeCmd = [
             self.FFPROBE_PATH,
             "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=r_frame_rate",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            videoUrl
+            "-show_entries", "format=duration:stream=codec_type,codec_name,width,height,r_frame_rate,nb_frames",
+            "-of", "json",
+            target
         ]
 
         try:
             result = await asyncio.to_thread(subprocess.run, ffprobeCmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-            rate = result.stdout.decode('utf-8').strip()
-            num, den = map(int, rate.split('/'))
+            return json.loads(result.stdout.decode('utf-8'))
+        except (subprocess.CalledProcessError, ValueError) as e:
+            print(f"ffprobe 실행 중 오류 발생 ({target}): {e}")
+            return None
+
+    def findStream(self, info, codecType):
+        """probeMedia 결과에서 codecType(video/audio)의 첫 스트림을 찾습니다."""
+        for stream in (info or {}).get("streams", []):
+            if stream.get("codec_type") == codecType:
+                return stream
+        return None
+
+    async def getFrameRate(self, videoUrl):
+        stream = self.findStream(await self.probeMedia(videoUrl), "video")
+        try:
+            num, den = map(int, stream["r_frame_rate"].split('/'))
             return num / den
-        except subprocess.CalledProcessError as e:
+        except (TypeError, KeyError, ValueError, ZeroDivisionError) as e:
             print(f"프레임 레이트 가져오기 중 오류 발생: {e}")
             return 30  # 오류 발생 시 기본값으로 30을 반환
 
     async def getResolution(self, videoFile):
-        ffprobeCmd = [
-            self.FFPROBE_PATH,
-            "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=width,height",
-            "-of", "csv=p=0",
-            videoFile
-        ]
-
+        stream = self.findStream(await self.probeMedia(videoFile), "video")
         try:
-            result = await asyncio.to_thread(subprocess.run, ffprobeCmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-            resolution = result.stdout.decode('utf-8').strip()
-            width, height = map(int, resolution.split(','))
-            return width, height
-        except subprocess.CalledProcessError as e:
+            return int(stream["width"]), int(stream["height"])
+        except (TypeError, KeyError, ValueError) as e:
             print(f"해상도 가져오기 중 오류 발생: {e}")
             return None, None
 
@@ -373,53 +442,48 @@ class VODDownloader:
         return sanitized[:maxLength]
 
     async def verifySegment(self, segmentFilename):
-        try:
-            ffprobeCmd = [
-                self.FFPROBE_PATH,
-                "-v", "error",
-                "-show_entries", "format=duration",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                segmentFilename
-            ]
-            result = await asyncio.to_thread(subprocess.run, ffprobeCmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-            duration = float(result.stdout.strip())
-            if duration <= 0:
-                print(f"세그먼트 파일 길이가 비정상적입니다: {segmentFilename}")
-                return False
-            
-            ffprobeCmd = [
-                self.FFPROBE_PATH,
-                "-v", "error",
-                "-select_streams", "v:0",
-                "-show_entries", "stream=nb_frames",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                segmentFilename
-            ]
-            result = await asyncio.to_thread(subprocess.run, ffprobeCmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-            nb_frames = int(result.stdout.strip())
-            if nb_frames <= 0:
-                print(f"세그먼트 파일 프레임 수가 비정상적입니다: {segmentFilename}")
-                return False
-
-            ffprobeCmd = [
-                self.FFPROBE_PATH,
-                "-v", "error",
-                "-select_streams", "a:0",
-                "-show_entries", "stream=codec_name",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                segmentFilename
-            ]
-            result = await asyncio.to_thread(subprocess.run, ffprobeCmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-            if not result.stdout.strip():
-                print(f"세그먼트 파일 오디오 스트림이 비정상적입니다: {segmentFilename}")
-                return False
-
-            return True
+        """
+        분할 다운로드 파일의 길이, 영상 프레임 수, 음성 스트림을 확인합니다.
+        기본은 MP4/TS 헤더만 읽는 내장 검사이며, 헤더로 판단할 수 없거나 vodDeepVerify가 켜져 있으면 ffprobe로 검사합니다.
+        """
+        if not self.deepVerify:
+            info = await asyncio.to_thread(probe_container, segmentFilename)
+            if info is not None:
+                return self.checkSegmentInfo(
+                    segmentFilename, info["duration"], info["video_frames"], info["audio_codec"]
+                )
+        return await self.verifySegmentWithProbe(segmentFilename)
+
+    def checkSegmentInfo(self, segmentFilename, duration, nb_frames, audioCodec):
+        if duration <= 0:
+            print(f"세그먼트 파일 길이가 비정상적입니다: {segmentFilename}")
+            return False
+        if nb_frames <= 0:
+            print(f"세그먼트 파일 프레임 수가 비정상적입니다: {segmentFilename}")
+            return False
+        if not audioCodec:
+            print(f"세그먼트 파일 오디오 스트림이 비정상적입니다: {segmentFilename}")
+            return False
+        return True
 
-        except subprocess.CalledProcessError as e:
-            print(f"세그먼트 검증 중 오류 발생: {e}")
+    async def verifySegmentWithProbe(self, segmentFilename):
+        info = await self.probeMedia(segmentFilename)
+        if info is None:
+            print(f"세그먼트 검증 중 오류 발생: {segmentFilename}")
             return False
 
+        try:
+            duration = float(info.get("format", {}).get("duration", 0))
+        except ValueError:
+            duration = 0
+        videoStream = self.findStream(info, "video") or {}
+        try:
+            nb_frames = int(videoStream.get("nb_frames", 0))
+        except ValueError:  # "N/A"
+            nb_frames = 0
+        audioStream = self.findStream(info, "audio") or {}
+        return self.checkSegmentInfo(segmentFilename, duration, nb_frames, audioStream.get("codec_name"))
+
     async def downloadSegment(self, videoUrl, savePath, segmentStart, segmentEnd, segmentIndex):
         if not os.path.exists(savePath):
             os.makedirs(savePath.replace("\\", "/"))
@@ -572,146 +636,201 @@ class VODDownloader:
 
 
 
-    async def authenticateAndDownload(self, vodNumber, savePath, quality="best", startTime=None, endTime=None, segmentOption=1, mergeMethod=0):
-        sessionCookies = self.getSessionCookies()
+    async def authenticateAndDownload(self, vodNumber, savePath, quality="best", startTime=None, endTime=None, segmentOption=1, mergeMethod=0, closeClients=True, skipExisting=False):
+        """
+        VOD를 내려받고 저장한 파일 경로를 반환합니다 (실패하면 None).
+        closeClients: 끝난 뒤 공유 연결을 닫을지 여부 (일괄 다운로드처럼 같은 이벤트 루프에서 여러 VOD를 받으면 False)
+        skipExisting: 전체 VOD의 최종 파일이 저장 경로에 이미 있으면 받지 않고 그 경로를 반환 (일괄 다운로드)
+        """
+        downloadedPath = None
+        try:
+            sessionCookies = self.getSessionCookies()
 
-        if sessionCookies:
-            retries = 0
-            while retries < self.MAX_RETRIES:
-                try:
-                    headers = self.getAuthHeaders(sessionCookies)
-                    async with aiohttp.ClientSession() as session:
+            if sessionCookies:
+                retries = 0
+                while retries < self.MAX_RETRIES:
+                    try:
+                        headers = self.getAuthHeaders(sessionCookies)
                         apiUrl = self.CHZZK_VOD_INFO_API.format(videoNo=vodNumber)
-                        async with session.get(apiUrl, headers=headers) as response:
-                            vodInfo = await response.json()
-
-                    vodInfoContent = vodInfo.get('content', {})
-                    if not vodInfoContent or 'videoId' not in vodInfoContent:
-                        print("VOD 정보를 가져오는데 실패했습니다.")
-                        return
-
-                    vodId = vodInfoContent['videoId']
-                    vodInKey = vodInfoContent['inKey']
-                    videoTitle = vodInfo['content'].get('videoTitle', 'unknown_title')
-                    channelName = vodInfo['content']['channel'].get('channelName', 'unknown_channel')
-                    broadcastDate = vodInfo.get('content', {}).get('liveOpenDate', 'unknown_date').split()[0]
+                        response = await get_async_client().get(apiUrl, endpoint="vod_info", headers=headers)
+                        vodInfo = response.json()
 
-                    streamLink, videoRepresentationId, resolution = await self.getDashStreamLink(vodId, vodInKey, quality)
-                    if not streamLink:
-                        print("스트림링크에서 DASHstream를 가져오는데 실패했습니다.")
-                        return
+                        vodInfoContent = vodInfo.get('content', {})
+                        if not vodInfoContent or 'videoId' not in vodInfoContent:
+                            print("VOD 정보를 가져오는데 실패했습니다.")
+                            return
 
-                    frameRate = await self.getFrameRate(streamLink)
-                    quality = f"{resolution}p" if quality == "best" else quality
+                        vodId = vodInfoContent['videoId']
+                        vodInKey = vodInfoContent['inKey']
+                        videoTitle = vodInfo['content'].get('videoTitle', 'unknown_title')
+                        channelName = vodInfo['content']['channel'].get('channelName', 'unknown_channel')
+                        broadcastDate = vodInfo.get('content', {}).get('liveOpenDate', 'unknown_date').split()[0]
 
-                    print(f"highest_quality: {quality}, frame_rate: {frameRate}")
+                        streamLink, videoRepresentationId, resolution = await self.getDashStreamLink(vodId, vodInKey, quality)
+                        if not streamLink:
+                            print("스트림링크에서 DASHstream를 가져오는데 실패했습니다.")
+                            return
 
-                    randomFilename = self.generateRandomFilename()
-                    temp_savePath = os.path.join(savePath, randomFilename).replace("\\", "/")
+                        frameRate = await self.getFrameRate(streamLink)
+                        quality = f"{resolution}p" if quality == "best" else quality
 
-                    if segmentOption == 1:
-                        segmentStart = self.timeToSeconds(startTime) if startTime else 0
-                        segmentEnd = self.timeToSeconds(endTime) if endTime else await self.getVideoDuration(streamLink)
+                        print(f"highest_quality: {quality}, frame_rate: {frameRate}")
 
-                        segmentFilename = await self.downloadSegment(streamLink, temp_savePath, segmentStart, segmentEnd, 0)
-                        if segmentFilename:
-                            if startTime and endTime:
-                                finalFilename = f"[{broadcastDate}] {self.sanitizeFilename(channelName)} {self.sanitizeFilename(videoTitle)} {quality}{frameRate:.0f}_{startTime.replace(':', '')}_{endTime.replace(':', '')}.mp4"
-                            else:
-                                finalFilename = f"[{broadcastDate}] {self.sanitizeFilename(channelName)} {self.sanitizeFilename(videoTitle)} {quality}{frameRate:.0f}.mp4"
+                        if skipExisting and not (startTime or endTime):
+                            # 최종 파일은 다운로드가 끝난 뒤에만 만들어지므로 있으면 완료된 VOD
+                            finalFilename = f"[{broadcastDate}] {self.sanitizeFilename(channelName)} {self.sanitizeFilename(videoTitle)} {quality}{frameRate:.0f}.mp4"
                             finalSavePath = os.path.join(savePath, finalFilename).replace("\\", "/")
-                            os.rename(segmentFilename, finalSavePath)
-                    else:
-                        duration = await self.getVideoDuration(streamLink)
-                        segments = self.calculateSegments(duration, startTime, endTime, segmentOption)
-                        downloadedSegments = []
+                            if os.path.exists(finalSavePath):
+                                print(f"이미 받은 VOD입니다: {finalSavePath}")
+                                self.skippedExisting = True
+                                downloadedPath = finalSavePath
+                                break
 
-                        tasks = []
-                        for index, (segmentStart, segmentEnd) in enumerate(segments):
-                            tasks.append(self.downloadSegment(streamLink, temp_savePath, segmentStart, segmentEnd, index))
+                        randomFilename = self.generateRandomFilename()
+                        temp_savePath = os.path.join(savePath, randomFilename).replace("\\", "/")
 
-                        await asyncio.gather(*tasks)
-
-                        if startTime and endTime:
-                            finalFilename = f"[{broadcastDate}] {self.sanitizeFilename(channelName)} {self.sanitizeFilename(videoTitle)} {quality}{frameRate:.0f}_{startTime.replace(':', '')}_{endTime.replace(':', '')}.mp4"
-                        else:
+                        if not (startTime or endTime) and self.nativeDownload:
+                            # 전체 VOD: 바이트 구간을 동시에 받아 최종 파일에 바로 기록 (병합 불필요)
                             finalFilename = f"[{broadcastDate}] {self.sanitizeFilename(channelName)} {self.sanitizeFilename(videoTitle)} {quality}{frameRate:.0f}.mp4"
-                        finalSavePath = os.path.join(savePath, finalFilename)
-                        await self.mergeSegments([f"{temp_savePath}/part{index}.mp4" for index in range(len(segments))], finalSavePath, mergeMethod, self.quality)
+                            finalSavePath = os.path.join(savePath, finalFilename).replace("\\", "/")
+                            if await self.downloadNative(streamLink, finalSavePath, f"{vodNumber}:{quality}", vodNumber):
+                                downloadedPath = finalSavePath
+                                print("VOD 다운로드가 완료되었습니다.")
+                                break
+
+                        if self.bandwidthLimiter is not None:
+                            # 속도 제한은 내장 병렬 다운로더에만 적용됨 (ffmpeg 다운로드 속도는 제한할 수 없음)
+                            print("일괄 다운로드 속도 제한은 내장 병렬 다운로드에만 적용되므로 ffmpeg로 받지 않습니다.")
+                            break
+
+                        if segmentOption == 1:
+                            segmentStart = self.timeToSeconds(startTime) if startTime else 0
+                            segmentEnd = self.timeToSeconds(endTime) if endTime else await self.getVideoDuration(streamLink)
+
+                            segmentFilename = await self.downloadSegment(streamLink, temp_savePath, segmentStart, segmentEnd, 0)
+                            if segmentFilename:
+                                if startTime and endTime:
+                                    finalFilename = f"[{broadcastDate}] {self.sanitizeFilename(channelName)} {self.sanitizeFilename(videoTitle)} {quality}{frameRate:.0f}_{startTime.replace(':', '')}_{endTime.replace(':', '')}.mp4"
+                                else:
+                                    finalFilename = f"[{broadcastDate}] {self.sanitizeFilename(channelName)} {self.sanitizeFilename(videoTitle)} {quality}{frameRate:.0f}.mp4"
+                                finalSavePath = os.path.join(savePath, finalFilename).replace("\\", "/")
+                                os.rename(segmentFilename, finalSavePath)
+                                downloadedPath = finalSavePath
+                        else:
+                            duration = await self.getVideoDuration(streamLink)
+                            segments = self.calculateSegments(duration, startTime, endTime, segmentOption)
+                            downloadedSegments = []
 
-                    print("VOD 다운로드가 완료되었습니다.")
-                    break
+                            tasks = []
+                            for index, (segmentStart, segmentEnd) in enumerate(segments):
+                                tasks.append(self.downloadSegment(streamLink, temp_savePath, segmentStart, segmentEnd, index))
 
-                except Exception as e:
-                    print(f"에러 발생: {e}")
+                            await asyncio.gather(*tasks)
 
-                    retries += 1
-                    print(f"재시도 중 ({retries}/{self.MAX_RETRIES})...")
-                    await asyncio.sleep(self.RETRY_INTERVAL)
+                            if startTime and endTime:
+                                finalFilename = f"[{broadcastDate}] {self.sanitizeFilename(channelName)} {self.sanitizeFilename(videoTitle)} {quality}{frameRate:.0f}_{startTime.replace(':', '')}_{endTime.replace(':', '')}.mp4"
+                            else:
+                                finalFilename = f"[{broadcastDate}] {self.sanitizeFilename(channelName)} {self.sanitizeFilename(videoTitle)} {quality}{frameRate:.0f}.mp4"
+                            finalSavePath = os.path.join(savePath, finalFilename)
+                            await self.mergeSegments([f"{temp_savePath}/part{index}.mp4" for index in range(len(segments))], finalSavePath, mergeMethod, self.quality)
+                            if os.path.exists(finalSavePath):
+                                downloadedPath = finalSavePath
 
-                    if retries >= self.MAX_RETRIES:
-                        print("재시도 횟수 초과. 다운로드를 중단합니다.")
+                        print("VOD 다운로드가 완료되었습니다.")
                         break
-        else:
-            print("세션 쿠키를 가져오는데 실패했습니다.")
 
+                    except Exception as e:
+                        print(f"에러 발생: {e}")
+
+                        retries += 1
+                        print(f"재시도 중 ({retries}/{self.MAX_RETRIES})...")
+                        await asyncio.sleep(self.RETRY_INTERVAL)
 
+                        if retries >= self.MAX_RETRIES:
+                            print("재시도 횟수 초과. 다운로드를 중단합니다.")
+                            break
+            else:
+                print("세션 쿠키를 가져오는데 실패했습니다.")
+        finally:
+            if closeClients:
+                await close_async_client()  # DownloadThread의 이벤트 루프가 끝나기 전에 연결 정리 (중간에 반환해도)
+                await close_media_client()
+        return downloadedPath
+
+
+
+    async def downloadNative(self, videoUrl, outputFilename, resumeKey, label=None):
+        """
+        내장 병렬 다운로더로 VOD 전체를 받습니다. 서버가 Range 요청을 지원하지 않으면 False (속도 제한이 없으면 ffmpeg로 다시 받음).
+        구간 다운로드 실패는 예외로 올려 재시도 루프가 처리하며, 이어받기가 켜져 있으면 받은 구간은 다시 받지 않습니다.
+        """
+        downloader = DashDownloader(
+            videoUrl,
+            outputFilename,
+            concurrency=self.downloadConcurrency,
+            resume_key=resumeKey if self.resumableDownload else None,
+            bandwidth=self.bandwidthLimiter,
+            on_progress=self.onProgress,
+            label=label,
+        )
+        try:
+            await downloader.download()
+            return True
+        except RangeNotSupportedError as e:
+            print(f"병렬 다운로드 실패: {e}")
+            downloader.discard()
+            return False
+        except Exception:
+            if not self.resumableDownload:
+                downloader.discard()
+            raise
 
     async def getDashStreamLink(self, videoId, inKey, preferredQuality):
         videoUrl = self.CHZZK_VOD_URI_API.format(videoId=videoId, inKey=inKey)
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(videoUrl, headers={"Accept": "application/dash+xml"}) as response:
-                    text = await response.text()
-                    root = ET.fromstring(text)
-                    ns = {"mpd": "urn:mpeg:dash:schema:mpd:2011"}
-
-                    self.representationElements = root.findall(".//mpd:Representation", namespaces=ns)
-                    
-                    bestRepresentation = None
-                    highestHeight = 0
-                    for rep in self.representationElements:
-                        height = rep.get("height")
-                        if height:
-                            if preferredQuality == "best":
-                                if int(height) > highestHeight:
-                                    highestHeight = int(height)
-                                    bestRepresentation = rep
-                            else:
-                                if int(height) == int(preferredQuality.replace('p', '')):
-                                    bestRepresentation = rep
-                                    break
+        try:
+            response = await get_async_client().get(videoUrl, endpoint="vod_playback", headers={"Accept": "application/dash+xml"})
+            text = response.text
+            root = ET.fromstring(text)
+            ns = {"mpd": "urn:mpeg:dash:schema:mpd:2011"}
+
+            self.representationElements = root.findall(".//mpd:Representation", namespaces=ns)
+            
+            bestRepresentation = None
+            highestHeight = 0
+            for rep in self.representationElements:
+                height = rep.get("height")
+                if height:
+                    if preferredQuality == "best":
+                        if int(height) > highestHeight:
+                            highestHeight = int(height)
+                            bestRepresentation = rep
+                    else:
+                        if int(height) == int(preferredQuality.replace('p', '')):
+                            bestRepresentation = rep
+                            break
 
-                    if bestRepresentation is None:
-                        print(f"{preferredQuality}에 맞는 Representation을 찾을 수 없습니다.")
-                        return None, None
+            if bestRepresentation is None:
+                print(f"{preferredQuality}에 맞는 Representation을 찾을 수 없습니다.")
+                return None, None, None
 
-                    representationId = bestRepresentation.get("id")
-                    baseUrl = bestRepresentation.find("mpd:BaseURL", namespaces=ns).text
+            representationId = bestRepresentation.get("id")
+            baseUrl = bestRepresentation.find("mpd:BaseURL", namespaces=ns).text
 
-                    # base URL, representation ID 및 높이(해상도) 반환
-                    return baseUrl, representationId, highestHeight if preferredQuality == "best" else int(preferredQuality.replace('p', ''))
+            # base URL, representation ID 및 높이(해상도) 반환
+            return baseUrl, representationId, highestHeight if preferredQuality == "best" else int(preferredQuality.replace('p', ''))
 
-            except aiohttp.ClientError as e:
-                print("DASHstream XML 로드에 실패했습니다:", str(e))
-                return None, None, None
-            except ET.ParseError as e:
-                print("DASHstream XML 파싱에 실패했습니다:", str(e))
-                return None, None, None
+        except httpx.HTTPError as e:
+            print("DASHstream XML 로드에 실패했습니다:", str(e))
+            return None, None, None
+        except ET.ParseError as e:
+            print("DASHstream XML 파싱에 실패했습니다:", str(e))
+            return None, None, None
 
     async def getVideoDuration(self, videoUrl):
-        ffprobeCmd = [
-            self.FFPROBE_PATH,
-            "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            videoUrl
-        ]
-
+        info = await self.probeMedia(videoUrl)
         try:
-            result = await asyncio.to_thread(subprocess.run, ffprobeCmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-            return float(result.stdout.strip())
-        except subprocess.CalledProcessError as e:
+            return float(info["format"]["duration"])
+        except (TypeError, KeyError, ValueError) as e:
             print(f"비디오 길이 가져오기 중 오류 발생: {e}")
             return 0
 
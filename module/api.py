@@ -1,26 +1,234 @@
-import requests
+import httpx
 import json
 import os
+import threading
+import time
+import asyncio
+import weakref
 from typing import Optional, Dict, Tuple
 from path_config import base_directory, COOKIE_PATH  # COOKIE_PATH 임포트
+from rate_limiter import get_rate_limiter, PRIORITY_NORMAL, PRIORITY_LOW
+
+# h2 패키지가 설치되어 있으면 HTTP/2 사용
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+
+# 엔드포인트별 타임아웃
+DEFAULT_TIMEOUT = httpx.Timeout(10.0)
+ENDPOINT_TIMEOUTS = {
+    "user_status": httpx.Timeout(10.0),
+    "chat_channel": httpx.Timeout(10.0),
+    "access_token": httpx.Timeout(10.0),
+    "channel": httpx.Timeout(10.0),
+    "live_detail": httpx.Timeout(30.0, read=60.0),  # 연결 30초, 읽기 60초
+    "vod_info": httpx.Timeout(15.0),
+    "vod_playback": httpx.Timeout(30.0),
+    "vod_list": httpx.Timeout(15.0),
+}
+
+# 엔드포인트별 기본 요청 우선순위 (호출할 때 priority로 바꿀 수 있음)
+ENDPOINT_PRIORITIES = {
+    "user_status": PRIORITY_NORMAL,
+    "chat_channel": PRIORITY_NORMAL,
+    "access_token": PRIORITY_NORMAL,
+    "channel": PRIORITY_LOW,
+    "live_detail": PRIORITY_NORMAL,
+    "vod_info": PRIORITY_LOW,
+    "vod_playback": PRIORITY_LOW,
+    "vod_list": PRIORITY_LOW,
+}
+
+_POOL_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=20, keepalive_expiry=60.0)
+
+
+def _request_priority(endpoint: Optional[str], priority: Optional[int]) -> int:
+    if priority is not None:
+        return priority
+    return ENDPOINT_PRIORITIES.get(endpoint, PRIORITY_NORMAL)
+
+
+class ChzzkApiClient:
+    """
+    연결을 재사용하는 동기 API 클라이언트입니다 (keep-alive, 가능하면 HTTP/2).
+    요청은 호스트별 공용 리미터(rate_limiter)를 거쳐 나갑니다.
+    채팅 클라이언트처럼 스레드/동기 코드에서 사용합니다.
+    """
+
+    def __init__(self, limits: httpx.Limits = _POOL_LIMITS):
+        self.client = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            limits=limits,
+            timeout=DEFAULT_TIMEOUT,
+            headers={"User-Agent": USER_AGENT},
+        )
+
+    @property
+    def is_closed(self) -> bool:
+        return self.client.is_closed
+
+    def get(self, url: str, endpoint: Optional[str] = None, priority: Optional[int] = None, **kwargs) -> httpx.Response:
+        kwargs.setdefault("timeout", ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT))
+        host = httpx.URL(url).host
+        limiter = get_rate_limiter()
+        limiter.acquire(host, _request_priority(endpoint, priority))
+        response = self.client.get(url, **kwargs)
+        limiter.observe(host, response)
+        return response
+
+    def close(self):
+        self.client.close()
+
+
+class AsyncChzzkApiClient:
+    """
+    연결을 재사용하는 비동기 API 클라이언트입니다 (keep-alive, 가능하면 HTTP/2).
+    이벤트 루프마다 하나씩 만들어 녹화기, 폴러, VOD 다운로더가 함께 사용합니다.
+    요청은 호스트별 공용 리미터(rate_limiter)를 거쳐 나갑니다.
+    """
+
+    def __init__(self, limits: httpx.Limits = _POOL_LIMITS):
+        self.client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=limits,
+            timeout=DEFAULT_TIMEOUT,
+            headers={"User-Agent": USER_AGENT},
+        )
+
+    @property
+    def is_closed(self) -> bool:
+        return self.client.is_closed
+
+    async def get(self, url: str, endpoint: Optional[str] = None, priority: Optional[int] = None, **kwargs) -> httpx.Response:
+        kwargs.setdefault("timeout", ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT))
+        host = httpx.URL(url).host
+        limiter = get_rate_limiter()
+        await limiter.acquire_async(host, _request_priority(endpoint, priority))
+        response = await self.client.get(url, **kwargs)
+        limiter.observe(host, response)
+        return response
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_client_lock = threading.Lock()
+_sync_client: Optional[ChzzkApiClient] = None
+_async_clients = weakref.WeakKeyDictionary()  # 이벤트 루프 -> AsyncChzzkApiClient
+
+
+def get_client() -> ChzzkApiClient:
+    """프로세스 전체에서 공유하는 동기 클라이언트를 반환합니다."""
+    global _sync_client
+    with _client_lock:
+        if _sync_client is None or _sync_client.is_closed:
+            _sync_client = ChzzkApiClient()
+        return _sync_client
+
+
+def get_async_client() -> AsyncChzzkApiClient:
+    """현재 실행 중인 이벤트 루프에서 공유하는 비동기 클라이언트를 반환합니다."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = AsyncChzzkApiClient()
+        _async_clients[loop] = client
+    return client
+
+
+async def close_async_client():
+    """현재 이벤트 루프의 공유 비동기 클라이언트를 닫습니다 (루프 종료 전에 호출)."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+class CookieStore:
+    """
+    cookie.json을 한 번만 읽어 파싱된 쿠키와 요청 헤더를 메모리에 보관하는 프로세스 공용 저장소입니다.
+    파일의 수정 시각(mtime)이 바뀌었거나 invalidate()가 호출된 경우에만 다시 읽으며,
+    mtime 확인도 check_interval초에 한 번만 합니다.
+    """
+
+    def __init__(self, path: str = COOKIE_PATH, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._cookies: Optional[Dict[str, str]] = None
+        self._headers: Optional[Dict[str, str]] = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._stale = True  # True면 다음 조회 때 mtime과 관계없이 다시 읽음
+
+    def get(self) -> Optional[Dict[str, str]]:
+        """쿠키 딕셔너리를 반환합니다. 파일이 없거나 읽을 수 없으면 None을 반환합니다."""
+        with self._lock:
+            self._refresh_if_needed()
+            return self._cookies
+
+    def headers(self) -> Optional[Dict[str, str]]:
+        """쿠키가 포함된 요청 헤더의 복사본을 반환합니다 (호출한 쪽에서 수정해도 안전)."""
+        with self._lock:
+            self._refresh_if_needed()
+            return dict(self._headers) if self._headers is not None else None
+
+    def invalidate(self):
+        """쿠키 만료가 의심될 때(401/400 응답 등) 호출하면 다음 조회 때 파일을 다시 읽습니다."""
+        with self._lock:
+            self._stale = True
+
+    def _refresh_if_needed(self):
+        now = time.monotonic()
+        if not self._stale and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if not self._stale and mtime == self._mtime:
+            return
+
+        self._stale = False
+        self._mtime = mtime
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._cookies = json.load(f)
+            self._headers = get_headers(self._cookies)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"Error reading cookies: {e}")
+            self._cookies = None
+            self._headers = None
+
+
+cookie_store = CookieStore()
+
 
 def load_cookies() -> Optional[Dict[str, str]]:
     """
-    cookie.json 파일에서 쿠키를 읽어옵니다.
+    cookie.json의 쿠키를 반환합니다 (메모리에 캐시된 값, 파일이 바뀌면 다시 읽음).
     파일이 없거나 읽을 수 없으면 None을 반환합니다.
     """
-    try:
-        with open(COOKIE_PATH, "r", encoding="utf-8") as f:  # COOKIE_PATH 사용
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"Error reading cookies: {e}")
-        return None
+    return cookie_store.get()
+
+
+def get_cached_headers() -> Optional[Dict[str, str]]:
+    """
+    캐시된 쿠키로 미리 만들어 둔 요청 헤더의 복사본을 반환합니다.
+    쿠키를 읽을 수 없으면 None을 반환합니다.
+    """
+    return cookie_store.headers()
 
 def get_headers(cookies: Dict[str, str]) -> Dict[str, str]: # cookies를 필수로 받음
     """
     User-Agent와 Cookie를 포함한 헤더를 반환합니다.
     """
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+    headers = {"User-Agent": USER_AGENT}
     headers["Cookie"] = f'NID_AUT={cookies.get("NID_AUT", "")}; NID_SES={cookies.get("NID_SES", "")}' # cookies가 None이면 KeyError 발생
     return headers
 
@@ -28,14 +236,15 @@ def get_headers(cookies: Dict[str, str]) -> Dict[str, str]: # cookies를 필수
 def fetch_userIdHash(cookies: Dict[str, str]) -> Optional[str]: # cookies를 필수로 받음
     try:
         headers = get_headers(cookies) # cookies가 None이면 KeyError 발생
-        response = requests.get(
+        response = get_client().get(
             "https://comm-api.game.naver.com/nng_main/v1/user/getUserStatus",
+            endpoint="user_status",
             headers=headers,
         )
         response.raise_for_status()
         data = response.json()
         return data["content"]["userIdHash"]
-    except (requests.exceptions.RequestException, json.JSONDecodeError, KeyError) as e:
+    except (httpx.HTTPError, json.JSONDecodeError, KeyError) as e:
         print(f"Error fetching userIdHash: {e}")
         return None
 
@@ -44,12 +253,12 @@ def fetch_chatChannelId(streamer: str, cookies: Dict[str, str]) -> Optional[str]
     try:
         headers = get_headers(cookies) # cookies가 None이면 KeyError 발생
         url = f"https://api.chzzk.naver.com/service/v1/channels/{streamer}/live-detail"
-        response = requests.get(url, headers=headers)
+        response = get_client().get(url, endpoint="chat_channel", headers=headers)
         response.raise_for_status()
         data = response.json()
         return data["content"]["chatChannelId"]
 
-    except (requests.exceptions.RequestException, json.JSONDecodeError, KeyError) as e:
+    except (httpx.HTTPError, json.JSONDecodeError, KeyError) as e:
         print(f"Error fetching chatChannelId: {e}")
         return None
 
@@ -63,12 +272,12 @@ def fetch_accessToken(
             f"https://comm-api.game.naver.com/nng_main/v1/chats/access-token?"
             f"channelId={chatChannelId}&chatType=STREAMING"
         )
-        response = requests.get(url, headers=headers)
+        response = get_client().get(url, endpoint="access_token", headers=headers)
         response.raise_for_status()
         data = response.json()
         return data["content"]["accessToken"], data["content"]["extraToken"]
 
-    except (requests.exceptions.RequestException, json.JSONDecodeError, KeyError) as e:
+    except (httpx.HTTPError, json.JSONDecodeError, KeyError) as e:
         print(f"Error fetching accessToken: {e}")
         return None, None
 
@@ -77,7 +286,7 @@ def fetch_channelName(streamer: str, cookies: Optional[Dict[str, str]] = None) -
     try:
         headers = get_headers(cookies)
         url = f"https://api.chzzk.naver.com/service/v1/channels/{streamer}"
-        response = requests.get(url, headers=headers)
+        response = get_client().get(url, endpoint="channel", headers=headers)
         response.raise_for_status()
         data = response.json()
 
@@ -95,6 +304,6 @@ def fetch_channelName(streamer: str, cookies: Optional[Dict[str, str]] = None) -
             print("Error fetching channelName: 'content' key not found in response")
             return None  # 필요한 키가 없으면 None 반환
 
-    except (requests.exceptions.RequestException, json.JSONDecodeError, KeyError) as e:
+    except (httpx.HTTPError, json.JSONDecodeError, KeyError) as e:
         print(f"Error fetching channelName: {e}")
         return None
\ No newline at end of file
@@ -24,10 +24,35 @@ def load_config():
     default_config = {  # 기본 설정 값
         "auto_record_mode": False,
         "chat_auto_start": False,
+        "chatMode": "process",  # "process": 채널마다 run.py 프로세스, "engine": 한 프로세스에서 모든 채널 수집, "off": 수집 안 함
+        "chatEngineEcho": False,  # 엔진 모드에서 채팅을 콘솔에도 출력
+        "chatFlushBytes": 65536,  # 채팅 로그 버퍼를 파일에 쓰는 크기 (바이트)
+        "chatFlushInterval": 1.0,  # 채팅 로그 버퍼를 파일에 쓰는 간격 (초)
+        "chatCaptureFormat": "none",  # "ndjson"이면 텍스트 로그와 함께 구조화 캡처(.ndjson)도 저장
         "recheckInterval": 60,
+        "adaptivePolling": True,  # 채널별 방송 시작 기록에 따라 재확인 주기 자동 조절
+        "hotRecheckInterval": 5,  # 평소 방송 시작 시각 근처의 재확인 주기 (초)
+        "dormantRecheckInterval": 300,  # 오랫동안 방송하지 않은 채널의 재확인 주기 (초)
+        "hotWindowMinutes": 30,  # 평소 방송 시작 시각 전후로 자주 확인할 범위 (분)
+        "apiRateLimit": 5.0,  # 호스트별 초당 API 요청 수
+        "apiRateBurst": 10,  # 호스트별 최대 순간 API 요청 수
+        "apiHostRateLimits": {},  # 호스트별 예산 지정 (예: {"api.chzzk.naver.com": {"rate": 10, "burst": 20}})
+        "pollJitter": 0.1,  # 재확인 시각을 주기의 ±10% 범위에서 무작위로 흔들어 요청이 몰리지 않게 함
+        "recorderBackend": "streamlink",  # "native"면 streamlink 프로세스 없이 내장 HLS 녹화기 사용 (실패 시 streamlink)
+        "hlsPrefetchSegments": 3,  # 내장 녹화기가 동시에 내려받을 최대 세그먼트 수
+        "vodNativeDownload": True,  # 전체 VOD는 ffmpeg 대신 내장 병렬 다운로더로 받음 (구간 영상은 항상 ffmpeg)
+        "vodDownloadConcurrency": 8,  # 내장 VOD 다운로더가 동시에 받을 최대 구간 수
+        "vodResumableDownload": True,  # 내장 VOD 다운로더가 받은 구간을 기록해 두고 다시 실행하면 나머지만 받음
+        "vodDeepVerify": False,  # 분할 다운로드 파일을 헤더 검사 대신 ffprobe로 검증
+        "vodBatchConcurrency": 2,  # 일괄 다운로드에서 동시에 받을 VOD 수
+        "vodBatchBandwidthLimit": 0,  # 일괄 다운로드 전체의 최대 속도 (MB/s, 0이면 제한 없음, 내장 병렬 다운로드에만 적용)
         "autoStopInterval": 0,
         "showMessageBox": True,
         "autoPostProcessing": False,
+        "pipelinedPostProcessing": False,  # 자동 후처리를 녹화가 끝난 뒤가 아니라 녹화 중에 진행
+        "postProcessingWorkers": 0,  # 동시에 실행할 최대 후처리 작업 수 (0이면 코어 수에 맞춤)
+        "postProcessingRemuxLimit": 0,  # 그중 스트림 복사 작업 수 (0이면 2개)
+        "postProcessingEncodeLimit": 0,  # 그중 인코딩 작업 수 (0이면 코어 4개당 1개)
         "filenamePattern": "[{recording_time}] {channel_name} {safe_live_title}{file_extension}",
         "deleteAfterPostProcessing": False,
         "postProcessingOutputDir": "",
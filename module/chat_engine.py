@@ -0,0 +1,286 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import websockets
+
+import api
+from chat_log_sink import BufferedLogSink, DEFAULT_FLUSH_BYTES, DEFAULT_FLUSH_INTERVAL
+from cmd_type import CHZZK_CHAT_CMD
+from run import (
+    CHANNEL_ID_REFRESH_INTERVAL,
+    CHAT_QUEUE_SIZE,
+    CHAT_SERVER_URL,
+    PONG_MESSAGE,
+    ChatPipelineMetrics,
+    build_chat_record,
+    build_connect_message,
+    build_recent_chat_message,
+    capture_path_for,
+    encode_chat_record,
+    format_chat_message,
+)
+
+
+class ChatSession:
+    """
+    채널 하나의 채팅 웹소켓 세션입니다. ChatEngine의 이벤트 루프에서 코루틴으로 실행되며,
+    연결이 끊기면 retry_interval초 후 다시 연결합니다.
+    """
+
+    def __init__(self, streamer, log_path, time_shift=0, retry_interval=30, echo=False,
+                 queue_size=CHAT_QUEUE_SIZE, flush_bytes=DEFAULT_FLUSH_BYTES,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, capture=False,
+                 channel_refresh_interval=CHANNEL_ID_REFRESH_INTERVAL):
+        self.streamer = streamer
+        self.log_path = log_path
+        self.time_shift = time_shift  # 타임머신 시간 (초)
+        self.retry_interval = retry_interval
+        self.echo = echo  # True면 콘솔에도 채팅 출력
+        self.chatChannelId = None
+        self.channel_refresh_interval = max(1, channel_refresh_interval)
+        self.channel_id_changed = False
+        self.task = None
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.sink = None  # BufferedLogSink
+        self.capture = capture  # True면 구조화 캡처(.ndjson)도 저장
+        self.capture_sink = None
+        self.reconnect_count = 0  # 재연결 횟수
+        self.queue_size = queue_size
+        self.frame_queue = None  # asyncio.Queue, 수신 코루틴 -> 기록 코루틴
+        self.metrics = ChatPipelineMetrics(queue_size)
+
+    def write_time_shift(self):
+        # convert_log_to_smi.py는 로그 파일과 같은 폴더의 time_shift.txt를 읽음
+        try:
+            with open(os.path.join(os.path.dirname(self.log_path), "time_shift.txt"), "w") as f:
+                f.write(str(self.time_shift))
+        except Exception as e:
+            print(f"[ChatEngine] time_shift 파일 쓰기 실패: {e}")
+
+    async def run(self):
+        self.write_time_shift()
+        self.sink = BufferedLogSink(self.log_path, self.flush_bytes, self.flush_interval)
+        if self.capture:
+            self.capture_sink = BufferedLogSink(
+                capture_path_for(self.log_path), self.flush_bytes, self.flush_interval
+            )
+        self.frame_queue = asyncio.Queue(maxsize=self.queue_size)
+        writer = asyncio.ensure_future(self.write_loop())
+        try:
+            while True:
+                try:
+                    reconnect_now = await self.run_once()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"[ChatEngine] {self.streamer} 채팅 연결 오류: {e}, {self.retry_interval}초 후 재시도")
+                    reconnect_now = False
+                self.reconnect_count += 1
+                if not reconnect_now:
+                    await asyncio.sleep(self.retry_interval)
+        finally:
+            # 큐에 남은 프레임을 모두 기록한 뒤 파일을 닫음
+            await self.frame_queue.put(None)
+            await asyncio.gather(writer, return_exceptions=True)
+            self.sink.close()  # 남은 버퍼 기록 + fsync
+            if self.capture_sink is not None:
+                self.capture_sink.close()
+            print(f"[ChatEngine] {self.streamer} {self.metrics.summary(self.frame_queue.qsize())}")
+
+    def rotate(self, log_path, time_shift):
+        """연결을 유지한 채 새 로그 파일로 이어서 기록합니다 (이전 파일은 fsync 후 닫음)."""
+        self.log_path = log_path
+        self.time_shift = time_shift
+        self.write_time_shift()
+        if self.sink is not None:
+            self.sink.rotate(log_path)
+        if self.capture_sink is not None:
+            self.capture_sink.rotate(capture_path_for(log_path))
+
+    def flush_if_due(self):
+        self.sink.flush_if_due()
+        if self.capture_sink is not None:
+            self.capture_sink.flush_if_due()
+
+    async def enqueue(self, frame):
+        """프레임을 기록 큐에 넣습니다. 큐가 가득 차면 자리가 날 때까지 수신을 멈춥니다 (백프레셔)."""
+        try:
+            self.frame_queue.put_nowait(frame)
+            self.metrics.on_enqueue(self.frame_queue.qsize())
+        except asyncio.QueueFull:
+            started = time.monotonic()
+            await self.frame_queue.put(frame)
+            self.metrics.on_enqueue(self.frame_queue.qsize(), time.monotonic() - started)
+
+    async def write_loop(self):
+        while True:
+            try:
+                frame = await asyncio.wait_for(self.frame_queue.get(), timeout=self.sink.flush_interval or None)
+            except asyncio.TimeoutError:
+                self.flush_if_due()
+                continue
+            if frame is None:
+                break
+            chat_cmd, chat_list = frame
+            for chat_data in chat_list:
+                try:
+                    formatted = format_chat_message(chat_cmd, chat_data)
+                    if self.capture_sink is not None:
+                        record = build_chat_record(chat_cmd, chat_data)
+                        if record is not None:
+                            self.capture_sink.write(encode_chat_record(record))
+                except Exception as e:
+                    print(f"[ChatEngine] {self.streamer} 채팅 처리 오류: {e}")
+                    continue
+                if formatted is None:
+                    continue
+                console_message, log_message = formatted
+                self.sink.write(log_message)
+                self.metrics.on_written(chat_data.get("msgTime"))
+                if self.echo:
+                    print(console_message)
+            self.flush_if_due()
+            if self.metrics.should_report():
+                print(f"[ChatEngine] {self.streamer} {self.metrics.summary(self.frame_queue.qsize())}")
+
+    async def run_once(self):
+        """
+        채팅 서버에 한 번 연결해 연결이 끊길 때까지 메시지를 기록합니다.
+        채팅 채널 ID가 바뀌어 바로 다시 연결해야 하면 True를 반환합니다.
+        """
+        cookies = api.load_cookies()
+        userIdHash = await asyncio.to_thread(api.fetch_userIdHash, cookies)
+        self.chatChannelId = await asyncio.to_thread(api.fetch_chatChannelId, self.streamer, cookies)
+        accessToken, _ = await asyncio.to_thread(api.fetch_accessToken, self.chatChannelId, cookies)
+        if not self.chatChannelId or not accessToken:
+            raise RuntimeError("채팅 채널 ID 또는 액세스 토큰을 가져오지 못했습니다.")
+
+        async with websockets.connect(CHAT_SERVER_URL, max_size=None) as sock:
+            await sock.send(build_connect_message(self.chatChannelId, userIdHash, accessToken))
+            sock_response = json.loads(await sock.recv())
+            sid = sock_response["bdy"]["sid"]
+            await sock.send(build_recent_chat_message(self.chatChannelId, sid))
+            print(f"[ChatEngine] {self.streamer} 채팅 서버에 연결됨")
+
+            self.channel_id_changed = False
+            watcher = asyncio.ensure_future(self.watch_channel_id(sock))
+            try:
+                async for raw_message in sock:
+                    raw_message = json.loads(raw_message)
+                    chat_cmd = raw_message.get("cmd")
+
+                    if chat_cmd == CHZZK_CHAT_CMD["ping"]:
+                        await sock.send(PONG_MESSAGE)
+                        continue
+                    if chat_cmd not in (CHZZK_CHAT_CMD["chat"], CHZZK_CHAT_CMD["donation"]):
+                        continue
+
+                    await self.enqueue((chat_cmd, raw_message.get("bdy") or []))
+            finally:
+                watcher.cancel()
+        return self.channel_id_changed
+
+    async def watch_channel_id(self, sock):
+        """
+        채팅 채널 ID 변경을 별도 코루틴에서 주기적으로 확인합니다.
+        바뀐 경우에만 소켓을 닫아 수신 루프가 끝나고 바로 다시 연결되게 합니다.
+        """
+        while True:
+            await asyncio.sleep(self.channel_refresh_interval)
+            latest_id = await asyncio.to_thread(
+                api.fetch_chatChannelId, self.streamer, api.load_cookies()
+            )
+            if latest_id and latest_id != self.chatChannelId:
+                print(f"[ChatEngine] {self.streamer} 채팅 채널 ID 변경, 다시 연결합니다.")
+                self.channel_id_changed = True
+                await sock.close()
+                return
+
+
+class ChatEngine:
+    """
+    여러 채널의 채팅을 하나의 프로세스, 하나의 이벤트 루프 스레드에서 수집하는 엔진입니다.
+    채널마다 run.py 프로세스를 띄우는 방식(chatMode="process")의 대안으로 chatMode="engine"일 때 사용합니다.
+    add_channel/remove_channel은 다른 스레드(녹화 스레드, UI 스레드)에서 호출해도 안전합니다.
+    """
+
+    def __init__(self, retry_interval=30, echo=False, flush_bytes=DEFAULT_FLUSH_BYTES,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, capture=False):
+        self.retry_interval = retry_interval
+        self.echo = echo
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.capture = capture
+        self.loop = None
+        self.thread = None
+        self.sessions = {}  # streamer -> ChatSession
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(target=self._run_loop, name="ChatEngine", daemon=True)
+            self.thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def add_channel(self, streamer, log_path, time_shift=0):
+        """채널의 채팅 기록을 시작합니다. 이미 기록 중이면 연결은 유지하고 새 로그 파일로 바꿉니다."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(
+            self._add_channel(streamer, log_path, time_shift), self.loop
+        )
+
+    def remove_channel(self, streamer):
+        if self.loop is None:
+            return None
+        return asyncio.run_coroutine_threadsafe(self._remove_channel(streamer), self.loop)
+
+    def is_active(self, streamer):
+        return streamer in self.sessions
+
+    def stop(self, timeout=10):
+        """모든 세션을 종료하고 엔진 스레드를 멈춥니다."""
+        if self.loop is None or not self.loop.is_running():
+            return
+        future = asyncio.run_coroutine_threadsafe(self._remove_all(), self.loop)
+        try:
+            future.result(timeout=timeout)
+        except Exception as e:
+            print(f"[ChatEngine] 세션 종료 중 오류 발생: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=timeout)
+
+    async def _add_channel(self, streamer, log_path, time_shift):
+        session = self.sessions.get(streamer)
+        if session is not None and not session.task.done():
+            session.rotate(log_path, time_shift)
+            print(f"[ChatEngine] 채팅 로그 파일 변경: {streamer} -> {log_path}")
+            return
+        session = ChatSession(
+            streamer, log_path, time_shift, retry_interval=self.retry_interval, echo=self.echo,
+            flush_bytes=self.flush_bytes, flush_interval=self.flush_interval, capture=self.capture,
+        )
+        session.task = asyncio.ensure_future(session.run())
+        self.sessions[streamer] = session
+        print(f"[ChatEngine] 채팅 기록 시작: {streamer} ({len(self.sessions)}개 채널 수집 중)")
+
+    async def _remove_channel(self, streamer):
+        session = self.sessions.pop(streamer, None)
+        if session is None:
+            return
+        session.task.cancel()
+        await asyncio.gather(session.task, return_exceptions=True)
+        print(f"[ChatEngine] 채팅 기록 중지: {streamer}")
+
+    async def _remove_all(self):
+        for streamer in list(self.sessions):
+            await self._remove_channel(streamer)
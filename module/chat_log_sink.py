@@ -0,0 +1,86 @@
+import os
+import threading
+import time
+
+DEFAULT_FLUSH_BYTES = 64 * 1024  # 버퍼가 이 크기를 넘으면 파일에 씀
+DEFAULT_FLUSH_INTERVAL = 1.0  # 마지막으로 쓴 뒤 이 시간(초)이 지나면 파일에 씀
+
+
+class BufferedLogSink:
+    """
+    채팅 로그 전용 파일 싱크입니다.
+    줄 단위로 받은 로그를 메모리 버퍼에 모았다가 flush_bytes 크기나 flush_interval 초에 도달하면 한 번에 씁니다.
+    파일을 바꿀 때(rotate)와 닫을 때(close)는 fsync까지 해서 디스크에 확실히 남깁니다.
+    """
+
+    def __init__(self, path, flush_bytes=DEFAULT_FLUSH_BYTES, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.flush_bytes = max(1, int(flush_bytes))
+        self.flush_interval = max(0.0, float(flush_interval))
+        self.bytes_written = 0  # 파일에 쓴 총 바이트 수
+        self.flush_count = 0  # 버퍼를 파일에 쓴 횟수
+        self.fsync_count = 0  # fsync 횟수
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+        self._file = open(path, "ab")
+
+    def write(self, line):
+        """로그 한 줄을 버퍼에 추가합니다 (줄바꿈은 자동으로 붙음)."""
+        data = (line + "\n").encode("utf-8")
+        with self._lock:
+            self._buffer.append(data)
+            self._buffered += len(data)
+            if self._buffered >= self.flush_bytes:
+                self._flush_locked()
+
+    def flush_if_due(self):
+        """flush_interval이 지났으면 버퍼를 파일에 씁니다. 기록 루프가 주기적으로 호출합니다."""
+        with self._lock:
+            if self._buffer and time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def sync(self):
+        """버퍼를 비우고 fsync로 디스크에 기록합니다."""
+        with self._lock:
+            self._sync_locked()
+
+    def rotate(self, new_path):
+        """현재 파일을 fsync 후 닫고 new_path에 이어서 기록합니다."""
+        with self._lock:
+            self._sync_locked()
+            self._file.close()
+            self.path = new_path
+            self._file = open(new_path, "ab")
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._sync_locked()
+            self._file.close()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        data = b"".join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+        self._file.write(data)
+        self._file.flush()
+        self.bytes_written += len(data)
+        self.flush_count += 1
+
+    def _sync_locked(self):
+        self._flush_locked()
+        try:
+            os.fsync(self._file.fileno())
+            self.fsync_count += 1
+        except OSError as e:
+            print(f"[BufferedLogSink] fsync 실패: {e}")
@@ -0,0 +1,230 @@
+import mmap
+import os
+import struct
+
+TS_PACKET_SIZE = 188
+PTS_WRAP = 1 << 33  # PTS는 33비트 (90kHz)
+
+# PMT stream_type -> 코덱 이름 (ffprobe codec_name과 같은 이름)
+TS_VIDEO_TYPES = {0x01: "mpeg1video", 0x02: "mpeg2video", 0x1B: "h264", 0x24: "hevc"}
+TS_AUDIO_TYPES = {0x03: "mp2", 0x04: "mp2", 0x0F: "aac", 0x11: "aac_latm", 0x81: "ac3"}
+
+# MP4 stsd 샘플 항목 이름 -> 코덱 이름
+MP4_CODECS = {
+    b"avc1": "h264", b"avc3": "h264", b"hvc1": "hevc", b"hev1": "hevc",
+    b"mp4a": "aac", b"ac-3": "ac3", b"Opus": "opus",
+}
+
+
+def probe_container(path):
+    """
+    ffprobe 없이 MP4/MPEG-TS 파일의 헤더만 읽어 스트림 구성, 영상 프레임 수, 길이를 확인합니다.
+    파일은 mmap으로 열어 필요한 부분만 읽습니다 (MP4는 박스 헤더와 moov/moof, TS는 패킷 헤더와 PAT/PMT/PES 헤더).
+    반환값: {"format", "duration", "video_codec", "video_frames", "audio_codec"} (없는 스트림은 None/0)
+    형식을 알 수 없거나 헤더만으로 판단할 수 없으면 None을 반환하므로 호출하는 쪽에서 ffprobe로 검사합니다.
+    """
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < 8:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data[0] == 0x47 and (len(data) < TS_PACKET_SIZE * 2 or data[TS_PACKET_SIZE] == 0x47):
+                    return _probe_ts(data)
+                return _probe_mp4(data)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def _iter_boxes(data, start, end):
+    """[start, end) 구간의 MP4 박스를 (종류, 내용 시작, 박스 끝)으로 나열합니다."""
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > end:
+                return
+            size = struct.unpack_from(">Q", data, pos + 8)[0]
+            header = 16
+        elif size == 0:  # 파일 끝까지
+            size = end - pos
+        if size < header or pos + size > end:
+            return  # 잘린 파일
+        yield box_type, pos + header, pos + size
+        pos += size
+
+
+def _find_box(data, start, end, *path):
+    """path 순서대로 하위 박스를 찾아 (내용 시작, 박스 끝)을 반환합니다."""
+    for name in path:
+        for box_type, child_start, child_end in _iter_boxes(data, start, end):
+            if box_type == name:
+                start, end = child_start, child_end
+                break
+        else:
+            return None
+    return start, end
+
+
+def _read_time(data, start):
+    """mvhd/mdhd 내용에서 (timescale, duration)을 읽습니다 (버전 0/1)."""
+    if data[start] == 1:
+        return struct.unpack_from(">IQ", data, start + 20)
+    return struct.unpack_from(">II", data, start + 12)
+
+
+def _probe_mp4(data):
+    moov = None
+    moofs = []
+    for box_type, start, end in _iter_boxes(data, 0, len(data)):
+        if box_type == b"moov":
+            moov = (start, end)
+        elif box_type == b"moof":
+            moofs.append((start, end))
+    if moov is None:
+        return None  # MP4가 아니거나 moov가 기록되기 전에 끝난 파일
+
+    mvhd = _find_box(data, *moov, b"mvhd")
+    if mvhd is None:
+        return None
+    timescale, duration = _read_time(data, mvhd[0])
+
+    result = {"format": "mp4", "duration": 0.0, "video_codec": None, "video_frames": 0, "audio_codec": None}
+    video_track = None
+    for box_type, start, end in _iter_boxes(data, *moov):
+        if box_type != b"trak":
+            continue
+        hdlr = _find_box(data, start, end, b"mdia", b"hdlr")
+        stbl = _find_box(data, start, end, b"mdia", b"minf", b"stbl")
+        tkhd = _find_box(data, start, end, b"tkhd")
+        if hdlr is None or stbl is None or tkhd is None:
+            continue
+        handler = bytes(data[hdlr[0] + 8:hdlr[0] + 12])
+        stsd = _find_box(data, *stbl, b"stsd")
+        codec = None
+        if stsd is not None and stsd[0] + 16 <= stsd[1]:
+            entry = bytes(data[stsd[0] + 12:stsd[0] + 16])
+            codec = MP4_CODECS.get(entry, entry.decode("latin-1").strip())
+        if handler == b"vide" and result["video_codec"] is None:
+            result["video_codec"] = codec
+            stsz = _find_box(data, *stbl, b"stsz")
+            if stsz is not None:
+                result["video_frames"] = struct.unpack_from(">I", data, stsz[0] + 8)[0]
+            track_id_offset = 20 if data[tkhd[0]] == 1 else 12
+            video_track = struct.unpack_from(">I", data, tkhd[0] + track_id_offset)[0]
+        elif handler == b"soun" and result["audio_codec"] is None:
+            result["audio_codec"] = codec
+
+    if moofs:  # 조각난 MP4: 샘플 수는 moof/traf/trun에 기록됨
+        mehd = _find_box(data, *moov, b"mvex", b"mehd")
+        if not duration and mehd is not None:
+            duration = struct.unpack_from(">Q" if data[mehd[0]] == 1 else ">I", data, mehd[0] + 4)[0]
+        for moof in moofs:
+            for box_type, start, end in _iter_boxes(data, *moof):
+                if box_type != b"traf":
+                    continue
+                tfhd = _find_box(data, start, end, b"tfhd")
+                if tfhd is None or struct.unpack_from(">I", data, tfhd[0] + 4)[0] != video_track:
+                    continue
+                for child_type, child_start, _ in _iter_boxes(data, start, end):
+                    if child_type == b"trun":
+                        result["video_frames"] += struct.unpack_from(">I", data, child_start + 4)[0]
+
+    if not timescale or not duration:
+        return None  # 길이를 헤더에서 알 수 없음
+    result["duration"] = duration / timescale
+    return result
+
+
+def _payload_start(data, offset):
+    """TS 패킷의 페이로드 시작 위치 (페이로드가 없으면 None)"""
+    adaptation = (data[offset + 3] >> 4) & 0x3
+    start = offset + 4
+    if adaptation & 0x2:
+        start += 1 + data[offset + 4]
+    if not adaptation & 0x1 or start >= offset + TS_PACKET_SIZE:
+        return None
+    return start
+
+
+def _read_pes_pts(data, start, end):
+    if start + 14 > end or data[start:start + 3] != b"\x00\x00\x01" or not data[start + 7] & 0x80:
+        return None
+    p = data[start + 9:start + 14]
+    return ((p[0] >> 1) & 0x07) << 30 | p[1] << 22 | (p[2] >> 1) << 15 | p[3] << 7 | p[4] >> 1
+
+
+def _probe_ts(data):
+    """
+    PAT/PMT에서 스트림 구성을, 영상 PES 패킷 수에서 프레임 수를, 첫/마지막 PTS에서 길이를 구합니다.
+    패킷 헤더만 보지만 프레임 수를 세려면 파일 전체를 한 번 순서대로 읽어야 합니다.
+    PMT나 영상 PTS를 찾지 못하면 (잘린 파일 등) 헤더만으로 판단할 수 없으므로 None을 반환합니다.
+    """
+    result = {"format": "mpegts", "duration": 0.0, "video_codec": None, "video_frames": 0, "audio_codec": None}
+    pmt_pid = None
+    video_pid = None
+    first_pts = last_pts = None
+    for offset in range(0, len(data) - TS_PACKET_SIZE + 1, TS_PACKET_SIZE):
+        if data[offset] != 0x47:
+            break  # 동기 바이트가 깨진 곳부터는 잘린/손상된 데이터
+        if not data[offset + 1] & 0x40:  # payload_unit_start_indicator
+            continue
+        pid = ((data[offset + 1] & 0x1F) << 8) | data[offset + 2]
+        start = _payload_start(data, offset)
+        if start is None:
+            continue
+        end = offset + TS_PACKET_SIZE
+        if pid == video_pid:
+            result["video_frames"] += 1
+            pts = _read_pes_pts(data, start, end)
+            if pts is not None:
+                if first_pts is None:
+                    first_pts = pts
+                last_pts = pts
+        elif pid == 0 and pmt_pid is None:
+            pmt_pid = _parse_pat(data, start, end)
+        elif pid == pmt_pid and video_pid is None and result["audio_codec"] is None:
+            video_pid = _parse_pmt(data, start, end, result)
+    if video_pid is None and result["audio_codec"] is None:
+        return None  # PMT를 찾지 못함
+    if first_pts is None or last_pts is None:
+        return None  # 영상 PTS를 찾지 못함
+    result["duration"] = ((last_pts - first_pts) % PTS_WRAP) / 90000
+    return result
+
+
+def _parse_pat(data, start, end):
+    section = start + 1 + data[start]  # pointer_field
+    if section + 8 > end:
+        return None
+    section_length = ((data[section + 1] & 0x0F) << 8) | data[section + 2]
+    pos = section + 8
+    limit = min(section + 3 + section_length - 4, end)  # CRC 제외
+    while pos + 4 <= limit:
+        program_number = (data[pos] << 8) | data[pos + 1]
+        if program_number != 0:  # 0은 네트워크 정보
+            return ((data[pos + 2] & 0x1F) << 8) | data[pos + 3]
+        pos += 4
+    return None
+
+
+def _parse_pmt(data, start, end, result):
+    """PMT에서 영상/음성 코덱을 result에 기록하고 영상 PID를 반환합니다."""
+    section = start + 1 + data[start]
+    if section + 12 > end:
+        return None
+    section_length = ((data[section + 1] & 0x0F) << 8) | data[section + 2]
+    program_info_length = ((data[section + 10] & 0x0F) << 8) | data[section + 11]
+    pos = section + 12 + program_info_length
+    limit = min(section + 3 + section_length - 4, end)
+    video_pid = None
+    while pos + 5 <= limit:
+        stream_type = data[pos]
+        pid = ((data[pos + 1] & 0x1F) << 8) | data[pos + 2]
+        if stream_type in TS_VIDEO_TYPES and video_pid is None:
+            video_pid = pid
+            result["video_codec"] = TS_VIDEO_TYPES[stream_type]
+        elif stream_type in TS_AUDIO_TYPES and result["audio_codec"] is None:
+            result["audio_codec"] = TS_AUDIO_TYPES[stream_type]
+        pos += 5 + (((data[pos + 3] & 0x0F) << 8) | data[pos + 4])
+    return video_pid
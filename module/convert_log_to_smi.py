@@ -1,11 +1,12 @@
 import re
+import json
 import argparse
 import os
 import sys
 from datetime import datetime, timedelta, time
 
 def convert_log_to_smi(log_filepath, smi_filepath):
-    """Converts a Chzzk chat log file to an SMI subtitle file."""
+    """Converts a Chzzk chat log file (.log text or .ndjson capture) to an SMI subtitle file."""
 
     try:
         with open(log_filepath, 'r', encoding='utf-8') as log_file, \
@@ -60,9 +61,28 @@ def convert_log_to_smi(log_filepath, smi_filepath):
                 print("Error: Could not extract recording start time from filename.")
                 return 1
 
+            # .ndjson 캡처는 밀리초 단위 msgTime을 그대로 사용 (정규식 파싱 불필요)
+            is_ndjson = log_filepath.lower().endswith(".ndjson")
+            recording_start_ms = recording_start_time.timestamp() * 1000
+
             for line_num, line in enumerate(log_file):
-                match = log_pattern.match(line)
-                if match:
+                if is_ndjson:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                        start_time = int(record["t"] - recording_start_ms)
+                        nickname = record["nickname"]
+                        message = record["msg"]
+                        chat_type = "후원" if record.get("type") == "donation" else "채팅"
+                    except (json.JSONDecodeError, KeyError, TypeError) as e:
+                        print(f"Error parsing record on line {line_num}: {e}")
+                        continue
+                else:
+                    match = log_pattern.match(line)
+                    if not match:
+                        print(f"Line does not match regex: {line.strip()}")
+                        continue
                     timestamp_str, chat_type, nickname, message = match.groups()
                     nickname = id_pattern.sub('', nickname).strip()
                     try:
@@ -74,14 +94,12 @@ def convert_log_to_smi(log_filepath, smi_filepath):
                         print(f"Error parsing time on line {line_num}: {e}")
                         continue
 
-                    message = emoji_pattern.sub(lambda m: f"({m.group(0)[1:-1]})", message)
+                message = emoji_pattern.sub(lambda m: f"({m.group(0)[1:-1]})", message)
 
-                    if chat_type == "후원":
-                        smi_file.write(f'<SYNC Start={start_time}><P Class=DONATION><font color="red">[후원]</font> {nickname}: {message}\n')
-                    else:
-                        smi_file.write(f'<SYNC Start={start_time}><P>{nickname}: {message}\n')
+                if chat_type == "후원":
+                    smi_file.write(f'<SYNC Start={start_time}><P Class=DONATION><font color="red">[후원]</font> {nickname}: {message}\n')
                 else:
-                    print(f"Line does not match regex: {line.strip()}")
+                    smi_file.write(f'<SYNC Start={start_time}><P>{nickname}: {message}\n')
 
 
             # Write SMI footer
@@ -108,7 +126,7 @@ def convert_log_to_smi(log_filepath, smi_filepath):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Convert Chzzk chat log to SMI.")
-    parser.add_argument("log_filepath", help="Path to the Chzzk chat log file.")
+    parser.add_argument("log_filepath", help="Path to the Chzzk chat log file (.log or .ndjson).")
     parser.add_argument("smi_filepath", help="Path to the output SMI file.")
     args = parser.parse_args()
 
@@ -3,6 +3,9 @@ import subprocess
 import time
 import ctypes
 
+# 후처리 ffmpeg를 새 콘솔 창에서 실행 (Windows 전용 플래그, 다른 OS에서는 0)
+CREATE_NEW_CONSOLE = getattr(subprocess, "CREATE_NEW_CONSOLE", 0)
+
 def get_ffmpeg_path():
     current_dir = os.path.dirname(os.path.dirname(__file__))
     ffmpeg_path = os.path.join(current_dir, 'dependent', 'ffmpeg', 'bin', 'ffmpeg.exe')
@@ -47,20 +50,16 @@ def copy_stream(filename, directory, ffmpeg_path, minimizePostProcessing=False):
     except Exception as e:
         print(f"{original_path} 파일의 스트림 복사 중 예상치 못한 오류가 발생했습니다. 오류: {e}")
 
-def copy_specific_file(input_path, output_path, deleteAfterPostProcessing, removeFixedPrefix, minimizePostProcessing=False, config={}):
-    ffmpeg_path = get_ffmpeg_path()
+def build_post_processing_command(input_path, output_path, config, ffmpeg_path=None):
+    """
+    후처리 설정(스트림복사/인코딩)에 맞는 ffmpeg 명령을 만듭니다.
+    input_path에 "pipe:0"을 주면 표준 입력으로 받은 데이터를 처리합니다 (녹화 중 후처리).
+    """
+    ffmpeg_path = ffmpeg_path or get_ffmpeg_path()
 
     # 인코딩 또는 스트림 복사에 대한 설정 처리
     post_processing_method = config.get('postProcessingMethod')
 
-    input_path = os.path.normpath(input_path)
-    output_path = os.path.normpath(output_path)
-
-    print(f"[DEBUG] copy_specific_file 함수 시작")
-    print(f"[DEBUG] 입력 파일: {input_path}")
-    print(f"[DEBUG] 출력 파일: {output_path}")
-    print(f"[DEBUG] 설정: deleteAfterPostProcessing={deleteAfterPostProcessing}, removeFixedPrefix={removeFixedPrefix}, minimizePostProcessing={minimizePostProcessing}, config={config}")
-
     if post_processing_method == "스트림복사":
         cmd = [
             ffmpeg_path,
@@ -129,39 +128,70 @@ def copy_specific_file(input_path, output_path, deleteAfterPostProcessing, remov
 
         cmd.append(output_path)
 
-    print(f"[DEBUG] 명령어 실행: {' '.join(cmd)}")
-
-    try:
-        # 별도의 새 창에서 명령을 실행하고, minimizePostProcessing이 True이면 창을 최소화
-        startupinfo = None
-        if minimizePostProcessing:
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            startupinfo.wShowWindow = 6  # SW_MINIMIZE = 6
+    return cmd
 
-        process = subprocess.Popen(cmd, startupinfo=startupinfo, creationflags=subprocess.CREATE_NEW_CONSOLE)
-        process.wait()
 
-        if process.returncode != 0:
-            raise subprocess.CalledProcessError(process.returncode, cmd)
+def get_post_processing_startupinfo(minimizePostProcessing):
+    """minimizePostProcessing이 True이면 후처리 창을 최소화해서 실행하기 위한 STARTUPINFO (Windows 전용)"""
+    if not minimizePostProcessing or not hasattr(subprocess, 'STARTUPINFO'):
+        return None
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    startupinfo.wShowWindow = 6  # SW_MINIMIZE = 6
+    return startupinfo
 
-        print(f"{input_path}를 {output_path}로 스트림 복사 완료")
 
-        if deleteAfterPostProcessing:
-            time.sleep(5)
+def finish_post_processing(input_paths, output_path, deleteAfterPostProcessing, removeFixedPrefix):
+    """후처리가 끝난 뒤 원본 삭제와 fixed_ 접두사 제거를 합니다. 최종 출력 경로를 반환합니다."""
+    if deleteAfterPostProcessing:
+        time.sleep(5)
+        for input_path in input_paths:
             os.remove(input_path)
             print(f"원본 파일 {input_path} 삭제됨")
 
-        if removeFixedPrefix:
-            final_output_path = os.path.join(os.path.dirname(output_path), os.path.basename(output_path).replace('fixed_', ''))
-            print(f"[DEBUG] Renaming {output_path} to {final_output_path}")
-            os.rename(output_path, final_output_path)
-            output_path = final_output_path
-            print(f"{output_path}를 {final_output_path}로 이름 변경됨")
+    if removeFixedPrefix:
+        final_output_path = os.path.join(os.path.dirname(output_path), os.path.basename(output_path).replace('fixed_', ''))
+        print(f"[DEBUG] Renaming {output_path} to {final_output_path}")
+        os.rename(output_path, final_output_path)
+        print(f"{output_path}를 {final_output_path}로 이름 변경됨")
+        output_path = final_output_path
+    return output_path
+
+
+def copy_specific_file(input_path, output_path, deleteAfterPostProcessing, removeFixedPrefix, minimizePostProcessing=False, config={},
+                       on_process=None):
+    """
+    (블로킹) 녹화 파일 하나를 후처리하고 최종 출력 경로를 반환합니다.
+    ffmpeg가 실패하거나 출력 파일이 만들어지지 않으면 예외가 발생하며, 원본은 그대로 둡니다.
+    on_process(process)는 ffmpeg를 실행한 직후 호출됩니다 (종료할 때 프로세스를 정리하기 위함).
+    """
+    input_path = os.path.normpath(input_path)
+    output_path = os.path.normpath(output_path)
 
-    except subprocess.CalledProcessError as e:
-        print(f"{input_path} 파일의 스트림 복사가 강제로 종료되었습니다. 오류: {e}")
-    except Exception as e:
-        print(f"{input_path} 파일의 스트림 복사 중 예상치 못한 오류가 발생했습니다. 오류: {e}")
+    print(f"[DEBUG] copy_specific_file 함수 시작")
+    print(f"[DEBUG] 입력 파일: {input_path}")
+    print(f"[DEBUG] 출력 파일: {output_path}")
+    print(f"[DEBUG] 설정: deleteAfterPostProcessing={deleteAfterPostProcessing}, removeFixedPrefix={removeFixedPrefix}, minimizePostProcessing={minimizePostProcessing}, config={config}")
+
+    cmd = build_post_processing_command(input_path, output_path, config)
+    print(f"[DEBUG] 명령어 실행: {' '.join(cmd)}")
+
+    # 별도의 새 창에서 명령을 실행하고, minimizePostProcessing이 True이면 창을 최소화
+    startupinfo = get_post_processing_startupinfo(minimizePostProcessing)
+
+    process = subprocess.Popen(cmd, startupinfo=startupinfo, creationflags=CREATE_NEW_CONSOLE)
+    if on_process is not None:
+        on_process(process)
+    process.wait()
+
+    if process.returncode != 0:
+        print(f"{input_path} 파일의 스트림 복사가 강제로 종료되었습니다. 종료 코드: {process.returncode}")
+        raise subprocess.CalledProcessError(process.returncode, cmd)
+    if not os.path.exists(output_path):
+        raise FileNotFoundError(f"후처리 결과 파일이 만들어지지 않았습니다: {output_path}")
+
+    print(f"{input_path}를 {output_path}로 스트림 복사 완료")
 
-    return output_path
\ No newline at end of file
+    return finish_post_processing(
+        [input_path], output_path, deleteAfterPostProcessing, removeFixedPrefix
+    )
@@ -0,0 +1,266 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+
+import httpx
+
+from hls_recorder import get_media_client
+
+DEFAULT_CONCURRENCY = 8  # 동시에 받을 최대 구간 수
+CHUNK_SIZE = 8 * 1024 * 1024  # 한 번의 Range 요청으로 받을 크기
+CHUNK_ATTEMPTS = 5  # 구간 하나를 다시 시도할 횟수
+PROGRESS_INTERVAL = 10  # 진행률 출력 간격 (초)
+MANIFEST_SAVE_INTERVAL = 2  # 받은 구간 목록을 저장하는 최소 간격 (초)
+MANIFEST_VERSION = 1
+
+
+class DashError(Exception):
+    """구간 다운로드에 실패했을 때 발생하는 예외 (다시 실행하면 받은 구간은 건너뜀)"""
+
+
+class RangeNotSupportedError(DashError):
+    """VOD 파일 크기를 알 수 없거나 서버가 Range 요청을 지원하지 않을 때 발생하는 예외"""
+
+
+class BandwidthLimiter:
+    """
+    여러 다운로드가 함께 쓰는 초당 바이트 예산입니다 (rate가 0 이하면 제한 없음).
+    구간을 요청하기 전에 consume(크기)를 호출하며, 예산을 넘으면 요청 순서대로 기다립니다.
+    예산은 잠금 안에서 미리 차감하고 기다리는 것은 잠금 밖에서 하므로, 뒤에 온 요청은 앞 요청의 대기가 끝나기 전에 자기 대기 시간을 정합니다.
+    """
+
+    def __init__(self, rate):
+        self.rate = float(rate)
+        self._available = self.rate  # 최대 1초 분량까지 쌓임
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def consume(self, nbytes):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            self._available = min(self.rate, self._available + (now - self._updated) * self.rate)
+            self._updated = now
+            self._available -= nbytes
+            wait = -self._available / self.rate
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def part_path_for(output_path):
+    """다운로드 중인 파일 경로 (완료되면 output_path로 이름을 바꿈)"""
+    return output_path + ".part"
+
+
+def manifest_path_for(output_path):
+    """받은 구간과 체크섬을 기록하는 매니페스트 경로"""
+    return output_path + ".part.json"
+
+
+def split_ranges(size, chunk_size=CHUNK_SIZE):
+    """0부터 size 바이트를 chunk_size 단위 (시작, 끝) 구간 목록으로 나눕니다 (끝 포함)."""
+    return [(start, min(start + chunk_size, size) - 1) for start in range(0, size, chunk_size)]
+
+
+async def probe_size(client, url):
+    """첫 1바이트만 요청해 Content-Range에서 전체 크기를 읽습니다. Range를 지원하지 않으면 DashError."""
+    response = await client.get(url, headers={"Range": "bytes=0-0"})
+    if response.status_code != 206:
+        raise RangeNotSupportedError(f"Range 요청을 지원하지 않는 응답입니다 (상태 코드 {response.status_code})")
+    content_range = response.headers.get("Content-Range", "")
+    _, _, total = content_range.rpartition("/")
+    if not total.isdigit():
+        raise RangeNotSupportedError(f"VOD 파일 크기를 알 수 없습니다 (Content-Range: {content_range!r})")
+    return int(total)
+
+
+class DashDownloader:
+    """
+    DASH 매니페스트의 BaseURL(하나의 MP4 파일)을 바이트 구간으로 나눠 동시에 내려받는 다운로더입니다.
+    받은 구간은 미리 크기를 잡아 둔 .part 파일의 해당 위치에 바로 기록하므로 병합 과정이 필요 없습니다.
+    연결은 내장 HLS 녹화기와 같은 세그먼트 전용 클라이언트(get_media_client)를 재사용합니다.
+
+    resume_key(예: VOD 번호와 화질)를 주면 받은 구간과 SHA-1 체크섬을 .part.json 매니페스트에 기록합니다.
+    다운로드가 중간에 실패하거나 프로그램이 종료되어도 다시 실행하면 체크섬이 맞는 구간은 건너뛰고 나머지만 받습니다.
+    """
+
+    def __init__(self, url, output_path, concurrency=DEFAULT_CONCURRENCY, chunk_size=CHUNK_SIZE, resume_key=None,
+                 bandwidth=None, on_progress=None, label=None):
+        self.url = url
+        self.output_path = output_path
+        self.part_path = part_path_for(output_path)
+        self.manifest_path = manifest_path_for(output_path)
+        self.resume_key = resume_key  # None이면 이어받기를 하지 않음
+        self.bandwidth = bandwidth  # 여러 다운로드가 함께 쓰는 BandwidthLimiter (None이면 제한 없음)
+        self.on_progress = on_progress  # on_progress(받은 바이트, 전체 바이트)
+        self.prefix = f"[VOD {label}]" if label else "[VOD]"  # 여러 VOD를 함께 받을 때 구분용
+        self.concurrency = max(1, int(concurrency))
+        self.chunk_size = max(1024 * 1024, int(chunk_size))
+        self.size = 0
+        self.bytes_done = 0
+        self.bytes_resumed = 0  # 이전 실행에서 받아 둔 크기
+        self.started = None
+        self.done = {}  # 구간 시작 위치 -> SHA-1 체크섬
+        self._file = None
+        self._file_lock = threading.Lock()  # 여러 스레드에서 seek/write를 함께 하지 않도록
+        self._reported_at = 0.0
+        self._saved_at = 0.0
+
+    async def download(self):
+        """VOD 전체를 내려받아 output_path에 저장하고 경로를 반환합니다. 실패하면 예외가 발생합니다."""
+        client = get_media_client()
+        self.size = await probe_size(client, self.url)
+        ranges = split_ranges(self.size, self.chunk_size)
+        self.done = await asyncio.to_thread(self._load_resume_state)
+        pending = [(start, end) for start, end in ranges if start not in self.done]
+        self.bytes_done = self.bytes_resumed = sum(end - start + 1 for start, end in ranges if start in self.done)
+        print(
+            f"{self.prefix} 병렬 다운로드 시작: {self.size / 1048576:.1f}MB, "
+            f"구간 {len(ranges)}개 (받을 구간 {len(pending)}개), 동시 {self.concurrency}개"
+        )
+        self.started = self._reported_at = self._saved_at = time.monotonic()
+        if self.on_progress is not None:
+            self.on_progress(self.bytes_done, self.size)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        if self.done:
+            self._file = open(self.part_path, "r+b")
+        else:
+            self._file = open(self.part_path, "wb")
+            self._file.truncate(self.size)  # 미리 크기를 잡아 두고 구간별 위치에 기록
+        try:
+            tasks = [asyncio.ensure_future(self._fetch_range(client, semaphore, start, end)) for start, end in pending]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+        finally:
+            self._file.close()
+            self._save_manifest()  # 실패해도 받은 구간까지는 기록 (다음 실행 때 이어받기)
+        os.replace(self.part_path, self.output_path)
+        self._remove(self.manifest_path)
+        elapsed = max(time.monotonic() - self.started, 0.001)
+        downloaded = self.size - self.bytes_resumed
+        print(
+            f"{self.prefix} 병렬 다운로드 완료: {self.output_path} "
+            f"({downloaded / 1048576:.1f}MB, {elapsed:.0f}초, {downloaded * 8 / elapsed / 1e6:.1f}Mbps"
+            + (f", 이어받기 {self.bytes_resumed / 1048576:.1f}MB)" if self.bytes_resumed else ")")
+        )
+        return self.output_path
+
+    def discard(self):
+        """받던 파일과 매니페스트를 지웁니다 (다른 방법으로 다시 받는 경우)."""
+        self._remove(self.part_path)
+        self._remove(self.manifest_path)
+
+    def _load_resume_state(self):
+        """매니페스트와 .part 파일을 확인해 체크섬이 맞는 구간만 반환합니다."""
+        if self.resume_key is None or not os.path.exists(self.part_path):
+            return {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if (
+            manifest.get("version") != MANIFEST_VERSION
+            or manifest.get("key") != self.resume_key
+            or manifest.get("size") != self.size
+            or manifest.get("chunk_size") != self.chunk_size
+            or os.path.getsize(self.part_path) != self.size
+        ):
+            print(f"{self.prefix} 이전 다운로드 기록이 현재 VOD와 맞지 않아 처음부터 받습니다.")
+            return {}
+        done = {}
+        with open(self.part_path, "rb") as f:
+            for start, digest in manifest.get("done", {}).items():
+                start = int(start)
+                f.seek(start)
+                data = f.read(min(self.chunk_size, self.size - start))
+                if hashlib.sha1(data).hexdigest() == digest:
+                    done[start] = digest
+        corrupted = len(manifest.get("done", {})) - len(done)
+        print(
+            f"{self.prefix} 이전 다운로드에서 받은 구간 {len(done)}개를 이어받습니다."
+            + (f" (체크섬이 맞지 않는 구간 {corrupted}개는 다시 받음)" if corrupted else "")
+        )
+        return done
+
+    def _save_manifest(self, done=None):
+        """done: 다른 스레드에서 저장할 때 넘기는 받은 구간 목록의 복사본"""
+        if self.resume_key is None:
+            return
+        done = self.done if done is None else done
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "key": self.resume_key,
+            "url": self.url,
+            "size": self.size,
+            "chunk_size": self.chunk_size,
+            "done": {str(start): digest for start, digest in done.items()},
+        }
+        temp_path = self.manifest_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(temp_path, self.manifest_path)
+        except OSError as e:
+            print(f"{self.prefix} 다운로드 기록 저장 중 오류 발생: {e}")
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    async def _fetch_range(self, client, semaphore, start, end):
+        expected = end - start + 1
+        async with semaphore:
+            if self.bandwidth is not None:
+                await self.bandwidth.consume(expected)
+            for attempt in range(1, CHUNK_ATTEMPTS + 1):
+                try:
+                    response = await client.get(self.url, headers={"Range": f"bytes={start}-{end}"})
+                    if response.status_code != 206:
+                        raise DashError(f"상태 코드 {response.status_code}")
+                    data = response.content
+                    if len(data) != expected:
+                        raise DashError(f"받은 크기 {len(data)}바이트 (예상 {expected}바이트)")
+                    break
+                except (httpx.HTTPError, DashError) as e:
+                    if attempt == CHUNK_ATTEMPTS:
+                        raise DashError(f"{start}-{end} 구간 다운로드 실패: {e}") from e
+                    await asyncio.sleep(min(2 ** attempt, 10))
+        await asyncio.to_thread(self._write_at, start, data)
+        self.done[start] = hashlib.sha1(data).hexdigest()
+        self.bytes_done += expected
+        if self.resume_key is not None and time.monotonic() - self._saved_at >= MANIFEST_SAVE_INTERVAL:
+            self._saved_at = time.monotonic()
+            await asyncio.to_thread(self._save_manifest, dict(self.done))
+        if self.on_progress is not None:
+            self.on_progress(self.bytes_done, self.size)
+        self._report_progress()
+
+    def _write_at(self, offset, data):
+        with self._file_lock:
+            self._file.seek(offset)
+            self._file.write(data)
+
+    def _report_progress(self):
+        now = time.monotonic()
+        if now - self._reported_at < PROGRESS_INTERVAL:
+            return
+        self._reported_at = now
+        elapsed = max(now - self.started, 0.001)
+        print(
+            f"{self.prefix} {self.bytes_done / self.size * 100:.1f}% "
+            f"({self.bytes_done / 1048576:.0f}/{self.size / 1048576:.0f}MB, "
+            f"{(self.bytes_done - self.bytes_resumed) * 8 / elapsed / 1e6:.1f}Mbps)"
+        )
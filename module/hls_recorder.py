@@ -0,0 +1,547 @@
+import asyncio
+import json
+import os
+import re
+import time
+import weakref
+from urllib.parse import urljoin
+
+import httpx
+
+from api import USER_AGENT, get_async_client, get_cached_headers
+from rate_limiter import PRIORITY_CRITICAL
+
+# streamlink 실행 옵션과 같은 기본값 (--hls-live-edge 1, --stream-segment-timeout 5, --stream-segment-attempts 5)
+LIVE_EDGE = 1  # 녹화를 시작할 때 라이브 끝에서부터 받을 세그먼트 수
+SEGMENT_TIMEOUT = 5.0
+SEGMENT_ATTEMPTS = 5
+MAX_PLAYLIST_FAILURES = 5  # 플레이리스트를 연속으로 이만큼 못 받으면 녹화 종료
+PREFETCH_SEGMENTS = 3  # 동시에 내려받을 최대 세그먼트 수
+METRICS_INTERVAL = 60  # 녹화 지표 출력 간격 (초)
+
+LIVE_DETAIL_URL = "https://api.chzzk.naver.com/service/v3/channels/{channel_id}/live-detail"
+
+# 세그먼트 전용 연결 풀 (API 요청 풀과 분리, 여러 채널이 동시에 녹화해도 부족하지 않게)
+_MEDIA_LIMITS = httpx.Limits(max_connections=400, max_keepalive_connections=200, keepalive_expiry=30.0)
+_media_clients = weakref.WeakKeyDictionary()  # 이벤트 루프 -> httpx.AsyncClient
+
+_ATTRIBUTE_PATTERN = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+class HlsCaptureMetrics:
+    """
+    채널 하나의 HLS 수집 지표입니다.
+    처리량(초당 바이트), 라이브 지연(세그먼트가 플레이리스트에 나타난 뒤 파일에 기록될 때까지 걸린 시간),
+    기록이 라이브 끝보다 몇 세그먼트 뒤처졌는지를 집계합니다.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.segments_written = 0
+        self.segments_missed = 0  # 끝내 받지 못해 건너뛴 세그먼트 수
+        self.bytes_written = 0
+        self.last_lag = 0.0  # 마지막 세그먼트의 라이브 지연 (초)
+        self.max_lag = 0.0
+        self.newest_seq = None  # 플레이리스트에서 본 가장 최근 세그먼트 번호
+        self.written_seq = None  # 마지막으로 기록한 세그먼트 번호
+        self._reported_at = self.started
+
+    def on_playlist(self, newest_seq):
+        self.newest_seq = newest_seq
+
+    def on_written(self, seq, nbytes, discovered_at):
+        self.segments_written += 1
+        self.bytes_written += nbytes
+        self.written_seq = seq
+        self.last_lag = time.monotonic() - discovered_at
+        self.max_lag = max(self.max_lag, self.last_lag)
+
+    def on_missed(self, seq):
+        self.segments_missed += 1
+        self.written_seq = seq
+
+    @property
+    def behind(self):
+        if self.newest_seq is None or self.written_seq is None:
+            return 0
+        return max(0, self.newest_seq - self.written_seq)
+
+    @property
+    def throughput(self):
+        elapsed = time.monotonic() - self.started
+        return self.bytes_written / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            "segments_written": self.segments_written,
+            "segments_missed": self.segments_missed,
+            "bytes_written": self.bytes_written,
+            "throughput": round(self.throughput),
+            "last_lag": round(self.last_lag, 2),
+            "max_lag": round(self.max_lag, 2),
+            "behind": self.behind,
+        }
+
+    def summary(self):
+        return (
+            f"세그먼트 {self.segments_written}개 ({self.bytes_written / 1048576:.1f}MB, "
+            f"{self.throughput * 8 / 1e6:.1f}Mbps), 누락 {self.segments_missed}개, "
+            f"지연 {self.last_lag:.1f}초 (최대 {self.max_lag:.1f}초), 라이브 끝보다 {self.behind}개 뒤"
+        )
+
+    def should_report(self, interval=METRICS_INTERVAL):
+        now = time.monotonic()
+        if now - self._reported_at < interval:
+            return False
+        self._reported_at = now
+        return True
+
+
+class HlsError(Exception):
+    """플레이리스트를 찾거나 해석하지 못했을 때 발생하는 예외"""
+
+
+def get_media_client():
+    """현재 이벤트 루프에서 공유하는 세그먼트 다운로드용 클라이언트를 반환합니다."""
+    loop = asyncio.get_running_loop()
+    client = _media_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=_MEDIA_LIMITS,
+            timeout=httpx.Timeout(SEGMENT_TIMEOUT),
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+        )
+        _media_clients[loop] = client
+    return client
+
+
+async def close_media_client():
+    """현재 이벤트 루프의 세그먼트 다운로드용 클라이언트를 닫습니다."""
+    client = _media_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def _parse_attributes(line):
+    return {key: value.strip('"') for key, value in _ATTRIBUTE_PATTERN.findall(line.split(":", 1)[1])}
+
+
+def parse_master_playlist(text, base_url):
+    """마스터 플레이리스트에서 화질별 미디어 플레이리스트 목록을 읽습니다."""
+    variants = []
+    attributes = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-STREAM-INF:"):
+            attributes = _parse_attributes(line)
+        elif line and not line.startswith("#") and attributes is not None:
+            width, _, height = attributes.get("RESOLUTION", "0x0").partition("x")
+            variants.append({
+                "uri": urljoin(base_url, line),
+                "bandwidth": int(attributes.get("BANDWIDTH", 0) or 0),
+                "width": int(width or 0),
+                "height": int(height or 0),
+            })
+            attributes = None
+    return variants
+
+
+def select_variant(variants, quality="best"):
+    """
+    화질 설정에 맞는 미디어 플레이리스트를 고릅니다.
+    "best"면 가장 높은 해상도, "1080p"/"720p" 같은 값이면 세로 해상도가 같은 것, 없으면 가장 높은 해상도를 고릅니다.
+    """
+    if not variants:
+        return None
+    best = max(variants, key=lambda v: (v["width"] * v["height"], v["bandwidth"]))
+    match = re.match(r"(\d+)p", quality or "")
+    if not match:
+        return best
+    height = int(match.group(1))
+    candidates = [v for v in variants if v["height"] == height]
+    return max(candidates, key=lambda v: v["bandwidth"]) if candidates else best
+
+
+def read_first_pts(data):
+    """
+    MPEG-TS 세그먼트에서 처음 나오는 PES 패킷의 PTS를 초 단위로 읽습니다.
+    TS가 아니거나(fMP4 등) PTS를 찾지 못하면 None을 반환합니다.
+    """
+    for offset in range(0, len(data) - 187, 188):
+        if data[offset] != 0x47:
+            return None
+        if not data[offset + 1] & 0x40:  # payload_unit_start_indicator
+            continue
+        adaptation = (data[offset + 3] >> 4) & 0x3
+        start = offset + 4
+        if adaptation & 0x2:
+            start += 1 + data[offset + 4]
+        if not adaptation & 0x1 or start + 14 > offset + 188:
+            continue
+        if data[start:start + 3] != b"\x00\x00\x01" or not data[start + 7] & 0x80:
+            continue
+        p = data[start + 9:start + 14]
+        pts = ((p[0] >> 1) & 0x07) << 30 | p[1] << 22 | (p[2] >> 1) << 15 | p[3] << 7 | p[4] >> 1
+        return pts / 90000
+    return None
+
+
+def chunk_path_for(output_path, index):
+    """분할 녹화 파일 경로 (첫 번째는 원래 경로, 이후 "이름_part002.ts" 형식)"""
+    if index == 1:
+        return output_path
+    base, ext = os.path.splitext(output_path)
+    return f"{base}_part{index:03d}{ext}"
+
+
+def manifest_path_for(output_path):
+    return os.path.splitext(output_path)[0] + ".chunks.json"
+
+
+def parse_media_playlist(text, base_url):
+    """
+    미디어 플레이리스트를 읽어 세그먼트 목록을 반환합니다.
+    세그먼트는 {"seq", "uri", "duration", "map_uri", "discontinuity"} 딕셔너리이며 map_uri는 fMP4 초기화 세그먼트 주소입니다.
+    """
+    media_sequence = 0
+    target_duration = 2.0
+    ended = False
+    segments = []
+    duration = None
+    map_uri = None
+    discontinuity = False  # 다음 세그먼트 앞에 #EXT-X-DISCONTINUITY가 있었는지
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-MEDIA-SEQUENCE:"):
+            media_sequence = int(line.split(":", 1)[1])
+        elif line.startswith("#EXT-X-TARGETDURATION:"):
+            target_duration = float(line.split(":", 1)[1])
+        elif line.startswith("#EXT-X-MAP:"):
+            uri = _parse_attributes(line).get("URI")
+            map_uri = urljoin(base_url, uri) if uri else None
+        elif line.startswith("#EXTINF:"):
+            duration = float(line.split(":", 1)[1].split(",", 1)[0] or 0)
+        elif line.startswith("#EXT-X-ENDLIST"):
+            ended = True
+        elif line.startswith("#EXT-X-DISCONTINUITY") and not line.startswith("#EXT-X-DISCONTINUITY-SEQUENCE"):
+            discontinuity = True
+        elif line and not line.startswith("#"):
+            segments.append({
+                "seq": media_sequence + len(segments),
+                "uri": urljoin(base_url, line),
+                "duration": duration or target_duration,
+                "map_uri": map_uri,
+                "discontinuity": discontinuity,
+            })
+            duration = None
+            discontinuity = False
+    return {"target_duration": target_duration, "segments": segments, "ended": ended}
+
+
+async def resolve_playlist_url(channel_id, quality="best"):
+    """live-detail의 livePlaybackJson에서 HLS 마스터 플레이리스트를 찾아 화질에 맞는 미디어 플레이리스트 주소를 반환합니다."""
+    headers = get_cached_headers()
+    if headers is None:
+        raise HlsError("쿠키를 불러오지 못했습니다.")
+    response = await get_async_client().get(
+        LIVE_DETAIL_URL.format(channel_id=channel_id),
+        endpoint="live_detail",
+        priority=PRIORITY_CRITICAL,  # 녹화 시작 직전 요청
+        headers=headers,
+    )
+    response.raise_for_status()
+    content = response.json().get("content") or {}
+    try:
+        playback = json.loads(content.get("livePlaybackJson") or "{}")
+    except json.JSONDecodeError as e:
+        raise HlsError(f"livePlaybackJson 파싱 오류: {e}")
+
+    media_list = [media for media in playback.get("media", []) if media.get("path")]
+    master = next((media for media in media_list if media.get("mediaId") == "HLS"), None)
+    if master is None:
+        raise HlsError("HLS 플레이리스트를 찾지 못했습니다.")
+
+    master_response = await get_media_client().get(master["path"])
+    master_response.raise_for_status()
+    variant = select_variant(parse_master_playlist(master_response.text, master["path"]), quality)
+    if variant is None:
+        # 마스터가 아니라 바로 미디어 플레이리스트인 경우
+        return master["path"]
+    return variant["uri"]
+
+
+class HlsRecorder:
+    """
+    streamlink 프로세스 없이 이벤트 루프 안에서 HLS 방송을 녹화합니다 (recorderBackend="native").
+    플레이리스트를 주기적으로 받아 새 세그먼트를 공유 연결 풀로 내려받고, 받은 바이트를 그대로 출력 파일 끝에 씁니다.
+    세그먼트는 최대 prefetch개까지 동시에 내려받으며, 기록 코루틴이 순서 버퍼에서 번호 순서대로 꺼내 씁니다.
+    chunk_duration(초)을 지정하면 세그먼트 경계에서 출력 파일을 바꾸며(프로세스 재시작 없이 끊김 없는 분할),
+    각 파일의 시작 PTS와 시작 시각을 "이름.chunks.json" 매니페스트에 기록합니다.
+    녹화 세션이 streamlink 프로세스와 같은 방식으로 다룰 수 있도록 ManagedProcess와 같은 메서드를 제공합니다.
+    """
+
+    pid = None  # 프로세스가 아니므로 PID 없음
+
+    def __init__(self, channel_id, output_path, quality="best", live_edge=LIVE_EDGE, prefetch=PREFETCH_SEGMENTS,
+                 chunk_duration=0, on_chunk_finished=None):
+        self.channel_id = channel_id
+        self.output_path = output_path  # 지금 기록 중인 파일 (분할 녹화면 파일이 바뀔 때마다 갱신)
+        self.chunk_duration = max(0, chunk_duration)
+        self.on_chunk_finished = on_chunk_finished  # on_chunk_finished(끝난 파일 경로, 다음 파일 경로)
+        self.manifest_path = manifest_path_for(output_path) if self.chunk_duration else None
+        self.chunks = []  # 분할 파일 목록 (매니페스트 내용)
+        self.quality = quality
+        self.live_edge = max(1, live_edge)
+        self.prefetch = max(1, prefetch)
+        self.playlist_url = None
+        self.returncode = None
+        self.task = None
+        self.last_seq = None  # 마지막으로 다운로드를 예약한 세그먼트 번호
+        self.first_seq = None  # 지금 미디어 시퀀스에서 처음 본 플레이리스트의 첫 세그먼트 번호 (시퀀스 초기화 감지용)
+        self.map_uri = None  # 마지막으로 예약한 초기화 세그먼트 (fMP4)
+        self.metrics = HlsCaptureMetrics()
+        self._file = None
+        self._base_path = output_path
+        self._init_data = None  # fMP4 초기화 세그먼트 (파일을 바꿀 때 새 파일 앞에 다시 씀)
+        self._stop_event = None
+        self._semaphore = None  # 동시 다운로드 수 제한
+        self._order = None  # 순서 버퍼: 다운로드 작업을 세그먼트 순서대로 담은 큐
+
+    async def start(self):
+        """플레이리스트 주소를 확인하고 녹화 코루틴을 시작합니다. 실패하면 HlsError나 httpx 예외가 발생합니다."""
+        self.playlist_url = await resolve_playlist_url(self.channel_id, self.quality)
+        self._stop_event = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(self.prefetch)
+        # 다운로드가 기록보다 너무 앞서가지 않도록 버퍼 크기 제한 (가득 차면 플레이리스트 확인이 기다림)
+        self._order = asyncio.Queue(maxsize=self.prefetch * 4)
+        self._open_chunk()
+        self.task = asyncio.ensure_future(self._run())
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        """이미 다운로드를 시작한 세그먼트까지 기록한 뒤 녹화를 끝냅니다."""
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def kill(self):
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+
+    async def wait(self):
+        if self.task is not None:
+            await asyncio.gather(self.task, return_exceptions=True)
+        return self.returncode
+
+    def get_stats(self):
+        return self.metrics.as_dict()
+
+    async def _run(self):
+        returncode = 1
+        failures = 0
+        writer = asyncio.ensure_future(self._write_loop())
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    playlist = await self._fetch_playlist()
+                    failures = 0
+                except (httpx.HTTPError, HlsError) as e:
+                    failures += 1
+                    print(f"[HLS] {self.channel_id} 플레이리스트 오류 ({failures}/{MAX_PLAYLIST_FAILURES}): {e}")
+                    if failures >= MAX_PLAYLIST_FAILURES:
+                        break
+                    await self._sleep(SEGMENT_TIMEOUT)
+                    continue
+
+                if playlist["segments"]:
+                    self.metrics.on_playlist(playlist["segments"][-1]["seq"])
+                new_segments = self._new_segments(playlist["segments"])
+                await self._schedule_segments(new_segments)
+                if self.metrics.should_report():
+                    print(f"[HLS] {self.channel_id} {self.metrics.summary()}")
+                if playlist["ended"]:
+                    returncode = 0
+                    break
+                # 새 세그먼트가 없으면 절반 간격으로 다시 확인
+                await self._sleep(playlist["target_duration"] if new_segments else playlist["target_duration"] / 2)
+            else:
+                returncode = 0  # terminate()로 정상 종료
+
+            # 예약한 세그먼트를 모두 기록할 때까지 대기
+            await self._order.put(None)
+            await writer
+        finally:
+            if not writer.done():
+                writer.cancel()
+                await asyncio.gather(writer, return_exceptions=True)
+            self._cancel_pending()
+            self._file.close()
+            if self.chunk_duration:
+                self.chunks[-1]["complete"] = True
+                self._write_manifest()
+            self.returncode = returncode if self.returncode is None else self.returncode
+            print(f"[HLS] {self.channel_id} 녹화 종료: {self.metrics.summary()}")
+
+    async def _fetch_playlist(self):
+        response = await get_media_client().get(self.playlist_url)
+        if response.status_code in (403, 404):
+            # 서명된 주소가 만료된 경우: live-detail에서 다시 찾음
+            self.playlist_url = await resolve_playlist_url(self.channel_id, self.quality)
+            response = await get_media_client().get(self.playlist_url)
+        response.raise_for_status()
+        return parse_media_playlist(response.text, self.playlist_url)
+
+    def _new_segments(self, segments):
+        if self.last_seq is not None and segments and self._sequence_reset(segments):
+            # 방송 재시작이나 CDN 변경으로 플레이리스트를 다시 찾으면 미디어 시퀀스가 처음부터 다시 시작됨
+            print(
+                f"[HLS] {self.channel_id} 미디어 시퀀스가 초기화되었습니다 "
+                f"({self.last_seq} -> {segments[0]['seq']}), 새 시퀀스부터 이어서 녹화합니다."
+            )
+            self.first_seq = segments[0]["seq"]
+            self.last_seq = self.first_seq - 1
+        if self.last_seq is None:
+            if segments:
+                self.first_seq = segments[0]["seq"]
+            segments = segments[-self.live_edge:]  # 처음에는 라이브 끝에서부터
+        else:
+            segments = [segment for segment in segments if segment["seq"] > self.last_seq]
+        if segments:
+            self.last_seq = segments[-1]["seq"]
+        return segments
+
+    def _sequence_reset(self, segments):
+        """
+        플레이리스트의 세그먼트 번호가 이미 받은 번호보다 작아졌을 때 시퀀스가 초기화되었는지 판단합니다.
+        처음 본 번호보다 앞에서 시작하거나 불연속(#EXT-X-DISCONTINUITY)이 있으면 초기화,
+        아니면 잠깐 이전 플레이리스트를 받은 것으로 보고 무시합니다.
+        """
+        if segments[-1]["seq"] >= self.last_seq:
+            return False
+        return segments[0]["seq"] < self.first_seq or any(segment["discontinuity"] for segment in segments)
+
+    async def _schedule_segments(self, segments):
+        """세그먼트 다운로드를 바로 시작하고, 기록 순서를 지키도록 작업을 순서 버퍼에 넣습니다."""
+        discovered_at = time.monotonic()
+        for segment in segments:
+            if segment["map_uri"] and segment["map_uri"] != self.map_uri:
+                self.map_uri = segment["map_uri"]
+                await self._order.put((None, self._start_fetch(segment["map_uri"]), discovered_at))
+            await self._order.put((segment, self._start_fetch(segment["uri"]), discovered_at))
+
+    def _start_fetch(self, uri):
+        return asyncio.ensure_future(self._fetch_segment(uri))
+
+    async def _write_loop(self):
+        while True:
+            item = await self._order.get()
+            if item is None:
+                break
+            segment, fetch, discovered_at = item
+            data = await fetch  # 뒤 세그먼트가 먼저 끝나도 앞 세그먼트를 기다렸다가 순서대로 기록
+            if segment is None:  # 초기화 세그먼트
+                if data is not None:
+                    self._init_data = data
+                    await self._write(data)
+                continue
+            if data is None:
+                self.metrics.on_missed(segment["seq"])
+                continue
+            if self.chunk_duration and self.chunks[-1]["duration"] >= self.chunk_duration:
+                await self._rotate_chunk()
+            await self._write(data)
+            self._update_chunk(segment, data)
+            self.metrics.on_written(segment["seq"], len(data), discovered_at)
+
+    def _open_chunk(self):
+        index = len(self.chunks) + 1
+        self.output_path = chunk_path_for(self._base_path, index)
+        # 버퍼 없이 열어 세그먼트 바이트를 중간 복사 없이 바로 파일에 씀
+        self._file = open(self.output_path, "ab", buffering=0)
+        self.chunks.append({
+            "index": index,
+            "path": os.path.basename(self.output_path),
+            "start_pts": None,  # 첫 세그먼트의 PTS (초)
+            "start_time": None,  # 첫 세그먼트를 기록한 시각 (epoch 초)
+            "duration": 0.0,  # 플레이리스트 기준 길이 (초)
+            "segments": 0,
+            "bytes": 0,
+            "complete": False,
+        })
+
+    def _update_chunk(self, segment, data):
+        chunk = self.chunks[-1]
+        if chunk["segments"] == 0:
+            chunk["start_pts"] = read_first_pts(data)
+            chunk["start_time"] = time.time()
+        chunk["segments"] += 1
+        chunk["bytes"] += len(data)
+        chunk["duration"] += segment["duration"]
+
+    async def _rotate_chunk(self):
+        """세그먼트 경계에서 다음 파일로 바꿉니다. 끝난 파일은 매니페스트에 완료로 기록하고 콜백으로 알립니다."""
+        finished_path = self.output_path
+        await asyncio.to_thread(self._file.close)
+        self.chunks[-1]["complete"] = True
+        self._open_chunk()
+        if self._init_data is not None:
+            await self._write(self._init_data)
+        await asyncio.to_thread(self._write_manifest)
+        print(f"[HLS] {self.channel_id} 분할 파일 완료: {os.path.basename(finished_path)}")
+        if self.on_chunk_finished is not None:
+            try:
+                self.on_chunk_finished(finished_path, self.output_path)
+            except Exception as e:
+                print(f"[HLS] {self.channel_id} 분할 파일 처리 중 오류: {e}")
+
+    def _write_manifest(self):
+        manifest = {
+            "channel_id": self.channel_id,
+            "chunk_duration": self.chunk_duration,
+            "chunks": self.chunks,
+        }
+        temp_path = self.manifest_path + ".tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=4, ensure_ascii=False)
+            os.replace(temp_path, self.manifest_path)
+        except OSError as e:
+            print(f"[HLS] {self.channel_id} 매니페스트 저장 실패: {e}")
+
+    def _cancel_pending(self):
+        while not self._order.empty():
+            item = self._order.get_nowait()
+            if item is not None:
+                item[1].cancel()
+
+    async def _fetch_segment(self, uri):
+        async with self._semaphore:
+            for attempt in range(SEGMENT_ATTEMPTS):
+                try:
+                    response = await get_media_client().get(uri)
+                    response.raise_for_status()
+                    return response.content
+                except httpx.HTTPError as e:
+                    if attempt + 1 == SEGMENT_ATTEMPTS:
+                        print(f"[HLS] {self.channel_id} 세그먼트 다운로드 실패, 건너뜀: {e}")
+                    else:
+                        await asyncio.sleep(min(2 ** attempt, SEGMENT_TIMEOUT))  # 잠깐 기다렸다가 다시 시도
+        return None
+
+    async def _write(self, data):
+        # 디스크 쓰기가 이벤트 루프(다른 채널 녹화)를 막지 않도록 스레드에서 실행
+        await asyncio.to_thread(self._write_all, data)
+
+    def _write_all(self, data):
+        """버퍼 없는 파일의 write는 일부만 기록할 수 있으므로 (short write) 모두 기록할 때까지 반복합니다."""
+        view = memoryview(data)
+        while view:
+            view = view[self._file.write(view):]
+
+    async def _sleep(self, seconds):
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,229 @@
+import ctypes
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from path_config import JOB_JOURNAL_PATH
+
+STILL_ACTIVE = 259  # GetExitCodeProcess: 아직 실행 중인 프로세스
+ERROR_ACCESS_DENIED = 5
+
+
+def process_alive(pid):
+    """pid 프로세스가 실행 중인지 확인합니다 (Windows는 OpenProcess, 그 외는 시그널 0)."""
+    if not pid:
+        return False
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        # Windows의 os.kill은 시그널 0에도 프로세스를 종료하므로 사용하지 않음
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return ctypes.get_last_error() == ERROR_ACCESS_DENIED  # 다른 사용자의 프로세스
+        try:
+            code = ctypes.c_ulong()
+            return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(code))) and code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobJournal:
+    """
+    녹화/후처리 상태를 기록하는 SQLite 저널입니다 (WAL 모드, json/journal.db).
+      - events: 녹화 시작/종료, 후처리 단계 변경 등을 시간순으로 쌓는 추가 전용 기록
+      - recordings: 녹화 파일별 상태 (recording / finished / failed / interrupted)
+      - jobs: 후처리 작업 상태와 단계 (queued / running / done / failed, 단계 remux / move)
+      - vods: 다운로드를 마친 VOD (VOD 번호와 화질별 저장 경로, 일괄 다운로드에서 중복 확인용)
+    프로그램이 비정상 종료되어도 다음 시작 때 끝나지 않은 녹화와 후처리 작업을 찾아 이어서 처리할 수 있습니다.
+    GUI와 record_daemon.py가 같은 저널을 함께 쓸 수 있으므로 녹화와 작업에는 기록한 프로세스(owner_pid)를 남기고,
+    그 프로세스가 끝난 기록만 복구합니다.
+    여러 스레드에서 함께 사용하므로 연결 하나를 락으로 보호합니다.
+    """
+
+    def __init__(self, path=JOB_JOURNAL_PATH):
+        self.path = path
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")  # WAL에서는 프로그램이 죽어도 커밋된 내용은 남음
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    time REAL NOT NULL,
+                    event TEXT NOT NULL,
+                    channel_id TEXT,
+                    path TEXT,
+                    data TEXT
+                );
+                CREATE TABLE IF NOT EXISTS recordings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    channel_id TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    started REAL NOT NULL,
+                    finished REAL,
+                    state TEXT NOT NULL,
+                    owner_pid INTEGER
+                );
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    updated REAL NOT NULL,
+                    owner_pid INTEGER
+                );
+                CREATE TABLE IF NOT EXISTS vods (
+                    vod_number TEXT NOT NULL,
+                    quality TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    finished REAL NOT NULL,
+                    PRIMARY KEY (vod_number, quality)
+                );
+                CREATE INDEX IF NOT EXISTS recordings_state ON recordings (state);
+                CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state);
+                """
+            )
+            for table in ("recordings", "jobs"):  # owner_pid가 없던 이전 저널
+                columns = [row["name"] for row in self._conn.execute(f"PRAGMA table_info({table})")]
+                if "owner_pid" not in columns:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN owner_pid INTEGER")
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            with self._conn:  # 문장 하나를 트랜잭션으로 커밋
+                return self._conn.execute(sql, params)
+
+    def log(self, event, channel_id=None, path=None, **data):
+        """이벤트 하나를 추가합니다."""
+        try:
+            self._execute(
+                "INSERT INTO events (time, event, channel_id, path, data) VALUES (?, ?, ?, ?, ?)",
+                (time.time(), event, channel_id, path, json.dumps(data, ensure_ascii=False) if data else None),
+            )
+        except sqlite3.Error as e:
+            print(f"[저널] 기록 중 오류 발생: {e}")
+
+    def recording_started(self, channel_id, path):
+        """녹화 파일 하나의 시작을 기록하고 기록 ID를 반환합니다."""
+        try:
+            with self._lock:
+                with self._conn:
+                    cursor = self._conn.execute(
+                        "INSERT INTO recordings (channel_id, path, started, state, owner_pid) VALUES (?, ?, ?, 'recording', ?)",
+                        (channel_id, path, time.time(), self.pid),
+                    )
+                    self._conn.execute(
+                        "INSERT INTO events (time, event, channel_id, path) VALUES (?, 'recording_started', ?, ?)",
+                        (time.time(), channel_id, path),
+                    )
+                return cursor.lastrowid
+        except sqlite3.Error as e:
+            print(f"[저널] 녹화 시작 기록 중 오류 발생: {e}")
+            return None
+
+    def recording_finished(self, recording_id, state="finished"):
+        if recording_id is None:
+            return
+        try:
+            with self._lock:
+                with self._conn:
+                    row = self._conn.execute(
+                        "SELECT channel_id, path FROM recordings WHERE id = ?", (recording_id,)
+                    ).fetchone()
+                    self._conn.execute(
+                        "UPDATE recordings SET finished = ?, state = ? WHERE id = ?",
+                        (time.time(), state, recording_id),
+                    )
+                    if row is not None:
+                        self._conn.execute(
+                            "INSERT INTO events (time, event, channel_id, path, data) VALUES (?, 'recording_finished', ?, ?, ?)",
+                            (time.time(), row["channel_id"], row["path"], json.dumps({"state": state})),
+                        )
+        except sqlite3.Error as e:
+            print(f"[저널] 녹화 종료 기록 중 오류 발생: {e}")
+
+    def take_interrupted_recordings(self):
+        """
+        (시작할 때 호출) 녹화 중 상태로 남아 있는 기록을 interrupted로 바꾸고 목록을 반환합니다.
+        이전 실행이 녹화 도중 비정상 종료된 경우이며, 아직 실행 중인 다른 프로세스의 녹화는 건드리지 않습니다.
+        """
+        with self._lock:
+            with self._conn:
+                rows = [
+                    row for row in self._conn.execute(
+                        "SELECT id, channel_id, path, started, owner_pid FROM recordings WHERE state = 'recording'"
+                    ).fetchall()
+                    if row["owner_pid"] != self.pid and not process_alive(row["owner_pid"])
+                ]
+                self._conn.executemany(
+                    "UPDATE recordings SET state = 'interrupted' WHERE id = ?", [(row["id"],) for row in rows]
+                )
+        return [{key: row[key] for key in ("id", "channel_id", "path", "started")} for row in rows]
+
+    def save_job(self, job):
+        """후처리 작업 상태를 저장합니다 (단계가 바뀔 때마다 호출)."""
+        data = {key: value for key, value in job.items() if key != "order"}
+        try:
+            with self._lock:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO jobs (id, data, state, updated, owner_pid) VALUES (?, ?, ?, ?, ?)",
+                        (job["id"], json.dumps(data, ensure_ascii=False), job["state"], time.time(), self.pid),
+                    )
+                    self._conn.execute(
+                        "INSERT INTO events (time, event, channel_id, path, data) VALUES (?, 'job', ?, ?, ?)",
+                        (
+                            time.time(), job.get("channel_id"), job.get("input_path"),
+                            json.dumps({"id": job["id"], "state": job["state"], "stage": job.get("stage")}),
+                        ),
+                    )
+        except sqlite3.Error as e:
+            print(f"[저널] 후처리 작업 저장 중 오류 발생: {e}")
+
+    def load_jobs(self, states=("queued", "running")):
+        """
+        끝나지 않은 후처리 작업을 반환합니다.
+        다른 프로세스가 실행 중이면 그 프로세스의 작업은 제외합니다 (두 프로세스가 같은 작업을 실행하지 않도록).
+        """
+        placeholders = ", ".join("?" for _ in states)
+        rows = self._execute(
+            f"SELECT data, owner_pid FROM jobs WHERE state IN ({placeholders}) ORDER BY updated", tuple(states)
+        ).fetchall()
+        return [
+            json.loads(row["data"]) for row in rows
+            if row["owner_pid"] == self.pid or not process_alive(row["owner_pid"])
+        ]
+
+    def vod_downloaded(self, vod_number, quality, path):
+        """VOD 다운로드 완료를 기록합니다."""
+        try:
+            self._execute(
+                "INSERT OR REPLACE INTO vods (vod_number, quality, path, finished) VALUES (?, ?, ?, ?)",
+                (str(vod_number), quality, path, time.time()),
+            )
+        except sqlite3.Error as e:
+            print(f"[저널] VOD 다운로드 기록 중 오류 발생: {e}")
+
+    def find_vod(self, vod_number, quality):
+        """이미 받은 VOD의 저장 경로를 반환합니다 (기록이 없으면 None)."""
+        row = self._execute(
+            "SELECT path FROM vods WHERE vod_number = ? AND quality = ?", (str(vod_number), quality)
+        ).fetchone()
+        return row["path"] if row is not None else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
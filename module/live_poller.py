@@ -0,0 +1,305 @@
+import asyncio
+import random
+import threading
+import time
+
+from api import get_async_client
+
+
+class LivePoller:
+    """
+    모든 채널의 방송 상태(live-detail)를 하나의 asyncio 루프와 하나의 공유 API 클라이언트로 확인하는 중앙 폴러입니다.
+    채널별 조회 시점을 재확인 주기 안에서 고르게 분산시키고, 상태 변화를 등록된 리스너에게 전달합니다.
+
+    리스너는 listener(event, channel_id, metadata) 형태로 호출되며 event는 다음 중 하나입니다.
+      - "live"    : 방송이 시작됨 (또는 첫 조회에서 방송 중)
+      - "offline" : 방송이 종료됨 (또는 첫 조회에서 방송 중이 아님)
+      - "updated" : 방송 상태는 그대로이고 메타데이터(제목, 카테고리 등)가 바뀜
+    메타데이터가 이전 조회 결과와 같으면 이벤트를 보내지 않습니다.
+    채널별 조회 횟수/실패 횟수는 get_stats()로 확인할 수 있습니다.
+    """
+
+    def __init__(self, fetch_metadata, interval=60, max_concurrency=10, interval_func=None, jitter=0.1):
+        self.fetch_metadata = fetch_metadata  # async fetch_metadata(channel, client) -> dict 또는 None
+        self.interval = max(1, int(interval))  # 기본 재확인 주기 (초)
+        self.interval_func = interval_func  # interval_func(channel_id, is_live) -> 채널별 재확인 주기 (초)
+        self.max_concurrency = max_concurrency  # 동시에 진행할 수 있는 최대 요청 수
+        self.jitter = min(max(0.0, jitter), 0.5)  # 조회 시각을 주기의 ±jitter 비율만큼 무작위로 흔듦
+        self.stats = {}  # channel_id -> {"polls", "failures", "last_poll"}
+        self.channels = {}  # channel_id -> 채널 정보
+        self.states = {}  # channel_id -> 마지막으로 조회한 메타데이터
+        self.generations = {}  # channel_id -> 조회 완료 횟수 (대기 중인 스레드 깨우기용)
+        self.listeners = []
+        self.client = None
+        self.loop = None
+        self._task = None
+        self._due = {}  # channel_id -> 다음 조회 시각 (time.monotonic 기준)
+        self._phase = {}  # channel_id -> 주기 내 분산 오프셋 (0~1, 주기에 대한 비율)
+        self._epoch = time.monotonic()
+        self._in_flight = set()
+        self._poll_tasks = set()  # 진행 중인 채널 조회 작업 (stop()에서 취소)
+        self._wakeup = None  # asyncio.Event, 루프 안에서 생성
+        self._condition = threading.Condition()  # 다른 스레드에서 상태를 기다릴 때 사용
+        self._waiters = []  # 루프 안에서 상태를 기다리는 코루틴의 future 목록
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def is_running(self):
+        return self._task is not None and not self._task.done()
+
+    def set_channels(self, channels):
+        """
+        폴링 대상 채널 목록을 갱신합니다. 새 채널은 즉시 한 번 조회한 뒤 분산된 주기로 조회됩니다.
+        """
+        now = time.monotonic()
+        new_ids = [channel["id"] for channel in channels]
+        count = max(1, len(new_ids))
+        for index, channel_id in enumerate(new_ids):
+            self._phase[channel_id] = index / count
+            if channel_id not in self.channels:
+                self._due[channel_id] = now
+        for channel_id in list(self.channels):
+            if channel_id not in new_ids:
+                self._due.pop(channel_id, None)
+                self._phase.pop(channel_id, None)
+        self.channels = {channel["id"]: channel for channel in channels}
+        self._notify_loop()
+
+    def request_refresh(self, channel_id=None):
+        """
+        지정한 채널(없으면 전체 채널)을 다음 루프에서 바로 조회하도록 예약합니다. 다른 스레드에서 호출해도 안전합니다.
+        """
+        if self.loop is not None and self.loop.is_running():
+            try:
+                running_loop = asyncio.get_running_loop()
+            except RuntimeError:
+                running_loop = None
+            if running_loop is not self.loop:
+                self.loop.call_soon_threadsafe(self.request_refresh, channel_id)
+                return
+
+        now = time.monotonic()
+        targets = [channel_id] if channel_id else list(self.channels)
+        for target in targets:
+            if target in self.channels:
+                self._due[target] = now
+        self._notify_loop()
+
+    def get_state(self, channel_id):
+        with self._condition:
+            return self.states.get(channel_id)
+
+    def is_live(self, channel_id):
+        state = self.get_state(channel_id)
+        return bool(state and state.get("open_live"))
+
+    def get_stats(self, channel_id=None):
+        """채널별 조회 통계(조회 횟수, 실패 횟수, 마지막 조회 시각, 현재 주기)의 복사본을 반환합니다."""
+        if channel_id is not None:
+            stats = dict(self.stats.get(channel_id) or {"polls": 0, "failures": 0, "last_poll": None})
+            stats["interval"] = self.interval_for(channel_id)
+            return stats
+        return {cid: self.get_stats(cid) for cid in self.channels}
+
+    def wait_interval(self, channel_id):
+        """(녹화 코루틴용) 방송 대기 상태에서 한 번에 기다릴 시간 (채널 주기에 지터 적용)"""
+        return self._jittered(self.interval_for(channel_id))
+
+    def _jittered(self, interval):
+        if not self.jitter:
+            return interval
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def wait_for_live(self, channel_id, timeout):
+        """
+        (녹화 스레드용) 채널이 방송 중이 될 때까지 최대 timeout초 동안 대기합니다.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: bool((self.states.get(channel_id) or {}).get("open_live")),
+                timeout=timeout,
+            )
+            return self.states.get(channel_id)
+
+    def refresh_and_wait(self, channel_id, timeout):
+        """
+        (녹화 스레드용) 채널을 즉시 다시 조회하고, 새 결과가 나올 때까지 최대 timeout초 동안 대기합니다.
+        """
+        with self._condition:
+            generation = self.generations.get(channel_id, 0)
+        self.request_refresh(channel_id)
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.generations.get(channel_id, 0) > generation, timeout=timeout
+            )
+            return self.states.get(channel_id)
+
+    async def wait_for_live_async(self, channel_id, timeout):
+        """
+        (녹화 코루틴용) 채널이 방송 중이 될 때까지 최대 timeout초 동안 대기합니다. 폴러와 같은 루프에서 호출해야 합니다.
+        """
+        await self._wait_until(
+            lambda: bool((self.states.get(channel_id) or {}).get("open_live")), timeout
+        )
+        return self.states.get(channel_id)
+
+    async def refresh_and_wait_async(self, channel_id, timeout):
+        """
+        (녹화 코루틴용) 채널을 즉시 다시 조회하고, 새 결과가 나올 때까지 최대 timeout초 동안 대기합니다.
+        """
+        generation = self.generations.get(channel_id, 0)
+        self.request_refresh(channel_id)
+        await self._wait_until(lambda: self.generations.get(channel_id, 0) > generation, timeout)
+        return self.states.get(channel_id)
+
+    async def _wait_until(self, predicate, timeout):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not predicate():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, timeout=remaining)
+            except asyncio.TimeoutError:
+                return predicate()
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        return True
+
+    def start(self, loop=None):
+        """폴러를 지정한 루프(없으면 현재 이벤트 루프)에서 시작합니다."""
+        if self.is_running():
+            return self._task
+        self.loop = loop or asyncio.get_event_loop()
+        self._task = self.loop.create_task(self.run())
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        tasks = list(self._poll_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.client = None  # 공유 클라이언트는 api.close_async_client()로 닫음
+
+    def _notify_loop(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def interval_for(self, channel_id):
+        if self.interval_func is None:
+            return self.interval
+        try:
+            return max(1, self.interval_func(channel_id, self.is_live(channel_id)))
+        except Exception as e:
+            print(f"[LivePoller] 재확인 주기 계산 중 예외 발생: {e}")
+            return self.interval
+
+    def _next_due(self, channel_id, now):
+        """채널 고유의 오프셋에 맞춰 다음 조회 시각을 계산합니다 (요청이 한 시점에 몰리지 않도록)."""
+        interval = self.interval_for(channel_id)
+        base = self._epoch + self._phase.get(channel_id, 0) * interval
+        periods = int((now - base) // interval) + 1
+        due = base + periods * interval
+        if self.jitter:
+            # 주기가 같은 채널끼리 조회 시각이 다시 맞물리지 않도록 지터 적용 (지난 시각이 되지 않게 보정)
+            due = max(now + 1, due + interval * random.uniform(-self.jitter, self.jitter))
+        return due
+
+    async def run(self):
+        self._wakeup = asyncio.Event()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.client = get_async_client()  # 연결 풀을 재사용하는 루프 공용 클라이언트
+        print(f"[LivePoller] {len(self.channels)}개 채널 폴링 시작 (기본 주기 {self.interval}초)")
+        try:
+            while True:
+                now = time.monotonic()
+                ready = [
+                    channel_id
+                    for channel_id, due in self._due.items()
+                    if due <= now and channel_id not in self._in_flight
+                ]
+                for channel_id in ready:
+                    self._in_flight.add(channel_id)
+                    self._due[channel_id] = self._next_due(channel_id, now)
+                    task = asyncio.ensure_future(self._poll_channel(channel_id, semaphore))
+                    self._poll_tasks.add(task)
+                    task.add_done_callback(self._poll_tasks.discard)
+
+                pending = [
+                    due for channel_id, due in self._due.items() if channel_id not in self._in_flight
+                ]
+                delay = max(0.0, min(pending) - time.monotonic()) if pending else self.interval
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._wakeup = None
+
+    async def _poll_channel(self, channel_id, semaphore):
+        try:
+            channel = self.channels.get(channel_id)
+            if channel is None:
+                return
+            stats = self.stats.setdefault(channel_id, {"polls": 0, "failures": 0, "last_poll": None})
+            async with semaphore:
+                stats["polls"] += 1
+                stats["last_poll"] = time.time()
+                try:
+                    metadata = await self.fetch_metadata(channel, self.client)
+                except Exception as e:
+                    print(f"[LivePoller] {channel.get('name', channel_id)} 조회 중 예외 발생: {e}")
+                    metadata = None
+            if metadata is None:
+                stats["failures"] += 1
+            self._publish(channel_id, metadata)
+        finally:
+            self._in_flight.discard(channel_id)
+            self._notify_loop()
+
+    def _publish(self, channel_id, metadata):
+        with self._condition:
+            previous = self.states.get(channel_id)
+            if metadata is not None:
+                self.states[channel_id] = metadata
+            self.generations[channel_id] = self.generations.get(channel_id, 0) + 1
+            self._condition.notify_all()
+        # 루프 안에서 기다리는 코루틴 깨우기 (_publish는 폴러 루프에서만 호출됨)
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+        if metadata is None:
+            return  # 조회 실패 시 이전 상태를 유지하고 이벤트를 보내지 않음
+
+        was_live = bool(previous and previous.get("open_live"))
+        is_live = bool(metadata.get("open_live"))
+        if previous is None or was_live != is_live:
+            event = "live" if is_live else "offline"
+        elif metadata is previous or metadata == previous:
+            return  # 변경 사항 없음
+        else:
+            event = "updated"
+
+        for listener in list(self.listeners):
+            try:
+                listener(event, channel_id, metadata)
+            except Exception as e:
+                print(f"[LivePoller] 리스너 처리 중 예외 발생: {e}")
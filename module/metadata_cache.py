@@ -0,0 +1,62 @@
+import hashlib
+
+
+class LiveMetadataCache:
+    """
+    채널별 live-detail 응답 캐시입니다.
+    마지막 응답의 본문 해시와 검증 헤더(ETag, Last-Modified)를 저장해 두었다가,
+    서버가 304를 돌려주거나 본문이 이전과 같으면 파싱된 메타데이터를 그대로 재사용합니다.
+    (livePlaybackJson 파싱과 인코딩 트랙 탐색을 건너뛰기 위함)
+    """
+
+    def __init__(self):
+        self.entries = {}  # channel_id -> {"digest", "etag", "last_modified", "quality", "metadata"}
+        self.hits = 0  # 캐시 재사용 횟수
+        self.misses = 0  # 새로 파싱한 횟수
+
+    @staticmethod
+    def digest(content):
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+    def conditional_headers(self, channel_id):
+        """이전 응답의 검증 헤더로 조건부 요청 헤더를 만듭니다."""
+        entry = self.entries.get(channel_id)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def lookup(self, channel_id, response, quality):
+        """
+        응답이 이전과 같으면 캐시된 메타데이터를, 달라졌거나 캐시가 없으면 None을 반환합니다.
+        녹화 품질 설정이 바뀐 경우에도 다시 파싱해야 하므로 None을 반환합니다.
+        """
+        entry = self.entries.get(channel_id)
+        if entry is None or entry["quality"] != quality:
+            self.misses += 1
+            return None
+
+        if response.status_code == 304 or entry["digest"] == self.digest(response.content):
+            self.hits += 1
+            return entry["metadata"]
+
+        self.misses += 1
+        return None
+
+    def store(self, channel_id, response, quality, metadata):
+        self.entries[channel_id] = {
+            "digest": self.digest(response.content),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "quality": quality,
+            "metadata": metadata,
+        }
+
+    def invalidate(self, channel_id=None):
+        if channel_id is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(channel_id, None)
@@ -8,6 +8,8 @@ CHANNELS_PATH = os.path.join(base_directory, 'json', 'channels.json')
 COOKIE_PATH = os.path.join(base_directory, 'json', 'cookie.json')
 yCOOKIE_PATH = os.path.join(base_directory, 'json', 'ycookie.txt')
 LOGIN_PATH = os.path.join(base_directory, 'json', 'login.json')
+LIVE_HISTORY_PATH = os.path.join(base_directory, 'json', 'live_history.json')
+JOB_JOURNAL_PATH = os.path.join(base_directory, 'json', 'journal.db')
 
 
 # ffmpeg 경로를 가져오는 함수
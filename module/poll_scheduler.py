@@ -0,0 +1,100 @@
+import json
+import os
+import time
+from datetime import datetime
+
+from path_config import LIVE_HISTORY_PATH
+
+
+class AdaptivePollScheduler:
+    """
+    채널별 방송 시작 기록을 바탕으로 재확인 주기를 정하는 스케줄러입니다.
+      - 평소 방송을 시작하던 시각 근처(hot_window 분 이내): hot_interval 초마다 확인
+      - 최근 dormant_days 일 동안 방송 기록이 없는 채널: dormant_interval 초마다 확인
+      - 그 외 (기록이 없는 새 채널 포함): base_interval 초마다 확인
+    방송 시작 기록은 json/live_history.json 에 저장되어 재시작 후에도 유지됩니다.
+    """
+
+    MAX_HISTORY = 30  # 채널별로 보관할 최대 방송 시작 기록 수
+
+    def __init__(self, base_interval=60, hot_interval=5, dormant_interval=300,
+                 hot_window=30, dormant_days=14, enabled=True, history_path=LIVE_HISTORY_PATH):
+        self.base_interval = max(1, int(base_interval))
+        self.hot_interval = max(1, int(hot_interval))
+        self.dormant_interval = max(self.base_interval, int(dormant_interval))
+        self.hot_window = int(hot_window)  # 분
+        self.dormant_days = int(dormant_days)
+        self.enabled = enabled
+        self.history_path = history_path
+        self.history = self.load_history()  # channel_id -> [방송 시작 시각(epoch 초), ...]
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            base_interval=config.get("recheckInterval", 60),
+            hot_interval=config.get("hotRecheckInterval", 5),
+            dormant_interval=config.get("dormantRecheckInterval", 300),
+            hot_window=config.get("hotWindowMinutes", 30),
+            enabled=config.get("adaptivePolling", True),
+        )
+
+    def load_history(self):
+        try:
+            with open(self.history_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_history(self):
+        try:
+            with open(self.history_path, "w", encoding="utf-8") as f:
+                json.dump(self.history, f, indent=4, ensure_ascii=False)
+        except Exception as e:
+            print(f"방송 기록 저장 중 오류 발생: {e}")
+
+    def record_start(self, channel_id, open_date=None):
+        """
+        방송 시작 시각을 기록합니다. open_date는 live-detail의 openDate("%Y-%m-%d %H:%M:%S") 값이며,
+        없으면 현재 시각을 사용합니다. 같은 방송을 여러 번 기록하지 않도록 중복은 무시합니다.
+        """
+        started_at = time.time()
+        if open_date:
+            try:
+                started_at = datetime.strptime(open_date, "%Y-%m-%d %H:%M:%S").timestamp()
+            except (TypeError, ValueError):
+                pass
+
+        starts = self.history.setdefault(channel_id, [])
+        if any(abs(started_at - previous) < 60 for previous in starts):
+            return
+        starts.append(started_at)
+        starts.sort()
+        del starts[:-self.MAX_HISTORY]
+        self.save_history()
+
+    def interval_for(self, channel_id, is_live=False, now=None):
+        """채널의 다음 재확인까지의 간격(초)을 반환합니다."""
+        if not self.enabled or is_live:
+            return self.base_interval
+
+        starts = self.history.get(channel_id)
+        if not starts:
+            return self.base_interval
+
+        now = now or time.time()
+        if now - starts[-1] > self.dormant_days * 86400:
+            return self.dormant_interval
+
+        # 하루 중 시각(분) 기준으로 과거 방송 시작 시각과의 거리를 계산 (자정 전후도 고려)
+        now_minute = self._minute_of_day(now)
+        for started_at in starts:
+            distance = abs(now_minute - self._minute_of_day(started_at))
+            distance = min(distance, 1440 - distance)
+            if distance <= self.hot_window:
+                return self.hot_interval
+        return self.base_interval
+
+    @staticmethod
+    def _minute_of_day(timestamp):
+        local = datetime.fromtimestamp(timestamp)
+        return local.hour * 60 + local.minute
@@ -0,0 +1,231 @@
+import asyncio
+import itertools
+import os
+import subprocess
+import threading
+import time
+import uuid
+
+# 작업 우선순위 (숫자가 작을수록 먼저 실행)
+PRIORITY_HIGH = 0  # 사용자가 직접 요청한 후처리
+PRIORITY_NORMAL = 1  # 녹화가 끝난 파일
+PRIORITY_LOW = 2  # 아직 방송 중인 채널의 분할 파일
+
+KIND_REMUX = "remux"  # 스트림 복사 (디스크 I/O 위주)
+KIND_ENCODE = "encode"  # 다시 인코딩 (CPU/GPU 위주)
+
+
+def default_limits(cpu_count=None):
+    """
+    코어 수에 맞춘 기본 동시 실행 수 (전체, 스트림 복사, 인코딩)를 반환합니다.
+    스트림 복사는 디스크 속도가 한계라 같은 디스크에 동시에 여러 개를 돌리면 오히려 느려지므로 2개로 제한하고,
+    인코딩은 ffmpeg 하나가 여러 코어를 쓰므로 코어 4개당 1개로 제한합니다.
+    """
+    cpu_count = cpu_count or os.cpu_count() or 2
+    return max(1, min(cpu_count // 2, 4)), 2, max(1, cpu_count // 4)
+
+
+class PostProcessingQueue:
+    """
+    녹화 후처리 작업 큐입니다.
+    작업은 우선순위 순서로 실행되며 전체 동시 실행 수와 종류별(스트림 복사/인코딩) 동시 실행 수를 따로 제한합니다.
+    작업 상태와 단계는 저널(JobJournal)에 기록되어 프로그램을 다시 시작하면 끝나지 않은 작업을 이어서 실행합니다.
+    submit()은 어느 스레드에서 호출해도 안전하며, 작업 실행은 start()에 넘긴 이벤트 루프에서 합니다.
+    """
+
+    def __init__(self, run_job, journal, workers=0, remux_limit=0, encode_limit=0):
+        default_workers, default_remux, default_encode = default_limits()
+        self.run_job = run_job  # async run_job(job): 작업 하나를 실행 (실패하면 예외 발생)
+        self.workers = int(workers) or default_workers
+        self.limits = {
+            KIND_REMUX: int(remux_limit) or default_remux,
+            KIND_ENCODE: int(encode_limit) or default_encode,
+        }
+        self.journal = journal
+        self.jobs = {}  # job_id -> 작업 딕셔너리
+        self.loop = None
+        self._order = itertools.count()  # 같은 우선순위에서는 먼저 들어온 작업부터
+        self._running = {}  # job_id -> asyncio.Task
+        self._processes = {}  # job_id -> 작업이 실행 중인 ffmpeg 프로세스 (stop()에서 종료)
+        self._stopping = False
+        self._changed = None
+        self._dispatcher = None
+        self._lock = threading.Lock()
+        self.load()
+
+    @classmethod
+    def from_config(cls, config, run_job, journal):
+        return cls(
+            run_job,
+            journal,
+            workers=config.get("postProcessingWorkers", 0),
+            remux_limit=config.get("postProcessingRemuxLimit", 0),
+            encode_limit=config.get("postProcessingEncodeLimit", 0),
+        )
+
+    def load(self):
+        """저널에서 끝나지 않은 작업을 불러옵니다 (복구)."""
+        for job in self.journal.load_jobs():
+            if job.get("state") == "running":
+                job["state"] = "queued"  # 실행 중에 프로그램이 종료된 작업은 기록된 단계부터 다시 실행
+            job["order"] = next(self._order)
+            self.jobs[job["id"]] = job
+        pending = sum(1 for job in self.jobs.values() if job["state"] == "queued")
+        if pending:
+            print(f"[후처리 큐] 이전에 끝나지 않은 후처리 작업 {pending}개를 이어서 실행합니다.")
+
+    def set_stage(self, job, stage, **fields):
+        """작업의 진행 단계를 바꾸고 저널에 기록합니다 (예: 후처리가 끝나 파일 이동만 남은 경우 "move")."""
+        job["stage"] = stage
+        job.update(fields)
+        self.journal.save_job(job)
+
+    def start(self, loop):
+        """loop에서 작업 실행을 시작합니다 (이미 시작했으면 무시)."""
+        if self.loop is not None or loop is None:
+            return
+        self.loop = loop
+        self._stopping = False
+        loop.call_soon_threadsafe(self._start_dispatcher)
+
+    def _start_dispatcher(self):
+        self._changed = asyncio.Event()
+        self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+    async def stop(self):
+        """
+        새 작업 실행을 멈추고 실행 중인 작업을 취소합니다 (작업이 실행한 ffmpeg 프로세스도 종료).
+        취소한 작업은 저널에 대기 상태로 기록되어 다음 시작 때 기록된 단계부터 다시 실행됩니다.
+        """
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        with self._lock:
+            self._stopping = True
+            processes = list(self._processes.values())
+        for process in processes:
+            self._terminate(process)
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if processes:
+            await asyncio.to_thread(self._wait_processes, processes)
+        self.loop = None
+
+    def attach_process(self, job, process):
+        """작업이 실행한 외부 프로세스를 등록합니다 (작업 스레드에서 호출). 이미 멈추는 중이면 바로 종료합니다."""
+        with self._lock:
+            self._processes[job["id"]] = process
+            stopping = self._stopping
+        if stopping:
+            self._terminate(process)
+
+    @staticmethod
+    def _terminate(process):
+        try:
+            if process.poll() is None:
+                process.terminate()
+        except OSError:
+            pass
+
+    @staticmethod
+    def _wait_processes(processes, timeout=5):
+        """(블로킹) 종료를 요청한 프로세스가 끝나기를 기다리고, timeout 초가 지나도 남아 있으면 강제 종료합니다."""
+        deadline = time.monotonic() + timeout
+        for process in processes:
+            try:
+                process.wait(timeout=max(0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    def submit(self, channel_id, input_path, output_path, kind=KIND_REMUX, priority=PRIORITY_NORMAL):
+        """후처리 작업을 큐에 넣고 작업 ID를 반환합니다."""
+        job = {
+            "id": uuid.uuid4().hex,
+            "channel_id": channel_id,
+            "input_path": input_path,
+            "output_path": output_path,
+            "kind": kind if kind in self.limits else KIND_REMUX,
+            "priority": priority,
+            "state": "queued",
+            "stage": "remux",  # remux: ffmpeg 후처리부터, move: 파일 이동만 남음
+            "created": time.time(),
+            "error": None,
+            "order": next(self._order),
+        }
+        with self._lock:
+            self.jobs[job["id"]] = job
+        self.journal.save_job(job)
+        self._notify()
+        queued = sum(1 for job in self.jobs.values() if job["state"] == "queued")
+        print(f"[후처리 큐] 작업 추가: {os.path.basename(input_path)} (대기 {queued}개, 실행 중 {len(self._running)}개)")
+        return job["id"]
+
+    def get_stats(self):
+        with self._lock:
+            stats = {"queued": 0, "running": 0, "failed": 0}
+            for job in self.jobs.values():
+                if job["state"] in stats:
+                    stats[job["state"]] += 1
+        stats["workers"] = self.workers
+        stats["limits"] = dict(self.limits)
+        return stats
+
+    def _notify(self):
+        loop = self.loop
+        if loop is not None and self._changed is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._changed.set)
+
+    def _next_job(self):
+        """지금 실행할 수 있는 작업 중 우선순위가 가장 높은 작업을 고릅니다."""
+        if len(self._running) >= self.workers:
+            return None
+        running_kinds = {}
+        for job_id in self._running:
+            kind = self.jobs[job_id]["kind"]
+            running_kinds[kind] = running_kinds.get(kind, 0) + 1
+        with self._lock:
+            candidates = [
+                job for job in self.jobs.values()
+                if job["state"] == "queued" and running_kinds.get(job["kind"], 0) < self.limits[job["kind"]]
+            ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda job: (job["priority"], job["order"]))
+
+    async def _dispatch(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                await self._changed.wait()
+                self._changed.clear()
+                continue
+            job["state"] = "running"
+            self.journal.save_job(job)
+            self._running[job["id"]] = asyncio.ensure_future(self._run(job))
+
+    async def _run(self, job):
+        started = time.monotonic()
+        try:
+            await self.run_job(job)
+            job["state"] = "done"
+            print(f"[후처리 큐] 작업 완료: {os.path.basename(job['input_path'])} ({time.monotonic() - started:.0f}초)")
+        except asyncio.CancelledError:
+            job["state"] = "queued"  # 종료로 취소됨: 다음 시작 때 다시 실행
+            raise
+        except Exception as e:
+            job["state"] = "failed"
+            job["error"] = str(e)
+            print(f"[후처리 큐] 작업 실패: {os.path.basename(job['input_path'])}: {e}")
+        finally:
+            self._running.pop(job["id"], None)
+            with self._lock:
+                self._processes.pop(job["id"], None)
+            if job["state"] == "done":
+                with self._lock:
+                    self.jobs.pop(job["id"], None)
+            self.journal.save_job(job)
+            if self._changed is not None:
+                self._changed.set()
@@ -0,0 +1,172 @@
+import asyncio
+import threading
+import time
+
+# 요청 우선순위 (숫자가 작을수록 먼저 처리)
+PRIORITY_CRITICAL = 0  # 녹화 시작 직전의 방송 상태 확인
+PRIORITY_NORMAL = 1  # 채팅 재연결, 녹화 중인 채널 확인 등
+PRIORITY_LOW = 2  # UI 썸네일/메타데이터 갱신, VOD 정보 조회
+
+# 우선순위별로 버킷에 남겨 두어야 하는 토큰 비율.
+# 낮은 우선순위 요청은 여유 토큰이 있을 때만 나가므로, 요청이 몰리면 높은 우선순위 요청이 먼저 처리됩니다.
+PRIORITY_RESERVE = {
+    PRIORITY_CRITICAL: 0.0,
+    PRIORITY_NORMAL: 0.25,
+    PRIORITY_LOW: 0.5,
+}
+
+DEFAULT_RATE = 5.0  # 호스트별 초당 요청 수
+DEFAULT_BURST = 10  # 호스트별 최대 순간 요청 수
+DEFAULT_BACKOFF = 5.0  # 429/503 응답에 Retry-After가 없을 때 요청을 멈출 시간 (초)
+MAX_BACKOFF = 300.0
+MAX_WAIT_STEP = 1.0  # 대기 중에도 이 간격으로 다시 확인 (백오프 해제, 설정 변경 반영)
+THROTTLE_STATUS = (429, 503)
+
+
+class TokenBucket:
+    """
+    호스트 하나의 요청 예산입니다. 초당 rate개의 토큰이 burst개까지 쌓이며 요청마다 토큰 하나를 씁니다.
+    여러 스레드와 이벤트 루프에서 함께 사용하므로 내부 상태는 락으로 보호합니다.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = max(0.01, float(rate))
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.blocked_until = 0.0  # 429/503 응답 후 이 시각(monotonic)까지 모든 요청 중지
+        self.acquired = 0  # 통과한 요청 수
+        self.waited = 0.0  # 토큰을 기다린 총 시간 (초)
+        self.throttled = 0  # 429/503 응답 수
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, priority=PRIORITY_NORMAL):
+        """토큰을 얻으면 0을, 얻지 못하면 다시 시도할 때까지 기다릴 시간(초)을 반환합니다."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            self._refill(now)
+            required = 1.0 + self.burst * PRIORITY_RESERVE.get(priority, PRIORITY_RESERVE[PRIORITY_LOW])
+            required = min(required, self.burst)
+            if self.tokens >= required:
+                self.tokens -= 1.0
+                self.acquired += 1
+                return 0.0
+            return (required - self.tokens) / self.rate
+
+    def penalize(self, retry_after):
+        """서버가 요청을 제한했을 때 retry_after초 동안 이 호스트로의 요청을 멈춥니다."""
+        with self._lock:
+            self.throttled += 1
+            self.tokens = 0.0
+            self._updated = time.monotonic()
+            self.blocked_until = max(self.blocked_until, self._updated + retry_after)
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class RateLimiter:
+    """
+    치지직 API 요청을 호스트별 토큰 버킷으로 조절하는 프로세스 공용 리미터입니다.
+    api.py의 공유 클라이언트가 요청 전에 acquire/acquire_async를, 응답 후에 observe를 호출합니다.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, host_limits=None):
+        self.rate = rate
+        self.burst = burst
+        self.host_limits = dict(host_limits or {})  # host -> (rate, burst)
+        self.buckets = {}  # host -> TokenBucket
+        self._lock = threading.Lock()
+
+    def configure(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, host_limits=None):
+        """기본 예산과 호스트별 예산을 바꿉니다. 이미 만든 버킷은 다음 요청부터 새 예산을 사용합니다."""
+        with self._lock:
+            self.rate = rate
+            self.burst = burst
+            self.host_limits = dict(host_limits or {})
+            self.buckets.clear()
+
+    def bucket(self, host):
+        with self._lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                rate, burst = self.host_limits.get(host, (self.rate, self.burst))
+                bucket = TokenBucket(rate, burst)
+                self.buckets[host] = bucket
+            return bucket
+
+    def acquire(self, host, priority=PRIORITY_NORMAL):
+        """(동기) 토큰을 얻을 때까지 현재 스레드를 멈춥니다."""
+        bucket = self.bucket(host)
+        while True:
+            wait = bucket.try_acquire(priority)
+            if not wait:
+                return
+            wait = min(wait, MAX_WAIT_STEP)
+            bucket.waited += wait
+            time.sleep(wait)
+
+    async def acquire_async(self, host, priority=PRIORITY_NORMAL):
+        """(비동기) 토큰을 얻을 때까지 기다립니다. 기다리는 동안 이벤트 루프는 막지 않습니다."""
+        bucket = self.bucket(host)
+        while True:
+            wait = bucket.try_acquire(priority)
+            if not wait:
+                return
+            wait = min(wait, MAX_WAIT_STEP)
+            bucket.waited += wait
+            await asyncio.sleep(wait)
+
+    def observe(self, host, response):
+        """응답 상태를 확인해 429/503이면 Retry-After(없으면 DEFAULT_BACKOFF초) 동안 호스트 요청을 멈춥니다."""
+        if response.status_code not in THROTTLE_STATUS:
+            return
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        self.bucket(host).penalize(retry_after)
+        print(f"[RateLimiter] {host} 요청 제한 ({response.status_code}), {retry_after:.0f}초 동안 요청을 멈춥니다.")
+
+    def get_stats(self):
+        """호스트별 통계 (통과한 요청 수, 기다린 시간, 요청 제한 응답 수)"""
+        with self._lock:
+            buckets = dict(self.buckets)
+        return {
+            host: {
+                "acquired": bucket.acquired,
+                "waited": round(bucket.waited, 2),
+                "throttled": bucket.throttled,
+            }
+            for host, bucket in buckets.items()
+        }
+
+
+def parse_retry_after(value):
+    try:
+        return min(MAX_BACKOFF, max(0.0, float(value)))
+    except (TypeError, ValueError):
+        return DEFAULT_BACKOFF
+
+
+_rate_limiter = RateLimiter()
+
+
+def get_rate_limiter():
+    """프로세스 전체에서 공유하는 리미터를 반환합니다."""
+    return _rate_limiter
+
+
+def configure_rate_limiter(config):
+    """config.json 설정(apiRateLimit, apiRateBurst, apiHostRateLimits)을 공유 리미터에 적용합니다."""
+    host_limits = {}
+    for host, limit in (config.get("apiHostRateLimits") or {}).items():
+        try:
+            host_limits[host] = (float(limit["rate"]), float(limit["burst"]))
+        except (KeyError, TypeError, ValueError):
+            print(f"[RateLimiter] {host} 요청 예산 설정이 올바르지 않아 기본값을 사용합니다: {limit}")
+    _rate_limiter.configure(
+        rate=float(config.get("apiRateLimit", DEFAULT_RATE)),
+        burst=float(config.get("apiRateBurst", DEFAULT_BURST)),
+        host_limits=host_limits,
+    )
@@ -0,0 +1,918 @@
+import os
+import shutil
+import json
+import threading
+import re
+import asyncio
+import httpx
+from datetime import datetime
+
+from channel_manager import (
+    load_channels,
+    save_channels,
+    load_config,
+    save_config,
+)
+from copy_streams import copy_specific_file
+from path_config import (
+    base_directory,
+    getFFmpeg,
+    getStreamlink,
+)  # getFFmpeg, getStreamlink 임포트
+
+# api.py 관련 import
+from api import (
+    load_cookies,
+    get_cached_headers,
+    fetch_channelName,
+    close_async_client,
+    cookie_store,
+    ENDPOINT_TIMEOUTS,
+)
+from hls_recorder import close_media_client
+from job_journal import JobJournal
+from live_poller import LivePoller
+from metadata_cache import LiveMetadataCache
+from poll_scheduler import AdaptivePollScheduler
+from postprocess_queue import (
+    KIND_ENCODE,
+    KIND_REMUX,
+    PRIORITY_LOW as POSTPROCESS_PRIORITY_LOW,
+    PRIORITY_NORMAL as POSTPROCESS_PRIORITY_NORMAL,
+    PostProcessingQueue,
+)
+from remux_pipeline import PipelinedRemux
+from rate_limiter import configure_rate_limiter, PRIORITY_CRITICAL, PRIORITY_NORMAL, PRIORITY_LOW
+from recording_supervisor import RecordingSupervisor
+
+class BoundSignal:
+    """Signal을 인스턴스에서 꺼냈을 때의 객체입니다. connect/disconnect/emit을 제공합니다."""
+
+    def __init__(self):
+        self._slots = []
+        self._lock = threading.Lock()
+
+    def connect(self, slot):
+        with self._lock:
+            self._slots.append(slot)
+
+    def disconnect(self, slot=None):
+        with self._lock:
+            if slot is None:
+                self._slots.clear()
+            elif slot in self._slots:
+                self._slots.remove(slot)
+
+    def emit(self, *args):
+        with self._lock:
+            slots = list(self._slots)
+        for slot in slots:
+            try:
+                slot(*args)
+            except Exception as e:
+                print(f"시그널 처리 중 예외 발생: {e}")
+
+
+class Signal:
+    """
+    PyQt5 없이 사용할 수 있는 pyqtSignal 대용 시그널입니다 (클래스 속성으로 선언, 인스턴스마다 따로 생성).
+    슬롯은 emit을 호출한 스레드에서 바로 실행됩니다.
+    GUI의 LiveRecorder는 같은 이름의 pyqtSignal로 덮어써서 Qt의 스레드 간 전달을 그대로 사용합니다.
+    """
+
+    def __init__(self, *types):
+        self.types = types
+        self.attr_name = None
+
+    def __set_name__(self, owner, name):
+        self.attr_name = f"_signal_{name}"
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        bound = instance.__dict__.get(self.attr_name)
+        if bound is None:
+            bound = instance.__dict__[self.attr_name] = BoundSignal()
+        return bound
+
+
+class RecorderCore:
+    """
+    PyQt5에 의존하지 않는 녹화 관리자입니다 (방송 상태 폴링, 녹화 명령 생성, 녹화 세션, 후처리).
+    GUI(Live_recorder.LiveRecorder)와 헤드리스 데몬(record_daemon.py)이 함께 사용합니다.
+    """
+    instance = None
+    metadata_updated = Signal(str, object)  # 메타데이터 업데이트 시그널
+    recording_finished = Signal(str)  # 녹화 종료 시그널
+    recording_started = Signal(str)  # 녹화 시작 시그널
+    chat_started = Signal(str)  # 채팅 시작 시그널
+    chat_stopped = Signal(str)  # 채팅 중지 시그널
+
+    def __init__(self, channels, default_thumbnail_path=None):
+        super().__init__()
+        type(self).instance = self
+        self.loop = None  # 폴러와 후처리 작업이 실행되는 이벤트 루프 (start_live_poller에서 설정)
+        self.reload_channels = True  # 녹화 시작 때 channels.json을 다시 읽을지 여부 (데몬은 명령행 선택 유지를 위해 False)
+        self.supervisor = RecordingSupervisor(self)  # 모든 채널의 녹화 세션을 하나의 이벤트 루프에서 관리
+        self.recording_processes = {}  # 채널별 녹화 프로세스 관리
+        self.recording_start_times = {}  # 채널별 녹화 시작 시간
+        self.recording_requested = {}  # 녹화 요청 상태 (더 이상 사용하지 않음)
+        self.recording_status = {}  # 채널별 녹화 상태 (True/False)
+        self.recording_filenames = {}  # 채널별 녹화 파일명
+        self.live_metadata = {}  # 채널별 메타데이터 저장
+        self.metadata_cache = LiveMetadataCache()  # live-detail 응답 캐시 (변경 없으면 파싱 생략)
+        self.api_request_counts = {}  # 채널별 live-detail 요청 횟수 (재시도, 304 재요청 포함)
+        self.channels = channels  # 채널 목록
+        self.config = load_config()  # 설정 불러오기
+        configure_rate_limiter(self.config)  # 호스트별 API 요청 예산 적용
+        self.recheck_interval = int(
+            self.config.get("recheckInterval", 60)
+        )  # 메타데이터 확인 간격
+        self.auto_stop_interval = int(
+            self.config.get("autoStopInterval", 0)
+        )  # 자동 중지 간격
+        self.show_message_box = self.config.get("showMessageBox", True)  # 메시지 박스 표시 여부
+        self.auto_dsc = self.config.get("autoPostProcessing", False)  # 자동 후처리 여부
+        self.filename_pattern = self.config.get(  # 파일 이름 패턴
+            "filenamePattern",
+            "[{start_time}] {channel_name} {safe_live_title} {record_quality}{frame_rate}{file_extension}",
+        )
+        self.deleteAfterPostProcessing = self.config.get(  # 후처리 후 삭제 여부
+            "deleteAfterPostProcessing", False
+        )
+        self.post_processing_output_dir = self.config.get(
+            "postProcessingOutputDir", ""
+        )  # 후처리 출력 폴더
+        self.chat_processes = {}  # 채팅 프로세스 저장
+        self.chat_log_paths = {}  # 채팅 로그 경로 <--- 이제 사용안함.
+        self.chat_status = {}  # 채널별 채팅 상태
+        self.chat_engine = None  # chatMode가 "engine"일 때 사용하는 채팅 엔진 (처음 사용할 때 생성)
+        self.chat_engine_unavailable = False  # websockets가 없어 채팅 엔진을 만들 수 없으면 True
+        self.fixed_file_paths = {}
+        self.remux_pipelines = {}  # 채널별 녹화 중 후처리 파이프라인 (pipelinedPostProcessing)
+        # 녹화/후처리 상태 저널 (비정상 종료 후 복구용, json/journal.db)
+        self.journal = JobJournal()
+        self.journal_recordings = {}  # 채널별 저널의 현재 녹화 기록 ID
+        # 후처리 작업 큐 (동시에 실행하는 ffmpeg 수 제한, 재시작 후 이어서 실행)
+        self.postprocess_queue = PostProcessingQueue.from_config(self.config, self.runPostProcessingJob, self.journal)
+
+        # 채널별 방송 시작 기록에 따라 재확인 주기를 조절하는 스케줄러
+        self.poll_scheduler = AdaptivePollScheduler.from_config(self.config)
+        # 모든 채널의 방송 상태를 하나의 클라이언트로 확인하는 중앙 폴러
+        self.live_poller = LivePoller(
+            self.get_live_metadata,
+            interval=self.recheck_interval,
+            interval_func=self.poll_scheduler.interval_for,
+            jitter=float(self.config.get("pollJitter", 0.1)),
+        )
+        self.live_poller.add_listener(self.on_live_event)
+
+        if default_thumbnail_path is None:  # 기본 썸네일 이미지 경로
+            self.default_thumbnail_path = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+                "dependent",
+                "img",
+                "default_thumbnail.png",
+            )
+        else:
+            self.default_thumbnail_path = default_thumbnail_path
+
+        # 모든 채널에 대해 chat_status를 False로 초기화
+        for channel in self.channels:
+            self.chat_status[channel["id"]] = False
+
+        self.recover_interrupted_recordings()
+
+    def recover_interrupted_recordings(self):
+        """
+        이전 실행이 녹화 도중 비정상 종료되어 녹화 중 상태로 남은 파일을 찾습니다.
+        자동 후처리가 켜져 있으면 남아 있는 파일을 후처리 큐에 넣습니다 (끝나지 않은 후처리 작업은 큐가 직접 복구).
+        """
+        try:
+            interrupted = self.journal.take_interrupted_recordings()
+        except Exception as e:
+            print(f"[저널] 중단된 녹화 확인 중 오류 발생: {e}")
+            return
+        recovered = 0
+        for recording in interrupted:
+            file_path = recording["path"]
+            if not os.path.exists(file_path):
+                continue
+            print(f"[저널] 비정상 종료로 중단된 녹화 파일: {file_path}")
+            if self.auto_dsc:
+                self.schedulePostProcessing(recording["channel_id"], file_path, priority=POSTPROCESS_PRIORITY_LOW)
+                recovered += 1
+        if interrupted:
+            print(f"[저널] 중단된 녹화 {len(interrupted)}개 중 {recovered}개를 후처리 큐에 넣었습니다.")
+
+    def findChannelNameById(self, channel_id):
+        """채널 ID를 이용하여 채널 이름을 찾습니다."""
+        for channel in self.channels:
+            if channel["id"] == channel_id:
+                return channel["name"]
+        return None
+
+    # 설정에 따라 알림 표시 여부 결정 (GUI에서는 메시지 박스로 표시)
+    def auto_close_message_box(self, title, text, timeout=5000):
+        if not self.show_message_box:
+            return
+        print(f"[{title}] {text}")
+
+    def _count_api_request(self, channel_id):
+        self.api_request_counts[channel_id] = self.api_request_counts.get(channel_id, 0) + 1
+
+    def metadata_priority(self, channel):
+        """
+        live-detail 요청 우선순위를 정합니다.
+        방송이 시작되면 바로 녹화해야 하는 채널이 먼저, UI 표시용으로만 확인하는 채널이 마지막입니다.
+        """
+        if not channel.get("record_enabled", False):
+            return PRIORITY_LOW
+        if self.config.get("auto_record_mode", False) and not self.recording_status.get(channel["id"], False):
+            return PRIORITY_CRITICAL
+        return PRIORITY_NORMAL
+
+    def get_channel_stats(self):
+        """채널별 방송 확인 통계 (폴러 조회/실패 횟수, 실제 HTTP 요청 횟수, 현재 재확인 주기, 내장 녹화기 지표)"""
+        stats = self.live_poller.get_stats()
+        for channel_id, channel_stats in stats.items():
+            channel_stats["requests"] = self.api_request_counts.get(channel_id, 0)
+            process = self.recording_processes.get(channel_id)
+            if hasattr(process, "get_stats"):  # 내장 HLS 녹화기의 처리량/지연 지표
+                channel_stats["capture"] = process.get_stats()
+        return stats
+
+    async def get_live_metadata(self, channel, client, retries=3, delay=3):
+        """
+        주어진 채널의 라이브 메타데이터를 가져옵니다.
+        """
+        # print(f"get_live_metadata called for channel: {channel['name']}")  # 함수 호출 확인
+        timeout = ENDPOINT_TIMEOUTS["live_detail"]  # 연결 30초, 읽기 60초
+        # 공유 API 클라이언트(api.get_async_client)는 요청 우선순위를 받지만 httpx.AsyncClient는 받지 않음
+        request_kwargs = {} if isinstance(client, httpx.AsyncClient) else {"priority": self.metadata_priority(channel)}
+        for attempt in range(retries):
+            try:
+                headers = get_cached_headers()  # 메모리에 캐시된 쿠키 헤더 (파일이 바뀔 때만 다시 읽음)
+                if headers is None:  # 쿠키 로드 실패 처리
+                    # print(
+                    #     f"Error: Could not load cookies. Metadata fetch failed for {channel['name']}."
+                    # )
+                    return None
+                headers.update(self.metadata_cache.conditional_headers(channel["id"]))
+                url = f"https://api.chzzk.naver.com/service/v3/channels/{channel['id']}/live-detail"
+
+                # print(f"Requesting URL: {url}")  # URL 확인
+                # print(f"Headers: {headers}")    # 헤더 확인
+
+                self._count_api_request(channel["id"])
+                response = await client.get(url, headers=headers, timeout=timeout, **request_kwargs)
+                if response.status_code != 304:
+                    response.raise_for_status()
+
+                record_quality_setting = channel.get("quality", "best")
+
+                # 응답이 이전과 같으면 livePlaybackJson 파싱 없이 캐시된 메타데이터 재사용
+                cached_metadata = self.metadata_cache.lookup(
+                    channel["id"], response, record_quality_setting
+                )
+                if cached_metadata is not None:
+                    self.live_metadata[channel["id"]] = cached_metadata
+                    return cached_metadata
+                if response.status_code == 304:  # 캐시가 없는데 304를 받은 경우: 조건 없이 다시 요청
+                    self.metadata_cache.invalidate(channel["id"])
+                    self._count_api_request(channel["id"])
+                    response = await client.get(url, headers=get_cached_headers(), timeout=timeout, **request_kwargs)
+                    response.raise_for_status()
+
+                data = response.json()
+                # print(f"Response data: {data}")   # 응답 데이터 확인
+                metadata_content = data.get("content")
+                if metadata_content is None:
+                    return None
+
+                try:
+                    thumbnail_url = (
+                        metadata_content.get("liveImageUrl", "")
+                        .format(type="270")
+                        .replace("\\", "")
+                        if metadata_content.get("liveImageUrl")
+                        else self.default_thumbnail_path
+                    )
+                except Exception as e:
+                    print(f"썸네일 URL 처리 중 예외 발생: {e}, 기본 썸네일 이미지 사용")
+                    thumbnail_url = self.default_thumbnail_path
+
+                frame_rate = "알 수 없는 프레임 속도"
+                record_quality = "알 수 없는 품질"
+
+                live_playback_json = metadata_content.get("livePlaybackJson")
+                if live_playback_json:
+                    try:
+                        live_playback_json = json.loads(live_playback_json)
+                        encoding_tracks = live_playback_json.get("media", [])
+                    except (TypeError, json.JSONDecodeError) as e:
+                        print(f"livePlaybackJson 파싱 오류: {e}")
+                        encoding_tracks = []
+                else:
+                    encoding_tracks = []
+
+                max_resolution = 0
+
+                for track in encoding_tracks:
+                    if "encodingTrack" in track:
+                        for encoding in track["encodingTrack"]:
+                            try:  # videoWidth, videoHeight, videoFrameRate 키에 대한 오류 처리
+                                resolution = int(encoding.get("videoWidth", 0)) * int(
+                                    encoding.get("videoHeight", 0)
+                                )
+                                if (
+                                    record_quality_setting == "best"
+                                    and resolution > max_resolution
+                                ) or (
+                                    record_quality_setting != "best"
+                                    and encoding["encodingTrackId"]
+                                    == record_quality_setting
+                                ):
+                                    max_resolution = resolution
+                                    record_quality = encoding["encodingTrackId"]
+                                    frame_rate = str(
+                                        int(float(encoding.get("videoFrameRate", "30")))
+                                    )  # 기본값 30
+                            except KeyError as e:
+                                print(f"인코딩 정보 KeyError: {e}, 기본값 사용")
+                                continue  # 해당 인코딩 트랙 건너뛰기
+
+                parsed_metadata = {
+                    "thumbnail_url": thumbnail_url,
+                    "live_title": metadata_content.get("liveTitle", "알 수 없는 제목"),
+                    "channel_name": metadata_content["channel"].get(
+                        "channelName", "알 수 없는 채널"
+                    )
+                    if "channel" in metadata_content
+                    and "channelName" in metadata_content["channel"]
+                    else "알 수 없는 채널",
+                    "recording_duration": metadata_content.get("openDate", "00:00:00"),
+                    "open_live": metadata_content.get("status", "") == "OPEN",  # 수정: livePlaybackJson 파싱 전 원래 상태
+                    "category": metadata_content.get(
+                        "liveCategoryValue", "알 수 없는 카테고리"
+                    ),
+                    "record_quality": record_quality,  # livePlaybackJson에서 가져옴
+                    "frame_rate": frame_rate,  # livePlaybackJson에서 가져옴
+                }
+
+                # print(f"parsed_metadata: {parsed_metadata}")  # 메타데이터 확인
+
+                self.metadata_cache.store(
+                    channel["id"], response, record_quality_setting, parsed_metadata
+                )
+                self.live_metadata[channel["id"]] = parsed_metadata
+                return parsed_metadata
+
+            except httpx.HTTPStatusError as e:
+                print(f"HTTP 오류 발생: {e.response.status_code} - {e.response.text}")
+                if e.response.status_code in (400, 401):
+                    print(f"{e.response.status_code} 에러가 발생했습니다. 쿠키가 만료되었거나 채널 정보가 변경되었을 수 있습니다.")
+                    cookie_store.invalidate()  # 다음 요청 때 cookie.json을 다시 읽음
+                    return None
+                if e.response.status_code == 429 or 500 <= e.response.status_code < 600:
+                    # 429/503이면 공용 리미터가 Retry-After 동안 요청을 멈추므로 재시도는 그 뒤에 나감
+                    print(f"서버 오류 ({e.response.status_code}). {attempt + 1}회 재시도...")
+                    await asyncio.sleep(delay)
+                    continue
+                else:
+                    return None
+
+            except httpx.RequestError as e:
+                print(f"요청 오류 발생: {e}")
+                return None
+
+            except Exception as e:
+                print(f"[재시도] {attempt + 1}회 시도 실패. 오류: {e}")
+                if attempt + 1 < retries:
+                    await asyncio.sleep(delay)
+                else:
+                    print(f"[오류] {channel['name']}: 메타데이터를 가져오는 도중 오류가 발생하였습니다")
+                    return None
+    def get_chat_engine(self):
+        """
+        chatMode가 "engine"이면 공용 채팅 엔진을, "process"(기본값)이면 None을 반환합니다.
+        채팅 엔진에 필요한 websockets 패키지가 없으면 None을 반환하므로 채널마다 run.py 프로세스로 수집합니다.
+        """
+        if self.config.get("chatMode", "process") != "engine" or self.chat_engine_unavailable:
+            return None
+        if self.chat_engine is None:
+            try:
+                from chat_engine import ChatEngine  # websockets는 엔진 모드에서만 필요
+            except ImportError as e:
+                print(f"채팅 엔진을 사용할 수 없어 채널별 채팅 프로세스로 수집합니다 (websockets 패키지 필요): {e}")
+                self.chat_engine_unavailable = True  # 설정은 그대로 두고 이번 실행에서만 프로세스 모드 사용
+                return None
+            self.chat_engine = ChatEngine(
+                echo=self.config.get("chatEngineEcho", False),
+                flush_bytes=self.config.get("chatFlushBytes", 65536),
+                flush_interval=self.config.get("chatFlushInterval", 1.0),
+                capture=self.config.get("chatCaptureFormat", "none") == "ndjson",
+            )
+        return self.chat_engine
+
+    async def close_client(self):
+        await self.live_poller.stop()
+        await self.postprocess_queue.stop()  # 남은 작업은 다음 실행 때 이어서 처리
+        await close_async_client()  # 공유 API 클라이언트 연결 종료
+        await close_media_client()  # 내장 HLS 녹화기의 세그먼트 연결 종료
+        if self.chat_engine is not None:
+            await asyncio.to_thread(self.chat_engine.stop)
+        self.journal.close()
+
+    def buildCommand(self, channel, metadata=None, output_path=None, append=False):
+        record_quality = channel.get("quality", "best")
+        file_extension = channel.get("extension", ".ts")  # <-- 이 줄은 유지 (필요)
+        current_dir = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+        selected_plugin = self.config.get("plugin", "기본 플러그인")
+        if selected_plugin == "기본 플러그인":
+            plugin_folder_name = "basic"
+        elif selected_plugin == "타임머신 플러그인":
+            plugin_folder_name = "timemachine"
+        elif selected_plugin == "타임머신 플러스 플러그인":
+            plugin_folder_name = "timemachine_plus"
+        else:
+            plugin_folder_name = "basic"  # 기본 플러그인
+
+        plugin_dir = os.path.join(current_dir, "dependent", "plugin", plugin_folder_name)
+        streamlink_path = getStreamlink()  # Streamlink 경로 가져오기
+        ffmpeg_path = getFFmpeg()  # FFmpeg 경로 가져오기
+        cookies = load_cookies()  # 수정: api.get_cookies() 사용
+
+        # 타임머신 기능을 사용할 때 시작 시점을 설정합니다 (예: 1분 전)
+        time_shift = 0  # 기본값
+        if selected_plugin in ["타임머신 플러그인", "타임머신 플러스 플러그인"]:
+            time_shift = self.config.get("time_shift", 0)  # 설정에서 가져온 값 사용 (기본값 0)
+            time_shift_option = f"--hls-start-offset={time_shift}"  # seconds
+        else:
+            time_shift_option = ""
+
+        if not output_path and metadata:  # output_path가 None이고 metadata가 제공된 경우
+            filename = self._create_filename(channel['id'], metadata,file_extension)
+            if filename is None:
+                print(f"오류: {channel['name']} 채널에 대한 파일 이름을 만들 수 없습니다.")
+                return None
+
+            output_dir_abs_path = os.path.abspath(channel["output_dir"])
+            if not os.path.exists(output_dir_abs_path):
+                os.makedirs(output_dir_abs_path)
+            output_path = os.path.join(output_dir_abs_path, filename)  #확장자 포함
+
+            chat_log_path = os.path.splitext(output_path)[0] + ".log"  # 채팅 로그 파일명
+
+        elif not output_path and not metadata:  # output_path, metadata 둘다 없는경우
+            print("필요한 정보를 불러오지 못했습니다.")
+            filename = f"{channel['name']}.ts"  # 메타데이터가 없을 경우 기본 파일명
+            output_dir_abs_path = os.path.abspath(channel["output_dir"])
+            output_path = os.path.join(
+                output_dir_abs_path, filename
+            )  # 메타데이터가 없을 경우의 output_path
+            if not os.path.exists(output_dir_abs_path):
+                os.makedirs(output_dir_abs_path)
+            chat_log_path = os.path.splitext(output_path)[0] + ".log"  # 채팅 로그 파일명
+
+        else:
+            chat_log_path = os.path.splitext(output_path)[0] + ".log"  # output_path가 이미 있으면
+
+        self.recording_filenames[channel["id"]] = output_path
+
+        stream_url = f"https://chzzk.naver.com/live/{channel['id']}"
+        cookie_value = (
+            f"NID_SES={cookies['NID_SES']}; NID_AUT={cookies['NID_AUT']}"
+        )
+        cmd_list = [
+            streamlink_path,
+            "--ffmpeg-copyts",
+            "--plugin-dirs",
+            plugin_dir,
+            stream_url,
+            record_quality,
+            "-o",
+            output_path,
+            "--ffmpeg-ffmpeg",
+            ffmpeg_path,
+            "--hls-live-edge",
+            "1",  # 버퍼링 최소화 (세그먼트 수)
+        ]
+
+        if cookie_value:
+            cmd_list.extend(["--http-header", f"Cookie={cookie_value}"])
+
+        # 타임머신 옵션 (플러그인 설정에 따라)
+        if time_shift_option:
+            cmd_list.extend(time_shift_option.split())  # --hls-start-offset 옵션 추가
+
+        # streamlink 기본 옵션
+        cmd_list.extend(
+            [
+                "--hls-live-restart",  # 방송 재시작시 스트림 다시 시작
+                "--stream-segment-timeout",
+                "5",  # 세그먼트 타임아웃
+                "--stream-segment-attempts",
+                "5",  # 세그먼트 재시도 횟수
+            ]
+        )
+
+        if not output_path:  # output_path와, chat_log_path 둘다 없는 경우.
+            return None
+
+        return cmd_list, output_path, chat_log_path, time_shift  # time_shift 반환
+
+    def _create_filename(self, channel_id, metadata, file_extension):  # 수정: file_extension 인자 받음
+        """
+        채널 ID와 메타데이터를 기반으로 안전한 파일 이름을(확장자 포함) 생성합니다.
+        """
+        channel = next((ch for ch in self.channels if ch['id'] == channel_id), None)
+        if not channel:
+            return None
+
+        live_title = metadata.get('live_title', '알 수 없는 제목')
+        # 모든 문자 표현을 허용하도록 수정된 정규식
+        safe_live_title = re.sub(r'[^\w\s가-힣\u3131-\u3163\uac00-\ud7a3\-\_\.\!\~\*\'\(\)]+', '_', live_title)
+        safe_channel_name = channel['name'].replace(" ", "_")
+        safe_channel_name = "".join(c for c in safe_channel_name if c.isalnum() or c == '_')
+
+        filename = self.config.get(
+            "filenamePattern",
+            "[{start_time}] {channel_name} {safe_live_title} {record_quality}{frame_rate}{file_extension}",
+        ).format(
+            recording_time=datetime.now().strftime('%y%m%d_%H%M%S'),
+            start_time=datetime.now().strftime('%Y-%m-%d_%H%M%S'),
+            safe_live_title=safe_live_title,
+            channel_name=safe_channel_name,
+            record_quality=metadata.get("record_quality", "알 수 없는 품질"),
+            frame_rate=metadata.get("frame_rate", "알 수 없는 프레임 속도"),
+            file_extension=file_extension  # <-- file_extension 사용
+        )
+
+        # print(f"[파일이름] file_extension={file_extension}, filename={filename}")
+
+        return filename  # <-- filename만 반환
+    def onRecordingStarted(self, channel_id):
+        channel_name = self.findChannelNameById(channel_id)
+        self.recording_status[channel_id] = True
+        print(f"녹화 시작: {channel_name} 채널")
+        self.recording_started.emit(channel_id)  # 녹화 시작 시그널 발생
+    def journalRecordingStarted(self, channel_id, file_path):
+        """녹화 파일 하나의 시작을 저널에 기록합니다 (녹화 프로세스를 실행한 직후 호출)."""
+        self.journal_recordings[channel_id] = self.journal.recording_started(channel_id, os.path.normpath(file_path))
+
+    def onRecordingFailed(self, channel_id, reason):
+        channel_name = self.findChannelNameById(channel_id)
+        print(f"{channel_name} 채널의 녹화 시작 중 오류가 발생했습니다: {reason}")
+        self.journal.recording_finished(self.journal_recordings.pop(channel_id, None), state="failed")
+        pipeline = self.remux_pipelines.pop(channel_id, None)
+        if pipeline is not None:
+            pipeline.abort()
+
+    def onRecordingFinished(self, channel_id):
+        """녹화 종료 시 호출됩니다."""
+        channel_name = self.findChannelNameById(channel_id)
+        print(f"{channel_name} 채널 녹화가 종료되었습니다.")
+        if channel_id in self.recording_start_times:
+            del self.recording_start_times[channel_id]
+        self.recording_status[channel_id] = False  # 녹화 상태를 False로 설정
+        self.journal.recording_finished(self.journal_recordings.pop(channel_id, None))
+        self.recording_finished.emit(channel_name) # 수정: 녹화 종료 시그널 발생
+
+        if self.auto_dsc:
+            # self.startStreamCopy(channel_id) # 제거
+            # fixed_file_path 생성 및 저장
+            if channel_id in self.recording_filenames: # 파일 이름 확인
+                self.schedulePostProcessing(channel_id, self.recording_filenames[channel_id])
+
+    def onChunkFinished(self, channel_id, file_path, next_file_path):
+        """내장 녹화기의 분할 파일 하나가 끝났을 때 호출됩니다. 방송이 끝나기 전에 끝난 파일부터 후처리합니다."""
+        self.recording_filenames[channel_id] = next_file_path  # 마지막 파일은 onRecordingFinished에서 후처리
+        self.journal.recording_finished(self.journal_recordings.pop(channel_id, None))
+        self.journalRecordingStarted(channel_id, next_file_path)
+        pipeline = self.remux_pipelines.get(channel_id)
+        if pipeline is not None:
+            pipeline.next_file(next_file_path)  # 녹화 중 후처리: 다음 파일을 이어 붙임
+        elif self.auto_dsc:
+            # 방송이 아직 진행 중이므로 끝난 녹화의 후처리보다 뒤로
+            self.schedulePostProcessing(channel_id, file_path, priority=POSTPROCESS_PRIORITY_LOW)
+
+    def startPipelinedPostProcessing(self, channel_id, file_path):
+        """
+        pipelinedPostProcessing이 켜져 있으면 녹화와 동시에 후처리를 시작합니다.
+        녹화가 끝나면 schedulePostProcessing이 파이프라인을 마무리합니다.
+        """
+        if not (self.auto_dsc and self.config.get("pipelinedPostProcessing", False)):
+            return
+        fixed_file_path = self._fixed_file_path(file_path)
+        pipeline = PipelinedRemux(channel_id, file_path, fixed_file_path, self.config)
+        try:
+            pipeline.start()
+        except Exception as e:
+            print(f"녹화 중 후처리 시작 실패: {e}, 녹화가 끝난 뒤 후처리합니다.")
+            return
+        self.fixed_file_paths[channel_id] = fixed_file_path
+        self.remux_pipelines[channel_id] = pipeline
+
+    def _fixed_file_path(self, file_path):
+        post_processing_output_dir = self.config.get("postProcessingOutputDir")
+
+        if post_processing_output_dir:
+            fixed_file_path = os.path.join(
+                post_processing_output_dir, f"fixed_{os.path.basename(file_path)}"
+            )
+        else:
+            fixed_file_path = os.path.join(
+                os.path.dirname(file_path), f"fixed_{os.path.basename(file_path)}"
+            )
+        return os.path.normpath(fixed_file_path)
+
+    def schedulePostProcessing(self, channel_id, file_path, priority=POSTPROCESS_PRIORITY_NORMAL):
+        """녹화 파일의 후처리(fixed_ 파일 생성)를 후처리 큐에 넣습니다."""
+        file_path = os.path.normpath(file_path)
+        pipeline = self.remux_pipelines.pop(channel_id, None)  # 녹화 중 후처리를 하고 있었으면 마무리만 함
+        if pipeline is not None:
+            self.fixed_file_paths[channel_id] = pipeline.output_path
+            # 녹화 스레드에서 호출될 수 있으므로 이벤트 루프 스레드에 작업을 넘김
+            self.run_coroutine(self.runPipelinedPostProcessing(channel_id, file_path, pipeline))
+            return
+        self.submitPostProcessing(channel_id, file_path, priority)
+
+    def submitPostProcessing(self, channel_id, file_path, priority=POSTPROCESS_PRIORITY_NORMAL):
+        """녹화 파일 하나를 후처리 큐에 넣습니다 (녹화 중 후처리를 거치지 않음)."""
+        fixed_file_path = self._fixed_file_path(file_path)
+        self.fixed_file_paths[channel_id] = fixed_file_path # 저장!
+        kind = KIND_REMUX if self.config.get("postProcessingMethod") == "스트림복사" else KIND_ENCODE
+        self.postprocess_queue.submit(channel_id, file_path, fixed_file_path, kind, priority)
+
+    async def runPostProcessingJob(self, job):
+        """
+        후처리 큐의 작업 하나를 실행합니다.
+        후처리가 끝나면 단계를 "move"로 기록하므로, 파일 이동 전에 종료되었다면 다음 실행 때 이동만 다시 합니다.
+        실행한 ffmpeg 프로세스는 큐에 등록하므로 큐를 멈추면 함께 종료됩니다.
+        """
+        if job.get("stage") == "move":
+            if not os.path.exists(job["final_path"]):
+                raise FileNotFoundError(f"후처리된 파일이 없습니다: {job['final_path']}")
+            await self.moveAfterPostProcessing(job["final_path"])
+            return
+        if not os.path.exists(job["input_path"]):
+            raise FileNotFoundError(f"녹화 파일이 없습니다: {job['input_path']}")
+        await self.runPostProcessing(
+            job["channel_id"], job["input_path"], job["output_path"], self.config,
+            on_processed=lambda final_path: self.postprocess_queue.set_stage(job, "move", final_path=final_path),
+            on_process=lambda process: self.postprocess_queue.attach_process(job, process),
+        )
+
+    async def runPipelinedPostProcessing(self, channel_id, input_path, pipeline):
+        """녹화 중 후처리를 마무리합니다 (후처리 큐를 거치지 않으므로 실패는 여기서 출력)."""
+        try:
+            await self.runPostProcessing(channel_id, input_path, pipeline.output_path, self.config, pipeline)
+        except Exception as e:
+            print(f"후처리 실패: {e}")
+
+    async def runPostProcessing(self, channel_id, input_path, output_path, config, pipeline=None, on_processed=None,
+                                on_process=None): #async로 변경
+        """
+        후처리 후 결과를 기록하고 파일을 이동합니다.
+        후처리가 실패하면 예외가 그대로 발생하므로 (후처리 큐는 작업을 "failed"로 기록) 기록과 이동은 하지 않습니다.
+        """
+        loop = asyncio.get_running_loop()
+        if pipeline is not None:
+            # 녹화 중 후처리: 남은 부분만 넘기고 ffmpeg가 끝나기를 기다림
+            output_path = await loop.run_in_executor(None, pipeline.finish)
+            if output_path is None:
+                # 실패하면 그대로 남겨 둔 원본 녹화 파일을 일반 후처리 큐로 다시 후처리
+                print("녹화 중 후처리에 실패하여 원본 녹화 파일을 후처리 큐에 넣습니다.")
+                for path in pipeline.input_paths:
+                    if os.path.exists(path):
+                        self.submitPostProcessing(channel_id, path)
+                return
+        else:
+            post_processing_delay = self.config.get("postProcessingDelay", 0)
+            await asyncio.sleep(post_processing_delay)
+
+            output_path = await loop.run_in_executor(
+                None,
+                copy_specific_file,
+                input_path,
+                output_path,
+                self.deleteAfterPostProcessing,
+                config.get("removeFixedPrefix", False),
+                self.config.get("minimizePostProcessing", False),
+                config,
+                on_process,
+            )
+
+        self.journal.log("postprocessed", channel_id, output_path)
+        if on_processed is not None:
+            on_processed(output_path)
+        await self.moveAfterPostProcessing(output_path)
+
+    async def moveAfterPostProcessing(self, output_path):
+        """파일 이동 설정 (moveAfterProcessingEnabled가 True인 경우)"""
+        if not self.config.get("moveAfterProcessingEnabled", False):
+            return
+        move_after_processing_path = self.config.get("moveAfterProcessing", "")
+        if move_after_processing_path:
+            await asyncio.sleep(5)  # 5초 대기 (파일 안정화)
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                self.moveFileAfterProcessing,
+                output_path,
+                move_after_processing_path,
+            )
+
+    def moveFileAfterProcessing(self, src, dst):
+        try:
+            final_dst = os.path.join(os.path.normpath(dst), os.path.basename(src))
+            base, ext = os.path.splitext(final_dst)
+            counter = 1
+            # 파일 이름 중복 체크
+            while os.path.exists(final_dst):
+                final_dst = f"{base} ({counter}){ext}"
+                counter += 1
+
+            # print(f"[DEBUG] Preparing to move {src} to {final_dst}")
+            shutil.move(os.path.normpath(src), final_dst)
+            print(f"{src} 파일이 {final_dst} 폴더로 이동되었습니다.")
+        except Exception as e:
+            print(f"파일 이동 중 오류 발생: {e}")
+
+    def closeEvent(self, event):
+        for session in self.supervisor.sessions.values():
+            if session.isRunning():
+                session.stop(force_stop=True)
+        event.accept()
+
+    def run_coroutine(self, coro):
+        """이벤트 루프 스레드에서 코루틴을 실행합니다 (다른 스레드에서 호출해도 안전)."""
+        if self.loop is None or not self.loop.is_running():
+            print("이벤트 루프가 실행 중이 아니어서 작업을 실행하지 못했습니다.")
+            coro.close()
+            return None
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def startRecording(self, channel_id):
+        """개별 채널의 녹화를 시작합니다. 자동/수동 모드에 관계없이 호출됩니다."""
+        if self.reload_channels:
+            self.channels = load_channels()  # 채널 목록 다시 불러옴
+        self.startBackgroundRecording(channel_id)
+
+    def stopRecording(self, channel_id, force_stop=False):
+        recording_session = self.supervisor.get(channel_id)
+        if recording_session is not None:
+            recording_session.stop(force_stop)  # 여기서 채팅도 종료됨
+            process = self.recording_processes.get(channel_id)
+            if process:
+                self.terminateRecordingProcess(process)
+                del self.recording_processes[channel_id]
+
+            # 후처리는 녹화 프로세스가 실제로 끝난 뒤 onRecordingFinished가 후처리 큐에 넣음
+            # (여기서 넣으면 아직 기록 중인 파일을 처리하거나 같은 파일을 두 번 처리하게 됨)
+
+            self.cleanupAfterRecording(channel_id, force_stop)
+
+            # 사용한 fixed_file_path는 제거
+            if channel_id in self.fixed_file_paths:
+                del self.fixed_file_paths[channel_id]
+
+    def terminateRecordingProcess(self, process):
+        """녹화 프로세스를 종료하고, 5초 뒤에도 남아 있으면 강제 종료합니다 (이벤트 루프를 막지 않음)."""
+        process.terminate()
+        if self.loop is not None:
+            self.loop.call_later(5, lambda: process.poll() is None and process.kill())
+
+    def cleanupAfterRecording(self, channel_id, force_stop=False):
+        """녹화 종료 후 정리 작업을 수행합니다."""
+        try:
+            channel_name = self.findChannelNameById(channel_id)
+            message = f"{channel_name} 채널의 녹화가 중지되었습니다."
+
+            # 자동 녹화 모드이고, record_enabled=True, 강제종료가 아닐 때만 메시지 변경.
+            channel = next((ch for ch in self.channels if ch["id"] == channel_id), None)
+            if (
+                self.config.get("auto_record_mode", False)
+                and channel.get("record_enabled", False)
+                and not force_stop
+            ):
+                message = f"{channel_name} 채널이 녹화 대기 상태로 전환되었습니다."
+
+            self.supervisor.discard(channel_id)
+            if channel_id in self.recording_start_times:
+                del self.recording_start_times[channel_id]
+            self.recording_status[channel_id] = False  # 녹화 상태를 False로 설정
+
+            self.recording_finished.emit(channel_name)  # 녹화 종료 시그널 발생
+
+        except Exception as e:
+            print(f"녹화 후 정리 작업 중 예외 발생: {e}")
+
+    def startBackgroundRecording(self, channel_id):
+        """채널의 녹화 세션을 시작합니다 (이벤트 루프 스레드에서 호출)."""
+        channel_name = self.findChannelNameById(channel_id)
+        if self.supervisor.is_running(channel_id):
+            return
+
+        channel = next((ch for ch in self.channels if ch["id"] == channel_id), None)
+        if channel is None:
+            print(f"{channel_name} 채널 정보를 찾을 수 없습니다.")
+            return
+
+        self.start_live_poller()  # 녹화 세션은 폴러의 상태 알림을 기다림
+
+        # buildCommand 호출
+        cmd_list, output_path, chat_log_path, time_shift = self.buildCommand(
+            channel, self.live_metadata.get(channel_id)
+        )
+        if cmd_list is None:  # buildCommand 실패 처리
+            print(f"오류: {channel_name} 채널에 대한 명령 목록을 만들 수 없습니다.")
+            return
+
+        print(f"{channel_name} 채널의 녹화가 시작되었습니다.({output_path})")  # output_path 사용
+        recordingSession = self.supervisor.start(channel)
+
+        # 세션 시작 *후*에 채팅 프로세스 시작 (그래야 세션의 is_chat_running = True 됨)
+        if cmd_list is not None:  # buildCommand 성공했을 때만
+            recordingSession.start_chat_process(chat_log_path)
+
+    def start_live_poller(self):
+        """중앙 폴러를 현재 이벤트 루프에서 시작합니다 (이미 실행 중이면 채널 목록만 갱신)."""
+        self.live_poller.set_channels(self.channels)
+        if not self.live_poller.is_running():
+            self.live_poller.start()
+            self.loop = self.live_poller.loop
+        self.postprocess_queue.start(self.loop)
+
+    def on_live_event(self, event, channel_id, metadata):
+        """
+        LivePoller가 전달한 상태 변화를 처리합니다.
+        폴러는 메타데이터가 실제로 바뀐 경우에만 이벤트를 보내므로, 받은 이벤트는 모두 UI에 전달합니다.
+        방송이 막 시작된 채널은 자동 녹화 설정에 따라 녹화를 시작합니다.
+        """
+        channel = next((ch for ch in self.channels if ch["id"] == channel_id), None)
+        if channel is None:
+            return
+
+        self.metadata_updated.emit(channel_id, metadata)
+
+        if event == "live":
+            # 방송 시작 시각 학습 (openDate 기준)
+            self.poll_scheduler.record_start(channel_id, metadata.get("recording_duration"))
+            # 자동 녹화 모드 OFF일 때는 LiveRecorder에서 녹화 시작 X
+            if self.config.get("auto_record_mode", False) and channel.get(
+                "record_enabled", False
+            ):
+                self.startRecording(channel_id)
+        elif event == "offline":
+            print(f"{channel['name']} 채널은 현재 방송 중이 아닙니다.")
+
+    def fetch_metadata_for_all_channels(self):
+        """
+        채널 목록 전체의 메타데이터를 즉시 다시 조회하도록 중앙 폴러에 요청합니다.
+        결과는 on_live_event를 통해 UI 업데이트(metadata_updated)와 자동 녹화 시작으로 이어집니다.
+        """
+        self.start_live_poller()
+        self.live_poller.request_refresh()
+
+    async def start_chat_background(self, channel_id):
+        """채팅 시작 (LiveRecorder) -> 이제 채팅 프로세스 실행 안함."""
+        channel_name = self.findChannelNameById(channel_id)
+        try:
+            channel = next(
+                (ch for ch in self.channels if ch["id"] == channel_id), None
+            )
+            if channel is None:
+                print(f"{channel_name} 채널 정보를 찾을 수 없습니다.")
+                return
+            if self.chat_status.get(channel_id, False):  # 이미 실행 중이면 중복 실행 방지
+                print(f"{channel_name} 채널의 채팅 저장이 이미 실행 중입니다.")
+                return
+
+            # 로그 파일 이름 생성 (이제 여기서 로그 파일 이름/경로 생성 안함)
+            # log_filename = self._create_filename(channel_id, metadata, ".log")
+            # if log_filename is None:
+            #     print(f"Error: Could not create log filename for {channel_name}.")
+            #     return
+
+            # log_path = os.path.join(channel.get("output_dir", "."), log_filename)
+
+            # # 새로운 콘솔 창에서 run.py 실행  <-- 이 부분 제거
+            # command = [
+            #     sys.executable,
+            #     os.path.join(base_directory, "module", "run.py"),
+            #     "--streamer_id",
+            #     channel_id,
+            #     "--log_path",
+            #     log_path
+            # ]
+            # process = subprocess.Popen(command, creationflags=subprocess.CREATE_NEW_CONSOLE)
+
+            # self.chat_processes[channel_id] = process
+            # self.chat_log_paths[channel_id] = log_path  # <-- 제거
+            self.chat_status[channel_id] = True  # 채팅 상태만 True로 설정
+            print(f"채팅 저장 시작: {channel_name} (독립 실행)")  # 메시지 변경
+
+        except Exception as e:
+            print(f"startChat 함수에서 예외 발생: {e}")
+            return
@@ -0,0 +1,391 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from hls_recorder import HlsRecorder
+from path_config import base_directory
+
+# 채팅 프로세스를 새 콘솔 창에서 실행 (Windows 전용 플래그, 다른 OS에서는 0)
+CREATE_NEW_CONSOLE = getattr(subprocess, "CREATE_NEW_CONSOLE", 0)
+
+
+class ManagedProcess:
+    """
+    asyncio 서브프로세스와 subprocess.Popen을 같은 방식으로 다루기 위한 핸들입니다.
+    서브프로세스를 지원하지 않는 이벤트 루프(Windows의 qasync 등)에서는 Popen으로 실행하고,
+    종료는 스레드 하나에서 wait()로 기다립니다 (주기적인 폴링 없음).
+    """
+
+    def __init__(self, process, is_async):
+        self.process = process
+        self.is_async = is_async
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    @property
+    def returncode(self):
+        return self.process.returncode
+
+    def poll(self):
+        """종료되었으면 종료 코드, 실행 중이면 None을 반환합니다 (Popen.poll과 같은 의미)."""
+        if self.is_async:
+            return self.process.returncode
+        return self.process.poll()
+
+    def terminate(self):
+        if self.poll() is None:
+            try:
+                self.process.terminate()
+            except ProcessLookupError:
+                pass
+
+    def kill(self):
+        if self.poll() is None:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+
+    async def wait(self):
+        if self.is_async:
+            return await self.process.wait()
+        return await asyncio.to_thread(self.process.wait)
+
+
+async def launch_process(cmd_list):
+    """녹화 프로세스를 실행합니다. 가능하면 asyncio 서브프로세스를 사용합니다."""
+    try:
+        process = await asyncio.create_subprocess_exec(*cmd_list)
+        return ManagedProcess(process, is_async=True)
+    except NotImplementedError:
+        return ManagedProcess(subprocess.Popen(cmd_list), is_async=False)
+
+
+class RecordingSession:
+    """
+    개별 채널의 녹화를 담당하는 코루틴입니다 (이전의 채널별 RecordingThread를 대체).
+    방송 상태는 중앙 폴러(LivePoller)를 기다리고, 녹화 프로세스의 종료는 폴링 없이 await로 기다립니다.
+    """
+
+    def __init__(self, channel, liveRecorder, supervisor):
+        self.channel = channel  # 녹화할 채널 정보
+        self.liveRecorder = liveRecorder  # RecorderCore 객체
+        self.supervisor = supervisor
+        self.task = None
+        self.stopRequested = False  # 녹화 중지 요청 플래그
+        self.force_stop = False  # 강제 중지 플래그
+        self.retryDelay = 5  # 60  # 녹화 종료 후 재시도 대기 시간 (초)
+        self.stop_timer = None  # 자동 중지 타이머 (loop.call_later 핸들)
+        self.chat_process = None  # 채팅 프로세스
+        self.is_chat_running = False  # 채팅 실행 여부
+        self.chat_log_path = None  # 채팅 로그 파일 경로
+        self.time_shift = 0  # 타임머신 시간 (초)
+
+    def isRunning(self):
+        return self.task is not None and not self.task.done()
+
+    async def run(self):
+        """
+        녹화 코루틴의 메인 루프입니다.
+        방송 상태는 중앙 폴러가 확인하며, 이 코루틴은 그 결과를 기다렸다가 녹화를 시작/유지합니다.
+        """
+        poller = self.liveRecorder.live_poller
+        channel_id = self.channel["id"]
+        loop = asyncio.get_running_loop()
+        while not self.stopRequested:
+            live_info = poller.get_state(channel_id)
+            if not (live_info and live_info.get("open_live")):
+                # 방송 중이 아닐 때: 폴러가 방송 시작을 알릴 때까지 채널 재확인 주기(지터 적용)만큼 대기
+                live_info = await poller.wait_for_live_async(
+                    channel_id, timeout=poller.wait_interval(channel_id)
+                )
+                if not (live_info and live_info.get("open_live")):
+                    continue
+
+            self.liveRecorder.recording_start_times[channel_id] = time.time()
+
+            cmd_list, output_path, chat_log_path, self.time_shift = self.liveRecorder.buildCommand(  # time_shift 받음
+                self.channel, live_info
+            )
+            if cmd_list is None:
+                print(
+                    f"오류: {self.channel['name']} 채널에 대한 명령 목록을 만들 수 없습니다."
+                )
+                return
+
+            try:
+                process = await self.launch_recorder(cmd_list, output_path)
+                self.liveRecorder.journalRecordingStarted(channel_id, output_path)
+                self.liveRecorder.startPipelinedPostProcessing(channel_id, output_path)
+                self.liveRecorder.recording_status[channel_id] = True
+                self.liveRecorder.recording_processes[channel_id] = process
+                self.liveRecorder.recording_started.emit(
+                    channel_id
+                )  # 녹화 시작 시그널 발생
+
+                auto_stop_interval = self.liveRecorder.config.get(
+                    "autoStopInterval", 0
+                )
+                print(f"분할녹화 시간 간격: {auto_stop_interval} 초")
+                if auto_stop_interval > 0 and getattr(process, "chunk_duration", 0):
+                    print(f"{auto_stop_interval}초마다 녹화 파일을 나눕니다 (내장 녹화기)")
+                elif auto_stop_interval > 0:
+                    self.stop_timer = loop.call_later(auto_stop_interval, self.stop)
+                    print(f"{auto_stop_interval}초 후 자동 중지 설정됨")
+
+                self.start_chat_process(chat_log_path)
+
+                await process.wait()  # 프로세스가 끝날 때까지 대기 (폴링 없음)
+                if self.liveRecorder.recording_processes.get(channel_id) is process:
+                    del self.liveRecorder.recording_processes[channel_id]
+
+                if self.stop_timer:
+                    self.stop_timer.cancel()
+                self.liveRecorder.onRecordingFinished(
+                    channel_id
+                )  # 녹화 종료
+
+            except Exception as e:
+                self.liveRecorder.onRecordingFailed(
+                    channel_id, str(e)
+                )
+                return
+
+            finally:
+                if not self.force_stop:
+                    print(
+                        f"{self.channel['name']} 녹화 종료 후 {self.retryDelay}초 대기 중..."
+                    )
+                    await asyncio.sleep(self.retryDelay)
+            if self.force_stop:
+                break
+
+            # 녹화가 끝난 직후에는 캐시된 상태 대신 새로 조회한 결과로 판단
+            live_info = await poller.refresh_and_wait_async(
+                channel_id, timeout=poller.wait_interval(channel_id)
+            )
+            if (
+                (live_info is None or not live_info.get("open_live"))
+                and self.liveRecorder.config.get("auto_record_mode", False)
+                and self.channel.get("record_enabled", False)
+            ):
+                self.stopRequested = False
+                print(
+                    f"{self.channel['name']} 방송이 종료되었습니다. 자동 녹화 모드 + 예약: 예약 녹화 상태로 전환합니다."
+                )
+
+            elif live_info and live_info.get("open_live"):
+                self.stopRequested = False  # 다시 녹화 재시작
+                continue
+            else:
+                print(f"{self.channel['name']} 방송이 종료되었습니다.")
+                break
+
+    async def launch_recorder(self, cmd_list, output_path):
+        """
+        recorderBackend가 "native"이면 내장 HLS 녹화기로, 아니면(기본값 "streamlink") streamlink 프로세스로 녹화를 시작합니다.
+        내장 녹화기를 시작하지 못하거나 타임머신 플러그인을 쓰는 경우에는 streamlink로 녹화합니다.
+        """
+        if self.liveRecorder.config.get("recorderBackend", "streamlink") == "native":
+            if self.time_shift:
+                print(f"{self.channel['name']} 타임머신 녹화는 내장 녹화기에서 지원하지 않아 streamlink로 녹화합니다.")
+            else:
+                # 분할 녹화: 프로세스를 다시 시작하지 않고 세그먼트 경계에서 파일만 바꿈
+                recorder = HlsRecorder(
+                    self.channel["id"], output_path, self.channel.get("quality", "best"),
+                    prefetch=int(self.liveRecorder.config.get("hlsPrefetchSegments", 3)),
+                    chunk_duration=int(self.liveRecorder.config.get("autoStopInterval", 0)),
+                    on_chunk_finished=lambda path, next_path: self.liveRecorder.onChunkFinished(
+                        self.channel["id"], path, next_path
+                    ),
+                )
+                try:
+                    await recorder.start()
+                    print(f"{self.channel['name']} 내장 HLS 녹화기로 녹화를 시작합니다.")
+                    return recorder
+                except Exception as e:
+                    print(f"{self.channel['name']} 내장 HLS 녹화기 시작 실패: {e}, streamlink로 녹화합니다.")
+        return await launch_process(cmd_list)
+
+    def start_chat_process(self, new_chat_log_path):
+        """채팅 프로세스 시작 (RecordingSession)"""
+        if self.liveRecorder.config.get("chatMode", "process") == "off":
+            return  # 채팅 수집 안 함
+        if not self.is_chat_running:
+            try:
+                self.chat_log_path = new_chat_log_path
+
+                chat_engine = self.liveRecorder.get_chat_engine()
+                if chat_engine is not None:
+                    # 엔진 모드: 모든 채널의 채팅을 하나의 프로세스에서 수집
+                    chat_engine.add_channel(self.channel['id'], self.chat_log_path, self.time_shift)
+                    self.is_chat_running = True
+                    self.liveRecorder.chat_log_paths[self.channel["id"]] = self.chat_log_path
+                    self.liveRecorder.chat_status[self.channel["id"]] = True
+                    print(f"채팅 저장 시작: {self.channel['name']}")
+                    self.liveRecorder.chat_started.emit(self.channel["id"])
+                    return
+
+                # run.py를 별도의 콘솔 창에서 실행
+                command = [
+                    sys.executable,
+                    os.path.join(base_directory, "module", "run.py"),
+                    "--streamer_id",
+                    self.channel['id'],
+                    "--log_path",
+                    self.chat_log_path,
+                    "--time_shift",  # <-- 타임머신 시간 인자 추가
+                    str(self.time_shift),  # <-- 타임머신 시간 값(초) 추가
+                    "--flush_bytes",
+                    str(self.liveRecorder.config.get("chatFlushBytes", 65536)),
+                    "--flush_interval",
+                    str(self.liveRecorder.config.get("chatFlushInterval", 1.0)),
+                ]
+                if self.liveRecorder.config.get("chatCaptureFormat", "none") == "ndjson":
+                    command.append("--capture")  # 구조화 캡처(.ndjson)도 저장
+                command.append("--stop_on_stdin_close")  # 종료할 때 표준 입력을 닫아 남은 채팅을 기록하게 함
+
+                # CREATE_NEW_CONSOLE 플래그 사용
+                self.chat_process = subprocess.Popen(
+                    command, stdin=subprocess.PIPE, creationflags=CREATE_NEW_CONSOLE
+                )
+
+                self.is_chat_running = True
+                self.liveRecorder.chat_processes[self.channel["id"]] = (
+                    self.chat_process
+                )  # 프로세스 객체 저장
+                self.liveRecorder.chat_log_paths[self.channel["id"]] = (
+                    self.chat_log_path
+                )  # 로그파일 저장
+                self.liveRecorder.chat_status[self.channel["id"]] = True  # 채팅 상태 업데이트
+                print(f"채팅 저장 시작: {self.channel['name']}")
+                self.liveRecorder.chat_started.emit(
+                    self.channel["id"]
+                )  # 채팅 시작 시그널 발생
+
+            except Exception as e:
+                print(f"채팅 시작 오류: {e}")
+
+    def stop_chat_process(self):
+        if self.chat_process is None and self.is_chat_running:
+            # 엔진 모드로 실행 중인 채팅
+            chat_engine = self.liveRecorder.chat_engine
+            if chat_engine is not None:
+                chat_engine.remove_channel(self.channel["id"])
+            self.is_chat_running = False
+            self.liveRecorder.chat_stopped.emit(self.channel["id"])
+            print(f"채팅 저장 중지: {self.channel['name']}")
+            return
+        if self.chat_process and self.is_chat_running:
+            try:
+                # 표준 입력을 닫으면 run.py가 버퍼에 남은 채팅을 기록하고 스스로 종료함
+                # (terminate()는 Windows에서 바로 종료되어 남은 채팅을 잃음)
+                self.chat_process.stdin.close()
+                # 루프를 막지 않도록 5초 후에 종료 여부만 확인하고 강제 종료
+                self.supervisor.loop.call_later(
+                    5, self.forceTerminateProcess, self.chat_process
+                )
+            except Exception as e:
+                print(f"채팅 프로세스 종료 중 오류 발생: {e}")
+            finally:
+                self.is_chat_running = False
+                self.liveRecorder.chat_stopped.emit(
+                    self.channel["id"]
+                )  # 채팅 종료 시그널
+                print(f"채팅 저장 중지: {self.channel['name']}")
+                self.chat_process = None  # 추가
+
+    def stop(self, force_stop=False):
+        """
+        녹화 중지 (RecordingSession).
+        force_stop=True: 강제 중지 (자동 녹화 재시작 대기 없이 즉시 종료)
+        """
+        try:
+            self.stopRequested = True
+            self.force_stop = force_stop
+            if self.isRunning():
+                channel_id = self.channel["id"]
+                process = self.liveRecorder.recording_processes.get(channel_id)
+                if process:
+                    process.terminate()  # run()의 await process.wait()가 끝남
+                    # 5초 후에 강제 종료 시도
+                    self.supervisor.loop.call_later(5, self.forceTerminateProcess, process)
+
+                # 채팅 프로세스 종료
+                self.stop_chat_process()
+
+                self.supervisor.loop.call_later(0.1, self.checkStopRequest)  # 정리작업
+        except Exception as e:
+            print(f"녹화 중지 중 예외 발생: {e}")
+
+    def forceTerminateProcess(self, process):
+        """
+        프로세스를 강제 종료합니다.
+        """
+        try:
+            if process.poll() is None:  # 아직 프로세스가 종료되지 않았으면
+                process.kill()  # 강제 종료
+        except Exception as e:
+            print(f"프로세스 강제 종료 중 예외 발생: {e}")
+
+    def checkStopRequest(self):
+        """
+        녹화 중지 요청 처리 후 정리 작업을 수행합니다.
+        """
+        if self.stopRequested and not self.liveRecorder.recording_processes:
+            self.liveRecorder.cleanupAfterRecording(self.channel["id"], self.force_stop)
+            self.stopRequested = False
+
+
+class RecordingSupervisor:
+    """
+    모든 채널의 녹화 세션을 하나의 이벤트 루프에서 관리합니다.
+    채널마다 스레드를 두지 않으므로 수백 개 채널도 유휴 스레드 없이 처리할 수 있습니다.
+    """
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+        self.sessions = {}  # channel_id -> RecordingSession
+        self.loop = None
+
+    def get(self, channel_id):
+        return self.sessions.get(channel_id)
+
+    def is_running(self, channel_id):
+        session = self.sessions.get(channel_id)
+        return session is not None and session.isRunning()
+
+    def start(self, channel):
+        """채널의 녹화 세션을 만들어 이벤트 루프에서 시작합니다. 루프 스레드에서 호출해야 합니다."""
+        self.loop = asyncio.get_event_loop()
+        session = RecordingSession(channel, self.recorder, self)
+        self.sessions[channel["id"]] = session
+        session.task = self.loop.create_task(self._run_session(session))
+        return session
+
+    async def _run_session(self, session):
+        try:
+            await session.run()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"{session.channel['name']} 녹화 세션에서 예외 발생: {e}")
+
+    def discard(self, channel_id):
+        self.sessions.pop(channel_id, None)
+
+    async def shutdown(self, timeout=10):
+        """모든 녹화를 중지하고 세션이 끝날 때까지 기다립니다."""
+        sessions = list(self.sessions.values())
+        for session in sessions:
+            session.stop(force_stop=True)
+        tasks = [session.task for session in sessions if session.task is not None]
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+        self.sessions.clear()
@@ -0,0 +1,155 @@
+import os
+import subprocess
+import threading
+import time
+
+from copy_streams import (
+    CREATE_NEW_CONSOLE,
+    build_post_processing_command,
+    finish_post_processing,
+    get_post_processing_startupinfo,
+)
+
+READ_SIZE = 1024 * 1024  # 녹화 파일에서 한 번에 읽어 ffmpeg에 넘길 크기
+POLL_INTERVAL = 1.0  # 녹화 파일에 새 데이터가 없을 때 다시 확인하는 간격 (초)
+
+
+class PipelinedRemux:
+    """
+    녹화 중에 후처리를 진행하는 파이프라인입니다 (pipelinedPostProcessing).
+    후처리 ffmpeg 하나를 녹화 시작과 함께 실행하고, 녹화 파일에 기록된 부분을 따라 읽으며 표준 입력으로 넘깁니다.
+    내장 녹화기의 분할 파일은 끝난 순서대로 이어서 넘기므로 결과는 하나의 파일로 합쳐집니다.
+    방송이 끝나면 남은 부분만 넘기고 ffmpeg가 파일을 마무리하면 되므로, 종료 후 대기 시간이 몇 초로 줄어듭니다.
+    """
+
+    def __init__(self, channel_id, input_path, output_path, config):
+        self.channel_id = channel_id
+        self.output_path = os.path.normpath(output_path)
+        self.config = config
+        self.input_paths = [os.path.normpath(input_path)]  # 순서대로 넘길 녹화 파일 목록
+        self.bytes_fed = 0
+        self.process = None
+        self.error = None
+        self._index = 0  # 지금 넘기고 있는 파일 위치
+        self._closed = False  # True면 마지막 파일도 더 이상 커지지 않음 (녹화 종료)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def start(self):
+        cmd = build_post_processing_command("pipe:0", self.output_path, self.config)
+        print(f"[DEBUG] 녹화 중 후처리 명령어 실행: {' '.join(cmd)}")
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            startupinfo=get_post_processing_startupinfo(self.config.get("minimizePostProcessing", False)),
+            creationflags=CREATE_NEW_CONSOLE,
+        )
+        self._thread = threading.Thread(target=self._feed, name=f"Remux-{self.channel_id}", daemon=True)
+        self._thread.start()
+
+    def next_file(self, path):
+        """지금 파일이 끝났고 path에 이어서 녹화된다는 것을 알립니다 (분할 녹화)."""
+        with self._lock:
+            self.input_paths.append(os.path.normpath(path))
+        self._wakeup.set()
+
+    def finish(self):
+        """
+        (블로킹) 녹화가 끝난 뒤 호출합니다. 남은 데이터를 모두 넘기고 ffmpeg가 끝날 때까지 기다린 후
+        원본 삭제/이름 변경을 하고 최종 출력 경로를 반환합니다.
+        ffmpeg가 실패하면 만들다 만 출력 파일을 지우고 None을 반환합니다 (원본은 그대로 두므로 다시 후처리할 수 있음).
+        """
+        started = time.monotonic()
+        with self._lock:
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        returncode = self.process.wait()
+        if self.error is not None or returncode != 0 or not os.path.exists(self.output_path):
+            print(
+                f"{self.output_path} 녹화 중 후처리 실패 (종료 코드 {returncode}, 오류 {self.error}). "
+                f"원본 파일은 그대로 유지됩니다."
+            )
+            self._remove_output()
+            return None
+        print(
+            f"{len(self.input_paths)}개 녹화 파일을 {self.output_path}로 후처리 완료 "
+            f"({self.bytes_fed / 1048576:.1f}MB, 방송 종료 후 {time.monotonic() - started:.1f}초)"
+        )
+        try:
+            return finish_post_processing(
+                self.input_paths,
+                self.output_path,
+                self.config.get("deleteAfterPostProcessing", False),
+                self.config.get("removeFixedPrefix", False),
+            )
+        except Exception as e:
+            print(f"{self.output_path} 후처리 마무리 중 오류 발생: {e}")
+            return self.output_path
+
+    def abort(self):
+        """녹화를 시작하지 못한 경우 등: ffmpeg를 종료하고 출력 파일은 남기지 않습니다."""
+        with self._lock:
+            self._closed = True
+        self._wakeup.set()
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._remove_output()
+
+    def _remove_output(self):
+        try:
+            os.remove(self.output_path)
+        except OSError:
+            pass
+
+    def _is_complete(self, index):
+        with self._lock:
+            return index < len(self.input_paths) - 1 or self._closed
+
+    def _feed(self):
+        stdin = self.process.stdin
+        try:
+            while True:
+                with self._lock:
+                    if self._index >= len(self.input_paths):
+                        break
+                    path = self.input_paths[self._index]
+                self._feed_file(path, stdin)
+                with self._lock:
+                    self._index += 1
+        except OSError as e:  # ffmpeg가 먼저 종료된 경우 (BrokenPipeError 포함)
+            self.error = e
+        finally:
+            try:
+                stdin.close()
+            except OSError:
+                pass
+
+    def _feed_file(self, path, stdin):
+        """파일이 끝날 때까지(녹화 종료 또는 다음 분할 파일 시작) 기록된 부분을 따라 읽으며 넘깁니다."""
+        index = self._index
+        while not os.path.exists(path):  # streamlink가 아직 파일을 만들지 않은 경우
+            if self._is_complete(index):
+                return
+            self._wakeup.wait(POLL_INTERVAL)
+            self._wakeup.clear()
+        with open(path, "rb") as f:
+            while True:
+                data = f.read(READ_SIZE)
+                if data:
+                    stdin.write(data)
+                    self.bytes_fed += len(data)
+                    continue
+                if self._is_complete(index):
+                    # 완료 표시 직전에 기록된 데이터까지 마저 넘김
+                    data = f.read()
+                    if not data:
+                        return
+                    stdin.write(data)
+                    self.bytes_fed += len(data)
+                    continue
+                self._wakeup.wait(POLL_INTERVAL)
+                self._wakeup.clear()
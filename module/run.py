@@ -1,17 +1,21 @@
 import argparse
 import asyncio
-import logging
 import json
 import time
 import api
 import os
 import hashlib
 import re
+import queue
+import signal
+import sys
+import threading
 
 from cmd_type import CHZZK_CHAT_CMD  # module.cmd_type -> cmd_type
 from colorama import Fore, Style, init
 from datetime import datetime, timezone
 from path_config import COOKIE_PATH  # COOKIE_PATH 임포트
+from chat_log_sink import BufferedLogSink, DEFAULT_FLUSH_BYTES, DEFAULT_FLUSH_INTERVAL
 import traceback
 from websocket import WebSocket  # WebSocket 추가
 
@@ -21,35 +25,12 @@ init()
 # 현재 디렉토리 경로 얻기 (run.py 파일 위치)
 current_directory = os.path.dirname(os.path.realpath(__file__))
 
-# 로거 설정 함수
-def get_logger(streamer, log_path):
-    #print(f"get_logger called with log_path: {log_path}")  # log_path 값 확인, 디버깅용 print 제거
-    if log_path is None:
-        print("[get_logger] 오류: log_path가 None입니다.")
-        return None
-
-    logger = logging.getLogger(streamer)
-    logger.setLevel(logging.INFO)
-
-    if not logger.hasHandlers():
-        file_formatter = logging.Formatter("%(message)s") # 수정: 메시지만
-        file_handler = logging.FileHandler(log_path, encoding="utf-8")
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
-
-    print(f"[get_logger] 로거 생성됨: {logger}, 핸들러: {logger.handlers}")
-    return logger
-
 def get_cookies():
-    """Load cookies from file."""
-    try:
-        with open(COOKIE_PATH, "r", encoding="utf-8") as f:
-            cookies = json.load(f)
-            return cookies
-    except Exception as e:
-        print(f"오류: 쿠키 로드 실패: {e}")
-        traceback.print_exc()
-        return None
+    """Load cookies from the shared cookie store."""
+    cookies = api.load_cookies()
+    if cookies is None:
+        print(f"오류: 쿠키 로드 실패: {COOKIE_PATH}")
+    return cookies
 
 # 사용자별 색상 생성 함수
 def get_color_for_user(user_id):
@@ -59,12 +40,256 @@ def get_color_for_user(user_id):
     return f"\033[38;2;{';'.join(map(str, colors))}m"
 
 
+CHAT_SERVER_URL = "wss://kr-ss1.chat.naver.com/chat"
+PONG_MESSAGE = json.dumps({"ver": 2, "cmd": CHZZK_CHAT_CMD["pong"]})
+CHAT_QUEUE_SIZE = 1000  # 수신과 기록 사이 큐에 쌓아 둘 수 있는 최대 프레임 수
+METRICS_INTERVAL = 60  # 파이프라인 지표 출력 간격 (초)
+CHANNEL_ID_REFRESH_INTERVAL = 60  # 채팅 채널 ID 변경 확인 간격 (초)
+
+
+class ChatPipelineMetrics:
+    """
+    채팅 수신 → 기록 파이프라인의 백프레셔 지표입니다.
+    큐가 가득 차 수신이 기다린 횟수/시간, 큐 최대 깊이, 기록 지연(msgTime 기준)을 집계합니다.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.frames_received = 0  # 큐에 넣은 채팅 프레임 수
+        self.messages_written = 0  # 로그에 기록한 메시지 수
+        self.queue_high_water = 0  # 큐 최대 깊이
+        self.blocked_puts = 0  # 큐가 가득 차서 수신이 대기한 횟수
+        self.blocked_seconds = 0.0  # 수신이 대기한 총 시간 (초)
+        self.last_lag = 0.0  # 마지막으로 기록한 메시지의 지연 (초)
+        self._lock = threading.Lock()
+        self._reported_at = time.monotonic()
+
+    def on_enqueue(self, depth, blocked_seconds=None):
+        with self._lock:
+            self.frames_received += 1
+            self.queue_high_water = max(self.queue_high_water, depth)
+            if blocked_seconds is not None:
+                self.blocked_puts += 1
+                self.blocked_seconds += blocked_seconds
+
+    def on_written(self, msg_time_ms):
+        with self._lock:
+            self.messages_written += 1
+            if msg_time_ms:
+                self.last_lag = max(0.0, time.time() - msg_time_ms / 1000)
+
+    def summary(self, depth):
+        with self._lock:
+            return (
+                f"수신 {self.frames_received}프레임, 기록 {self.messages_written}건, "
+                f"큐 {depth}/{self.maxsize} (최대 {self.queue_high_water}), "
+                f"대기 {self.blocked_puts}회 ({self.blocked_seconds:.1f}초), "
+                f"지연 {self.last_lag:.1f}초"
+            )
+
+    def should_report(self, interval=METRICS_INTERVAL):
+        now = time.monotonic()
+        if now - self._reported_at < interval:
+            return False
+        self._reported_at = now
+        return True
+
+
+# 채팅 서버 접속(connect) 메시지 생성 함수
+def build_connect_message(chatChannelId, userIdHash, accessToken):
+    default_dict = {  # 기본 딕셔너리
+        "ver": "2",
+        "svcid": "game",
+        "cid": chatChannelId,
+    }
+    send_dict = {
+        "cmd": CHZZK_CHAT_CMD["connect"],
+        "tid": 1,
+        "bdy": {
+            "uid": userIdHash,
+            "devType": 2001,
+            "accTkn": accessToken,
+            "auth": "SEND",
+        },
+    }
+    return json.dumps(dict(send_dict, **default_dict))
+
+
+# 최근 채팅 요청(recent_chat) 메시지 생성 함수
+def build_recent_chat_message(chatChannelId, sid):
+    default_dict = {
+        "ver": "2",
+        "svcid": "game",
+        "cid": chatChannelId,
+    }
+    send_dict = {
+        "cmd": CHZZK_CHAT_CMD["request_recent_chat"],
+        "tid": 2,
+        "sid": sid,
+        "bdy": {
+            "recentMessageCount": 50
+        },
+    }
+    return json.dumps(dict(send_dict, **default_dict))
+
+
+# 채팅/후원 메시지 하나를 (콘솔 출력용, 로그 파일용) 문자열로 변환하는 함수
+# 출력할 메시지가 없으면 None 반환 (프로세스 모드와 채팅 엔진 모드에서 함께 사용)
+def format_chat_message(chat_cmd, chat_data):
+    if chat_data["uid"] == "anonymous":
+        nickname = "익명의 후원자"
+        uid = "anonymous"
+    else:
+        try:
+            profile_data = json.loads(chat_data["profile"])
+            nickname = profile_data["nickname"]
+            uid = chat_data.get("uid", "unknown")
+        except (json.JSONDecodeError, KeyError) as e:
+            print(f"프로필 파싱 오류: {e}")
+            nickname = "Unknown"
+            uid = "Unknown"
+        if "msg" not in chat_data:
+            return None
+
+    time_ms = chat_data['msgTime']  # 밀리초
+    chat_time = datetime.fromtimestamp(time_ms / 1000)  # datetime 객체로 변환
+    formatted_time = chat_time.strftime("%H:%M:%S") # 시간:분:초
+
+    user_color = get_color_for_user(uid)
+
+    # 후원 메시지 처리 (extras 필드 파싱)
+    if chat_cmd == CHZZK_CHAT_CMD["donation"]:
+        try:
+            extras = json.loads(chat_data["extras"])
+            amount = extras.get("amount", 0)  # 후원 금액 (없으면 0)
+            currency = extras.get("currency", "KRW")  # 통화 (없으면 KRW)
+
+            # 후원 메시지 형식 변경
+            console_message = (
+                f"{Fore.WHITE}[{formatted_time}]{Style.RESET_ALL}"
+                f"[{Fore.RED}후원{Style.RESET_ALL}] "
+                f"{user_color}{nickname}({uid}){Style.RESET_ALL} : "
+                f"{Fore.WHITE}{chat_data['msg']} "
+                f"({amount} {currency}){Style.RESET_ALL}"
+            )
+            log_message = f"[{formatted_time}][후원] {nickname}({uid}) : {chat_data['msg']} ({amount} {currency})"
+
+        except (json.JSONDecodeError, KeyError) as e:
+            print(f"후원 extras 파싱 오류: {e}")
+            # extras 파싱에 실패한 경우, 기본 후원 메시지 형식 사용
+            console_message = (
+                f"{Fore.WHITE}[{formatted_time}]{Style.RESET_ALL}"
+                f"[{Fore.RED}후원{Style.RESET_ALL}] "
+                f"{user_color}{nickname}({uid}){Style.RESET_ALL} : "
+                f"{Fore.WHITE}{chat_data['msg']}{Style.RESET_ALL}"
+            )
+            log_message = (
+                f"[{formatted_time}][후원] {nickname}({uid}) : {chat_data['msg']}"
+            )
+    else:
+        # 일반 채팅 메시지 처리 (기존 코드)
+        console_message = (
+            f"{Fore.WHITE}[{formatted_time}]{Style.RESET_ALL}"
+            f"[{Fore.YELLOW}채팅{Style.RESET_ALL}] "
+            f"{user_color}{nickname}({uid}){Style.RESET_ALL} : "
+            f"{Fore.WHITE}{chat_data['msg']}{Style.RESET_ALL}"
+        )
+        log_message = f"[{formatted_time}][채팅] {nickname}({uid}) : {chat_data['msg']}"
+
+    return console_message, log_message
+
+
+class ChatChannelIdRefresher:
+    """
+    채팅 채널 ID가 바뀌었는지 백그라운드 스레드에서 주기적으로 확인합니다.
+    수신 루프는 HTTP 요청 없이 changed 이벤트만 확인하고, 바뀐 경우에만 다시 연결합니다.
+    """
+
+    def __init__(self, streamer, interval=CHANNEL_ID_REFRESH_INTERVAL):
+        self.streamer = streamer
+        self.interval = max(1, interval)
+        self.current_id = None  # 현재 연결에 사용 중인 채팅 채널 ID
+        self.latest_id = None  # 마지막으로 조회한 채팅 채널 ID
+        self.changed = threading.Event()
+        self._stop = threading.Event()
+        self.thread = None
+
+    def reset(self, chatChannelId):
+        """새로 연결한 채팅 채널 ID로 기준을 바꾸고 변경 표시를 지웁니다."""
+        self.current_id = chatChannelId
+        self.changed.clear()
+        if self.thread is None or not self.thread.is_alive():
+            self._stop.clear()
+            self.thread = threading.Thread(target=self.run, name="ChatChannelIdRefresher", daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                latest_id = api.fetch_chatChannelId(self.streamer, api.load_cookies())
+            except Exception as e:
+                print(f"채팅 채널 ID 확인 오류: {e}")
+                continue
+            if latest_id:
+                self.latest_id = latest_id
+                if latest_id != self.current_id:
+                    self.changed.set()
+
+    def stop(self):
+        self._stop.set()
+
+
+# 구조화 캡처(NDJSON) 레코드 생성 함수
+# 정규식 파싱 없이 후처리할 수 있도록 원본 msgTime(밀리초), uid, 닉네임, 종류, 후원 금액, 이모지 맵을 그대로 보존
+def build_chat_record(chat_cmd, chat_data):
+    if "msg" not in chat_data:
+        return None
+    if chat_data.get("uid") == "anonymous":
+        uid, nickname = "anonymous", "익명의 후원자"
+    else:
+        uid = chat_data.get("uid", "unknown")
+        try:
+            nickname = json.loads(chat_data["profile"])["nickname"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            nickname = "Unknown"
+
+    try:
+        extras = json.loads(chat_data.get("extras") or "{}") or {}
+    except json.JSONDecodeError:
+        extras = {}
+
+    record = {
+        "t": chat_data.get("msgTime"),  # 밀리초 (epoch)
+        "type": "donation" if chat_cmd == CHZZK_CHAT_CMD["donation"] else "chat",
+        "uid": uid,
+        "nickname": nickname,
+        "msg": chat_data["msg"],
+        "emojis": extras.get("emojis") or {},
+    }
+    if chat_cmd == CHZZK_CHAT_CMD["donation"]:
+        record["amount"] = extras.get("amount", 0)
+        record["currency"] = extras.get("currency", "KRW")
+    return record
+
+
+def encode_chat_record(record):
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+def capture_path_for(log_path):
+    """텍스트 로그 경로에 대응하는 구조화 캡처 파일 경로 (확장자만 .ndjson)"""
+    return os.path.splitext(log_path)[0] + ".ndjson"
+
+
 class ChzzkChat:
-    def __init__(self, streamer, cookies, log_path, logger, retry_interval=30):
+    def __init__(self, streamer, cookies, log_path, sink, retry_interval=30, queue_size=CHAT_QUEUE_SIZE, echo=True,
+                 capture_sink=None, channel_refresh_interval=CHANNEL_ID_REFRESH_INTERVAL):
         print(f"[ChzzkChat.__init__] 호출됨: streamer={streamer}, log_path={log_path}") # 한국어
         self.streamer = streamer
         self.cookies = cookies
-        self.logger = logger
+        self.sink = sink  # BufferedLogSink (배치 기록)
+        self.echo = echo  # True면 콘솔에도 색상 채팅 출력
+        self.capture_sink = capture_sink  # 구조화 캡처(NDJSON) 싱크, 사용하지 않으면 None
         self.log_path = log_path
         self.retry_interval = retry_interval
         self.sid = None
@@ -75,51 +300,38 @@ class ChzzkChat:
             self.chatChannelId, self.cookies
         )
         self.time_shift = 0  # 타임머신 시간 초기화
+        # 수신 스레드(run)는 프레임을 큐에 넣기만 하고, 기록 스레드(write_loop)가 파일/콘솔에 씀
+        self.frame_queue = queue.Queue(maxsize=queue_size)
+        self.metrics = ChatPipelineMetrics(queue_size)
+        self.writer_thread = None
+        self.channel_id_refresher = ChatChannelIdRefresher(streamer, channel_refresh_interval)
+        self.sock = None
+        self.stop_event = threading.Event()  # 종료 요청 (stop)
         # print(f"[ChzzkChat.__init__] chatChannelId={self.chatChannelId}, accessToken={self.accessToken}") # 제거
 
     def connect(self): # 비동기 아님
-        while True:
+        while not self.stop_event.is_set():
             try:
+                # 재연결 시 갱신된 쿠키 반영 (파일이 바뀐 경우에만 다시 읽음)
+                self.cookies = api.load_cookies() or self.cookies
                 self.chatChannelId = api.fetch_chatChannelId(self.streamer, self.cookies)
+                self.channel_id_refresher.reset(self.chatChannelId)
                 self.accessToken, self.extraToken = api.fetch_accessToken(
                     self.chatChannelId, self.cookies
                 )
 
                 sock = WebSocket() # websocket 객체 생성
-                sock.connect("wss://kr-ss1.chat.naver.com/chat")
+                sock.connect(CHAT_SERVER_URL)
                 print(f"[ChzzkChat.connect] 채팅 서버에 연결됨")  # 한국어
 
 
-                default_dict = {  # 기본 딕셔너리
-                    "ver": "2",
-                    "svcid": "game",
-                    "cid": self.chatChannelId,
-                }
                 # connect 메시지 전송
-                send_dict = {
-                    "cmd": CHZZK_CHAT_CMD["connect"],
-                    "tid": 1,
-                    "bdy": {
-                        "uid": self.userIdHash,
-                        "devType": 2001,
-                        "accTkn": self.accessToken,
-                        "auth": "SEND",
-                    },
-                }
-                sock.send(json.dumps(dict(send_dict, **default_dict)))
+                sock.send(build_connect_message(self.chatChannelId, self.userIdHash, self.accessToken))
                 sock_response = json.loads(sock.recv())
                 self.sid = sock_response["bdy"]["sid"]
 
                 # recent_chat 메시지 전송
-                send_dict = {
-                    "cmd": CHZZK_CHAT_CMD["request_recent_chat"],
-                    "tid": 2,
-                    "sid": self.sid,
-                    "bdy": {
-                        "recentMessageCount": 50
-                    },
-                }
-                sock.send(json.dumps(dict(send_dict, **default_dict)))
+                sock.send(build_recent_chat_message(self.chatChannelId, self.sid))
                 sock.recv()
 
                 self.sock = sock  # WebSocket 객체
@@ -132,7 +344,7 @@ class ChzzkChat:
                     f"채팅 서버 연결 오류: {e}, {self.retry_interval}초 후 재시도" # 한국어
                 )
                 print(traceback.format_exc())  # 예외 발생 시 traceback 출력
-                time.sleep(self.retry_interval)
+                self.stop_event.wait(self.retry_interval)
                 continue
 
     def send(self, message: str):
@@ -166,11 +378,74 @@ class ChzzkChat:
         self.sock.send(json.dumps(dict(send_dict, **default_dict)))
 
 
-    def run(self):  # 비동기 아님.
-        while True:  # 무한 루프
+    def enqueue(self, frame):
+        """프레임을 기록 큐에 넣습니다. 큐가 가득 차면 자리가 날 때까지 기다립니다 (백프레셔)."""
+        try:
+            self.frame_queue.put_nowait(frame)
+            self.metrics.on_enqueue(self.frame_queue.qsize())
+        except queue.Full:
+            started = time.monotonic()
+            self.frame_queue.put(frame)
+            self.metrics.on_enqueue(self.frame_queue.qsize(), time.monotonic() - started)
+
+    def start_writer(self):
+        if self.writer_thread is None or not self.writer_thread.is_alive():
+            self.writer_thread = threading.Thread(target=self.write_loop, name="ChatWriter", daemon=True)
+            self.writer_thread.start()
+
+    def write_loop(self):
+        """기록 스레드: 큐에서 프레임을 꺼내 로그 파일과 콘솔에 씁니다. None을 받으면 종료합니다."""
+        while True:
             try:
-                raw_message = self.sock.recv()  # 메시지 받기
+                frame = self.frame_queue.get(timeout=self.sink.flush_interval or None)
+            except queue.Empty:
+                self.flush_if_due()
+                continue
+            if frame is None:
+                break
+            chat_cmd, chat_list = frame
+            for chat_data in chat_list:
+                try:
+                    formatted = format_chat_message(chat_cmd, chat_data)
+                    if self.capture_sink is not None:
+                        record = build_chat_record(chat_cmd, chat_data)
+                        if record is not None:
+                            self.capture_sink.write(encode_chat_record(record))
+                except Exception as e:
+                    print(f"채팅 처리 오류: {e}")
+                    print(traceback.format_exc())
+                    continue
+                if formatted is None:
+                    continue
+                console_message, log_message = formatted
+
+                try:
+                    self.sink.write(log_message)
+                except Exception as e:
+                    print(f"run.py에서 파일 쓰기 예외 발생: {e}")
+
+                if self.echo:
+                    print(console_message)
+                self.metrics.on_written(chat_data.get("msgTime"))
+
+            self.flush_if_due()
+
+            if self.metrics.should_report():
+                print(f"[ChzzkChat] {self.metrics.summary(self.frame_queue.qsize())}")
+
+    def flush_if_due(self):
+        self.sink.flush_if_due()
+        if self.capture_sink is not None:
+            self.capture_sink.flush_if_due()
+
+    def run(self):  # 비동기 아님. 수신 스레드
+        self.start_writer()
+        while not self.stop_event.is_set():  # stop()이 호출될 때까지
+            try:
+                raw_message = self.sock.recv()  # 메시지 받기 (도착하는 대로 바로 처리)
             except Exception as e:
+                if self.stop_event.is_set():
+                    break
                 print(f"채팅 수신 오류(재연결 시도 중): {e}")
                 self.connect()  # 다시 연결 시도
                 continue
@@ -180,89 +455,68 @@ class ChzzkChat:
                 chat_cmd = raw_message["cmd"]
 
                 if chat_cmd == CHZZK_CHAT_CMD["ping"]:
-                    self.sock.send(json.dumps({"ver": 2, "cmd": CHZZK_CHAT_CMD["pong"]}))
-                    if self.chatChannelId != api.fetch_chatChannelId(
-                        self.streamer, self.cookies
-                    ):
+                    self.sock.send(PONG_MESSAGE)
+                    # 채널 ID 확인은 백그라운드 스레드가 담당, 바뀐 경우에만 다시 연결
+                    if self.channel_id_refresher.changed.is_set():
+                        print("채팅 채널 ID 변경, 다시 연결합니다.")
                         self.connect()  # connect 호출
                     continue
                 if chat_cmd not in (CHZZK_CHAT_CMD["chat"], CHZZK_CHAT_CMD["donation"]):
                     continue
 
-                for chat_data in raw_message["bdy"]:
-                    if chat_data["uid"] == "anonymous":
-                        nickname = "익명의 후원자"
-                        uid = "anonymous"
-                    else:
-                        try:
-                            profile_data = json.loads(chat_data["profile"])
-                            nickname = profile_data["nickname"]
-                            uid = chat_data.get("uid", "unknown")
-                        except (json.JSONDecodeError, KeyError) as e:
-                            print(f"프로필 파싱 오류: {e}")
-                            nickname = "Unknown"
-                            uid = "Unknown"
-                        if "msg" not in chat_data:
-                            continue
-
-                    time_ms = chat_data['msgTime']  # 밀리초
-                    chat_time = datetime.fromtimestamp(time_ms / 1000)  # datetime 객체로 변환
-                    formatted_time = chat_time.strftime("%H:%M:%S") # 시간:분:초
-
-                    user_color = get_color_for_user(uid)
-
-                    # 후원 메시지 처리 (extras 필드 파싱)
-                    if chat_cmd == CHZZK_CHAT_CMD["donation"]:
-                        try:
-                            extras = json.loads(chat_data["extras"])
-                            amount = extras.get("amount", 0)  # 후원 금액 (없으면 0)
-                            currency = extras.get("currency", "KRW")  # 통화 (없으면 KRW)
-
-                            # 후원 메시지 형식 변경
-                            console_message = (
-                                f"{Fore.WHITE}[{formatted_time}]{Style.RESET_ALL}"
-                                f"[{Fore.RED}후원{Style.RESET_ALL}] "
-                                f"{user_color}{nickname}({uid}){Style.RESET_ALL} : "
-                                f"{Fore.WHITE}{chat_data['msg']} "
-                                f"({amount} {currency}){Style.RESET_ALL}"
-                            )
-                            log_message = f"[{formatted_time}][후원] {nickname}({uid}) : {chat_data['msg']} ({amount} {currency})"
-
-                        except (json.JSONDecodeError, KeyError) as e:
-                            print(f"후원 extras 파싱 오류: {e}")
-                            # extras 파싱에 실패한 경우, 기본 후원 메시지 형식 사용
-                            console_message = (
-                                f"{Fore.WHITE}[{formatted_time}]{Style.RESET_ALL}"
-                                f"[{Fore.RED}후원{Style.RESET_ALL}] "
-                                f"{user_color}{nickname}({uid}){Style.RESET_ALL} : "
-                                f"{Fore.WHITE}{chat_data['msg']}{Style.RESET_ALL}"
-                            )
-                            log_message = (
-                                f"[{formatted_time}][후원] {nickname}({uid}) : {chat_data['msg']}"
-                            )
-                    else:
-                        # 일반 채팅 메시지 처리 (기존 코드)
-                        console_message = (
-                            f"{Fore.WHITE}[{formatted_time}]{Style.RESET_ALL}"
-                            f"[{Fore.YELLOW}채팅{Style.RESET_ALL}] "
-                            f"{user_color}{nickname}({uid}){Style.RESET_ALL} : "
-                            f"{Fore.WHITE}{chat_data['msg']}{Style.RESET_ALL}"
-                        )
-                        log_message = f"[{formatted_time}][채팅] {nickname}({uid}) : {chat_data['msg']}"
-
-                    try:
-                        self.logger.info(log_message)
-                    except Exception as e:
-                        print(f"run.py에서 파일 쓰기 예외 발생: {e}")
-
-                    print(console_message)
+                self.enqueue((chat_cmd, raw_message["bdy"]))
 
             except Exception as e:
                 print(f"채팅 처리 오류: {e}")
                 print(traceback.format_exc())
                 self.connect()
 
-            time.sleep(1)  # 1초 대기
+    def stop(self):
+        """
+        수신을 멈추도록 요청합니다 (어느 스레드나 시그널 핸들러에서 호출해도 안전).
+        소켓을 끊어 recv에서 기다리던 run()이 바로 끝나고, 이후 close()가 남은 채팅을 기록합니다.
+        """
+        self.stop_event.set()
+        if self.sock is not None:
+            try:
+                self.sock.abort()
+            except Exception:
+                pass
+
+    def close(self):
+        """기록 스레드에 종료를 알리고 큐에 남은 프레임을 모두 기록할 때까지 기다립니다."""
+        if self.writer_thread is not None and self.writer_thread.is_alive():
+            self.frame_queue.put(None)
+            self.writer_thread.join()
+        self.channel_id_refresher.stop()
+        self.sink.close()  # 남은 버퍼 기록 + fsync
+        if self.capture_sink is not None:
+            self.capture_sink.close()
+        print(f"[ChzzkChat] {self.metrics.summary(self.frame_queue.qsize())}")
+
+
+def install_stop_handlers(chzzkchat, watch_stdin=False):
+    """
+    녹화 프로그램이 채팅 프로세스를 멈출 때도 버퍼에 남은 채팅을 잃지 않도록 종료 요청을 받으면 stop()을 호출합니다.
+    SIGTERM/SIGBREAK(Windows)를 받았을 때와, watch_stdin이면 표준 입력이 닫혔을 때가 종료 요청입니다.
+    Windows의 terminate()는 시그널 없이 프로세스를 끝내므로 녹화 프로그램은 표준 입력을 닫아 종료를 요청합니다.
+    """
+    def on_signal(signum, frame):
+        chzzkchat.stop()  # 시그널 핸들러에서는 출력하지 않음 (print 도중에 호출될 수 있음)
+
+    for name in ("SIGTERM", "SIGBREAK"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), on_signal)
+
+    if watch_stdin:
+        def watch():
+            try:
+                sys.stdin.read()  # 부모 프로세스가 표준 입력을 닫을 때까지 (EOF) 기다림
+            except (OSError, ValueError):
+                pass
+            on_signal(None, None)
+
+        threading.Thread(target=watch, name="ChatStopWatcher", daemon=True).start()
 
 def main():
     parser = argparse.ArgumentParser()
@@ -274,23 +528,54 @@ def main():
         "--retry_interval", type=int, default=30, help="재시도 간격(초)" # 한국어
     )
     parser.add_argument("--time_shift", type=int, default=0, help="타임머신 시간 (초)") # 타임머신 인자 추가
+    parser.add_argument(
+        "--queue_size", type=int, default=CHAT_QUEUE_SIZE, help="수신/기록 사이 큐 크기(프레임)"
+    )
+    parser.add_argument(
+        "--flush_bytes", type=int, default=DEFAULT_FLUSH_BYTES, help="로그 버퍼를 파일에 쓰는 크기(바이트)"
+    )
+    parser.add_argument(
+        "--flush_interval", type=float, default=DEFAULT_FLUSH_INTERVAL, help="로그 버퍼를 파일에 쓰는 간격(초)"
+    )
+    parser.add_argument("--no_echo", action="store_true", help="콘솔에 채팅을 출력하지 않음")
+    parser.add_argument(
+        "--channel_refresh_interval", type=int, default=CHANNEL_ID_REFRESH_INTERVAL,
+        help="채팅 채널 ID 변경 확인 간격(초)",
+    )
+    parser.add_argument(
+        "--capture", action="store_true", help="텍스트 로그와 함께 구조화 캡처(.ndjson)도 저장"
+    )
+    parser.add_argument(
+        "--stop_on_stdin_close", action="store_true",
+        help="표준 입력이 닫히면 남은 채팅을 기록하고 종료 (녹화 프로그램에서 실행할 때)",
+    )
     args = parser.parse_args()
 
+    chzzkchat = None
     try:
         cookies = get_cookies()  # 수정: get_cookies 함수 사용
         if cookies is None:
             print("오류: 쿠키 로드 실패.") # 한국어
             return
 
-        logger = get_logger(args.streamer_id, args.log_path)
-        if logger is None:
-            print("오류: 로거 초기화 실패.")  # 한국어
+        try:
+            sink = BufferedLogSink(args.log_path, args.flush_bytes, args.flush_interval)
+            capture_sink = None
+            if args.capture:
+                capture_sink = BufferedLogSink(
+                    capture_path_for(args.log_path), args.flush_bytes, args.flush_interval
+                )
+        except OSError as e:
+            print(f"오류: 로그 파일 열기 실패: {e}")  # 한국어
             return
 
         chzzkchat = ChzzkChat(
-            args.streamer_id, cookies, args.log_path, logger, args.retry_interval
+            args.streamer_id, cookies, args.log_path, sink, args.retry_interval, args.queue_size,
+            echo=not args.no_echo, capture_sink=capture_sink,
+            channel_refresh_interval=args.channel_refresh_interval,
         )
         chzzkchat.time_shift = args.time_shift  # ChzzkChat 객체에 time_shift 설정
+        install_stop_handlers(chzzkchat, args.stop_on_stdin_close)
 
         # chzzkchat 실행 디렉토리(run.py가 있는 디렉토리)에 time_shift.txt 생성.
         try:
@@ -308,7 +593,12 @@ def main():
         print(f"run.py 실행 중 오류 발생: {e}") # 한국어
         traceback.print_exc()
     finally:  # 추가
-        input("Press Enter to exit...")
+        if chzzkchat is not None:
+            if chzzkchat.stop_event.is_set():
+                print("종료 요청을 받아 남은 채팅을 기록합니다.")  # 한국어
+            chzzkchat.close()  # 큐에 남은 채팅 기록
+        if chzzkchat is None or not chzzkchat.stop_event.is_set():  # 종료 요청을 받았으면 바로 종료
+            input("Press Enter to exit...")
 
     print("채팅 프로그램 종료.") # 한국어
 
@@ -0,0 +1,218 @@
+import argparse
+import asyncio
+import os
+import re
+import time
+
+from api import close_async_client, get_async_client
+from channel_manager import load_config
+from dash_downloader import BandwidthLimiter
+from hls_recorder import close_media_client
+from job_journal import JobJournal
+
+CHANNEL_VIDEOS_API = (
+    "https://api.chzzk.naver.com/service/v1/channels/{channel_id}/videos"
+    "?sortType=LATEST&pagingType=PAGE&page={page}&size={size}"
+)
+PAGE_SIZE = 50
+PROGRESS_INTERVAL = 30  # 작업별 진행 상황 출력 간격 (초)
+
+CHANNEL_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def parse_batch_input(text):
+    """
+    입력 문자열을 (VOD 번호 목록, 채널 ID 목록)으로 나눕니다.
+    쉼표/공백으로 구분하며 VOD 주소(chzzk.naver.com/video/번호)와 채널 주소도 받습니다.
+    """
+    vod_numbers, channel_ids = [], []
+    for token in re.split(r"[\s,]+", text.strip()):
+        token = token.rstrip("/").rsplit("/", 1)[-1]
+        if token.isdigit():
+            vod_numbers.append(token)
+        elif CHANNEL_ID_PATTERN.match(token):
+            channel_ids.append(token)
+        elif token:
+            print(f"[일괄 다운로드] VOD 번호나 채널 ID가 아니어서 건너뜁니다: {token}")
+    return vod_numbers, channel_ids
+
+
+async def fetch_channel_vod_numbers(channel_id):
+    """채널의 다시보기 목록 전체를 최신순으로 읽어 VOD 번호 목록을 반환합니다."""
+    vod_numbers = []
+    page = 0
+    while True:
+        response = await get_async_client().get(
+            CHANNEL_VIDEOS_API.format(channel_id=channel_id, page=page, size=PAGE_SIZE), endpoint="vod_list"
+        )
+        response.raise_for_status()
+        content = response.json().get("content") or {}
+        vod_numbers.extend(str(video["videoNo"]) for video in content.get("data", []) if "videoNo" in video)
+        page += 1
+        if page >= content.get("totalPages", 0):
+            return vod_numbers
+
+
+class VODBatchQueue:
+    """
+    여러 VOD를 작업 큐로 내려받는 일괄 다운로드입니다.
+    동시에 받는 VOD 수(concurrency)와 전체 속도(bandwidth_limit, 바이트/초)를 함께 제한하며,
+    속도 제한은 내장 병렬 다운로더에만 적용되므로 제한이 있으면 ffmpeg로 받아야 하는 VOD는 실패로 처리합니다.
+    저널(JobJournal)에 이미 받은 기록이 있고 파일도 남아 있는 VOD는 건너뜁니다.
+    저널 기록이 없어도 저장 경로에 같은 최종 파일이 있으면 받지 않고 저널에 기록합니다.
+    downloader_factory(quality, savePath, bandwidthLimiter, onProgress)는 VODDownloader를 만듭니다.
+    """
+
+    def __init__(self, downloader_factory, save_path, quality="best", concurrency=2, bandwidth_limit=0, journal=None):
+        self.downloader_factory = downloader_factory
+        self.save_path = save_path
+        self.quality = quality
+        self.concurrency = max(1, int(concurrency))
+        self.bandwidth = BandwidthLimiter(bandwidth_limit) if bandwidth_limit > 0 else None
+        self._owns_journal = journal is None  # 직접 만든 저널만 run()이 끝날 때 닫음
+        self.journal = journal if journal is not None else JobJournal()
+        self.jobs = {}  # VOD 번호 -> 작업 딕셔너리 (입력 순서 유지)
+
+    @classmethod
+    def from_config(cls, downloader_factory, save_path, quality="best", config=None):
+        config = config if config is not None else load_config()
+        return cls(
+            downloader_factory,
+            save_path,
+            quality,
+            concurrency=config.get("vodBatchConcurrency", 2),
+            bandwidth_limit=float(config.get("vodBatchBandwidthLimit", 0)) * 1024 * 1024,
+        )
+
+    def add(self, vod_numbers):
+        """VOD 번호를 큐에 넣고 새로 추가된 수를 반환합니다 (큐에 이미 있는 번호는 무시)."""
+        added = 0
+        for vod_number in vod_numbers:
+            vod_number = str(vod_number)
+            if vod_number in self.jobs:
+                continue
+            self.jobs[vod_number] = {
+                "vod": vod_number,
+                "state": "queued",  # queued / downloading / done / skipped / failed
+                "bytes_done": 0,
+                "size": 0,
+                "path": None,
+                "started": None,
+            }
+            added += 1
+        return added
+
+    async def add_channel(self, channel_id):
+        vod_numbers = await fetch_channel_vod_numbers(channel_id)
+        added = self.add(vod_numbers)
+        print(f"[일괄 다운로드] 채널 {channel_id}: 다시보기 {len(vod_numbers)}개 중 {added}개 추가")
+        return added
+
+    async def run(self):
+        """큐의 모든 VOD를 받고 작업별 상태 목록을 반환합니다."""
+        limit = f"{self.bandwidth.rate / 1048576:.1f}MB/s" if self.bandwidth else "없음"
+        print(f"[일괄 다운로드] VOD {len(self.jobs)}개, 동시 {self.concurrency}개, 속도 제한 {limit}")
+        semaphore = asyncio.Semaphore(self.concurrency)
+        reporter = asyncio.ensure_future(self._report_progress())
+        try:
+            await asyncio.gather(*(self._run_job(job, semaphore) for job in list(self.jobs.values())))
+        finally:
+            reporter.cancel()
+            await asyncio.gather(reporter, return_exceptions=True)
+            await close_async_client()
+            await close_media_client()
+            if self._owns_journal:
+                self.journal.close()
+        self.print_summary()
+        return list(self.jobs.values())
+
+    async def _run_job(self, job, semaphore):
+        existing = self.journal.find_vod(job["vod"], self.quality)
+        if existing and os.path.exists(existing):
+            job["state"] = "skipped"
+            job["path"] = existing
+            print(f"[일괄 다운로드] {job['vod']}: 이미 받은 VOD입니다 ({existing})")
+            return
+        async with semaphore:
+            job["state"] = "downloading"
+            job["started"] = time.monotonic()
+
+            def on_progress(bytes_done, size):
+                job["bytes_done"] = bytes_done
+                job["size"] = size
+
+            downloader = self.downloader_factory(self.quality, self.save_path, self.bandwidth, on_progress)
+            try:
+                path = await downloader.authenticateAndDownload(
+                    job["vod"], self.save_path, self.quality, closeClients=False, skipExisting=True
+                )
+            except Exception as e:
+                print(f"[일괄 다운로드] {job['vod']}: 오류 발생: {e}")
+                path = None
+        if path and os.path.exists(path):
+            job["state"] = "skipped" if getattr(downloader, "skippedExisting", False) else "done"
+            job["path"] = path
+            self.journal.vod_downloaded(job["vod"], self.quality, path)
+        else:
+            job["state"] = "failed"
+        result = {"done": "완료", "skipped": "이미 받은 VOD"}.get(job["state"], "실패")
+        print(f"[일괄 다운로드] {job['vod']}: {result} ({self._count_done()}/{len(self.jobs)})")
+
+    def _count_done(self):
+        return sum(1 for job in self.jobs.values() if job["state"] in ("done", "skipped", "failed"))
+
+    async def _report_progress(self):
+        while True:
+            await asyncio.sleep(PROGRESS_INTERVAL)
+            for job in self.jobs.values():
+                if job["state"] != "downloading" or not job["size"]:
+                    continue
+                elapsed = max(time.monotonic() - job["started"], 0.001)
+                print(
+                    f"[일괄 다운로드] {job['vod']}: {job['bytes_done'] / job['size'] * 100:.1f}% "
+                    f"({job['bytes_done'] / 1048576:.0f}/{job['size'] / 1048576:.0f}MB, "
+                    f"{job['bytes_done'] * 8 / elapsed / 1e6:.1f}Mbps)"
+                )
+
+    def print_summary(self):
+        states = {}
+        for job in self.jobs.values():
+            states.setdefault(job["state"], []).append(job["vod"])
+        print(
+            f"[일괄 다운로드] 완료 {len(states.get('done', []))}개, 건너뜀 {len(states.get('skipped', []))}개, "
+            f"실패 {len(states.get('failed', []))}개"
+        )
+        if states.get("failed"):
+            print(f"[일괄 다운로드] 실패한 VOD: {', '.join(states['failed'])}")
+
+
+async def run_batch(downloader_factory, text, save_path, quality="best"):
+    """입력 문자열(VOD 번호/채널 ID 목록)의 VOD를 모두 받습니다."""
+    vod_numbers, channel_ids = parse_batch_input(text)
+    queue = VODBatchQueue.from_config(downloader_factory, save_path, quality)
+    queue.add(vod_numbers)
+    for channel_id in channel_ids:
+        try:
+            await queue.add_channel(channel_id)
+        except Exception as e:
+            print(f"[일괄 다운로드] 채널 {channel_id}의 다시보기 목록을 가져오지 못했습니다: {e}")
+    return await queue.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="치지직 VOD 일괄 다운로드")
+    parser.add_argument("targets", nargs="+", help="VOD 번호 또는 채널 ID (채널의 다시보기 전체)")
+    parser.add_argument("-o", "--output", required=True, help="저장 폴더")
+    parser.add_argument("-q", "--quality", default="best", help="화질 (best, 1080p, 720p)")
+    args = parser.parse_args()
+
+    from VOD_downloader import VODDownloader  # PyQt5를 불러오므로 명령행 실행 때만 import
+
+    def factory(quality, save_path, bandwidth, on_progress):
+        return VODDownloader(quality, save_path, bandwidthLimiter=bandwidth, onProgress=on_progress)
+
+    asyncio.run(run_batch(factory, " ".join(args.targets), args.output, args.quality))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import asyncio
+import os
+import signal
+import sys
+
+# 'module' 디렉토리를 sys.path에 추가 (PyQt5 없이 녹화 모듈만 사용)
+current_dir = os.path.dirname(os.path.realpath(__file__))
+module_path = os.path.join(current_dir, "module")
+sys.path.append(module_path)
+
+from channel_manager import load_channels
+from rate_limiter import get_rate_limiter
+from recorder_core import RecorderCore
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="GUI 없이 채널 방송을 감시하고 자동으로 녹화하는 헤드리스 데몬"
+    )
+    parser.add_argument(
+        "--channels", nargs="*", default=None,
+        help="녹화할 채널 ID 목록 (지정하지 않으면 record_enabled가 켜진 채널)",
+    )
+    parser.add_argument(
+        "--record-all", action="store_true", help="record_enabled 설정과 관계없이 모든 채널 녹화"
+    )
+    parser.add_argument(
+        "--chat-mode", choices=["engine", "process", "off"], default="engine",
+        help="채팅 수집 방식 (기본값 engine: 콘솔 창 없이 한 프로세스에서 수집)",
+    )
+    parser.add_argument(
+        "--stats-interval", type=int, default=0,
+        help="채널별 방송 확인 요청 통계를 출력할 간격 (초, 0이면 출력하지 않음)",
+    )
+    return parser.parse_args()
+
+
+def print_channel_stats(recorder):
+    for channel_id, stats in recorder.get_channel_stats().items():
+        print(
+            f"[데몬] {recorder.findChannelNameById(channel_id)}: 조회 {stats['polls']}회 "
+            f"(실패 {stats['failures']}회), HTTP 요청 {stats['requests']}회, 주기 {stats['interval']}초"
+        )
+        capture = stats.get("capture")
+        if capture:
+            print(
+                f"[데몬]   수집 {capture['throughput'] * 8 / 1e6:.1f}Mbps, 지연 {capture['last_lag']}초 "
+                f"(최대 {capture['max_lag']}초), 라이브 끝보다 {capture['behind']}개 뒤, 누락 {capture['segments_missed']}개"
+            )
+    queue = recorder.postprocess_queue.get_stats()
+    print(
+        f"[데몬] 후처리 큐: 대기 {queue['queued']}개, 실행 중 {queue['running']}개, 실패 {queue['failed']}개 "
+        f"(최대 {queue['workers']}개, 스트림 복사 {queue['limits']['remux']}개, 인코딩 {queue['limits']['encode']}개)"
+    )
+    for host, stats in get_rate_limiter().get_stats().items():
+        print(
+            f"[데몬] {host}: 요청 {stats['acquired']}회, 대기 {stats['waited']}초, 요청 제한 응답 {stats['throttled']}회"
+        )
+
+
+async def report_stats(recorder, interval):
+    while True:
+        await asyncio.sleep(interval)
+        print_channel_stats(recorder)
+
+
+async def run_daemon(args):
+    channels = load_channels()
+    if not channels:
+        print("등록된 채널이 없습니다. json/channels.json을 확인해 주세요.")
+        return
+
+    # 녹화 대상 채널 선택 (설정 파일은 바꾸지 않고 메모리에서만 적용)
+    for channel in channels:
+        if args.record_all:
+            channel["record_enabled"] = True
+        elif args.channels is not None:
+            channel["record_enabled"] = channel["id"] in args.channels
+
+    recorder = RecorderCore(channels)
+    recorder.reload_channels = False  # 명령행에서 고른 녹화 대상 유지
+    recorder.config["auto_record_mode"] = True  # 데몬은 항상 자동 녹화 모드
+    recorder.config["showMessageBox"] = False
+    recorder.config["chatMode"] = args.chat_mode
+    recorder.recording_started.connect(
+        lambda channel_id: print(f"[데몬] 녹화 시작: {recorder.findChannelNameById(channel_id)}")
+    )
+    recorder.recording_finished.connect(
+        lambda channel_name: print(f"[데몬] 녹화 종료: {channel_name}")
+    )
+
+    loop = asyncio.get_running_loop()
+    stop_event = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:  # Windows
+            signal.signal(sig, lambda *_: loop.call_soon_threadsafe(stop_event.set))
+
+    targets = [channel["name"] for channel in channels if channel.get("record_enabled")]
+    print(f"[데몬] {len(channels)}개 채널 감시 시작, 녹화 대상: {', '.join(targets) or '없음'}")
+    recorder.start_live_poller()
+    stats_task = None
+    if args.stats_interval > 0:
+        stats_task = asyncio.ensure_future(report_stats(recorder, args.stats_interval))
+
+    await stop_event.wait()
+
+    if stats_task is not None:
+        stats_task.cancel()
+    print_channel_stats(recorder)
+
+    print("[데몬] 종료 중...")
+    await recorder.supervisor.shutdown()  # 모든 녹화 프로세스 종료 후 세션이 끝날 때까지 대기
+    await recorder.close_client()
+    print("[데몬] 종료되었습니다.")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_daemon(parse_args()))
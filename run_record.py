@@ -19,6 +19,8 @@ def install_missing_modules():
         "requests",
         "PyQt5",
         "httpx",
+        "h2",  # httpx HTTP/2 지원
+        "websockets",  # 채팅 엔진 (chatMode="engine")
         "qasync",
         "pyperclip",
         "selenium",
@@ -111,6 +113,7 @@ from module.api import (
     get_headers,
 )
 from module.Live_recorder import LiveRecorder
+from api import get_async_client  # recorder_core와 같은 공유 클라이언트 (요청 우선순위/리미터 적용), module 경로로 임포트
 from module.settings_window import SettingsWindow
 from module.channel_manager import load_channels, save_channels, load_config, save_config
 
@@ -460,6 +463,7 @@ class RunRecordApp(QMainWindow):
     async def close_async_client(self):
         if self.client and not self.client.is_closed:
             await self.client.aclose()
+        await self.liveRecorder.close_client()  # 중앙 폴러 종료
 
     @pyqtSlot(str)
     def on_recording_started(self, channel_id):
@@ -812,6 +816,7 @@ class RunRecordApp(QMainWindow):
 
     async def update_thumbnail(self, thumbnail_url, label, live_status):
         thumbnail_url = thumbnail_url.replace("{type}", "270")
+        # 썸네일은 API가 아닌 이미지 CDN에서 받으므로 API 요청 리미터를 거치지 않음
         response = await self.client.get(thumbnail_url)
         if response.status_code == 200:
             pixmap = QPixmap()
@@ -887,7 +892,7 @@ class RunRecordApp(QMainWindow):
     async def load_metadata_and_update_ui(self, client):
         for channel in self.channels:
             try:
-                metadata = await self.liveRecorder.get_live_metadata(channel, client)
+                metadata = await self.liveRecorder.get_live_metadata(channel, get_async_client())
                 await self.update_channel_widget(channel["id"], metadata, client)
             except Exception as e:
                 print(
@@ -910,7 +915,7 @@ class RunRecordApp(QMainWindow):
     @asyncSlot()
     async def update_widget_later(self, channel):
         print(f"{channel['name']} 채널의 메타데이터를 업데이트 중입니다")
-        metadata = await self.liveRecorder.get_live_metadata(channel, self.client)
+        metadata = await self.liveRecorder.get_live_metadata(channel, get_async_client())
         if metadata is not None:
             print(f"{channel['name']} 채널의 메타데이터를 가져왔습니다: {metadata}")
             await self.update_channel_widget(channel["id"], metadata, self.client)
@@ -919,7 +924,7 @@ class RunRecordApp(QMainWindow):
 
     @qasync.asyncSlot()
     async def fetchAndSetMetadataForChannel(self, channel):
-        metadata = await self.liveRecorder.get_live_metadata(channel, self.client)
+        metadata = await self.liveRecorder.get_live_metadata(channel, get_async_client())
         await self.update_channel_widget(channel["id"], metadata, self.client)
 
     def set_thumbnail_from_reply(self, reply, label):
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 모듈은 module/ 폴더 기준으로 평면 import (run_record.py, record_daemon.py와 같은 방식)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "module"))
@@ -0,0 +1,53 @@
+from container_probe import TS_PACKET_SIZE, probe_container
+
+PMT_PID = 0x100
+VIDEO_PID = 0x101
+AUDIO_PID = 0x102
+
+
+def ts_packet(pid, payload):
+    header = bytes([0x47, 0x40 | (pid >> 8), pid & 0xFF, 0x10])  # payload_unit_start, 페이로드만
+    return (header + payload).ljust(TS_PACKET_SIZE, b"\xff")
+
+
+def pat_packet():
+    section = bytes([0x00, 0xB0, 13, 0x00, 0x01, 0xC1, 0x00, 0x00, 0x00, 0x01, 0xE0 | (PMT_PID >> 8), PMT_PID & 0xFF])
+    return ts_packet(0, b"\x00" + section + b"\x00" * 4)  # pointer_field, CRC 자리
+
+
+def pmt_packet():
+    streams = bytes([0x1B, 0xE0 | (VIDEO_PID >> 8), VIDEO_PID & 0xFF, 0xF0, 0x00,
+                     0x0F, 0xE0 | (AUDIO_PID >> 8), AUDIO_PID & 0xFF, 0xF0, 0x00])
+    section = bytes([0x02, 0xB0, 9 + len(streams) + 4, 0x00, 0x01, 0xC1, 0x00, 0x00,
+                     0xE0 | (VIDEO_PID >> 8), VIDEO_PID & 0xFF, 0xF0, 0x00]) + streams
+    return ts_packet(PMT_PID, b"\x00" + section + b"\x00" * 4)
+
+
+def pes_packet(pts):
+    pts_bytes = bytes([
+        0x21 | ((pts >> 29) & 0x0E), (pts >> 22) & 0xFF, ((pts >> 14) & 0xFE) | 1,
+        (pts >> 7) & 0xFF, ((pts << 1) & 0xFE) | 1,
+    ])
+    return ts_packet(VIDEO_PID, bytes([0x00, 0x00, 0x01, 0xE0, 0x00, 0x00, 0x80, 0x80, 0x05]) + pts_bytes)
+
+
+def write_ts(tmp_path, packets):
+    path = tmp_path / "part0.ts"
+    path.write_bytes(b"".join(packets))
+    return str(path)
+
+
+def test_probe_ts_reads_headers(tmp_path):
+    path = write_ts(tmp_path, [pat_packet(), pmt_packet()] + [pes_packet(i * 3000) for i in range(10)])
+    info = probe_container(path)
+    assert info["format"] == "mpegts"
+    assert info["video_codec"] == "h264" and info["audio_codec"] == "aac"
+    assert info["video_frames"] == 10
+    assert abs(info["duration"] - 0.3) < 1e-6
+
+
+def test_probe_truncated_ts_falls_back(tmp_path):
+    # PAT만 남고 잘린 파일: PMT가 없음
+    assert probe_container(write_ts(tmp_path, [pat_packet(), pat_packet()[:100]])) is None
+    # PMT까지는 있지만 영상 PES(PTS)가 없음
+    assert probe_container(write_ts(tmp_path, [pat_packet(), pmt_packet()])) is None
@@ -0,0 +1,18 @@
+import asyncio
+import time
+
+from dash_downloader import BandwidthLimiter
+
+
+def test_bandwidth_limiter_waits_outside_lock():
+    async def run():
+        limiter = BandwidthLimiter(1000)
+        started = time.monotonic()
+        first = asyncio.ensure_future(limiter.consume(1200))  # 0.2초 기다림
+        await asyncio.sleep(0.05)
+        assert not limiter._lock.locked()  # 기다리는 동안 다른 다운로드가 예산을 계산할 수 있음
+        await asyncio.gather(first, limiter.consume(100))  # 먼저 차감한 요청 뒤에서 0.3초까지 기다림
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(run())
+    assert 0.25 <= elapsed < 1.0
@@ -0,0 +1,89 @@
+import asyncio
+
+import httpx
+
+import hls_recorder
+from hls_recorder import HlsRecorder, parse_media_playlist
+
+
+class ShortWriteFile:
+    """한 번에 최대 3바이트만 기록하는 파일 (버퍼 없는 파일의 short write)"""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, data):
+        chunk = bytes(data[:3])
+        self.data.extend(chunk)
+        return len(chunk)
+
+
+def test_write_retries_short_writes():
+    recorder = object.__new__(HlsRecorder)
+    recorder._file = ShortWriteFile()
+    payload = bytes(range(256)) * 4
+    asyncio.run(recorder._write(payload))
+    assert bytes(recorder._file.data) == payload
+
+
+def playlist(first_seq, count, discontinuity=False):
+    lines = ["#EXTM3U", "#EXT-X-TARGETDURATION:2", f"#EXT-X-MEDIA-SEQUENCE:{first_seq}"]
+    if discontinuity:
+        lines.append("#EXT-X-DISCONTINUITY")
+    for seq in range(first_seq, first_seq + count):
+        lines += ["#EXTINF:2.0,", f"{seq}.ts"]
+    return parse_media_playlist("\n".join(lines), "https://cdn.example/live/")["segments"]
+
+
+def make_recorder():
+    return HlsRecorder("abc", "record.ts", live_edge=1)
+
+
+def test_new_segments_follow_sequence_reset():
+    recorder = make_recorder()
+    assert [s["seq"] for s in recorder._new_segments(playlist(100, 3))] == [102]
+    assert [s["seq"] for s in recorder._new_segments(playlist(101, 4))] == [103, 104]
+    # 방송 재시작 후 플레이리스트를 다시 찾으면 시퀀스가 0부터 다시 시작
+    assert [s["seq"] for s in recorder._new_segments(playlist(0, 3))] == [0, 1, 2]
+    assert [s["seq"] for s in recorder._new_segments(playlist(1, 3))] == [3]
+
+
+def test_new_segments_follow_discontinuity_reset():
+    recorder = make_recorder()
+    recorder._new_segments(playlist(100, 3))
+    recorder._new_segments(playlist(120, 3))
+    assert [s["seq"] for s in recorder._new_segments(playlist(110, 2, discontinuity=True))] == [110, 111]
+
+
+def test_new_segments_ignore_stale_playlist():
+    recorder = make_recorder()
+    recorder._new_segments(playlist(100, 3))
+    recorder._new_segments(playlist(102, 3))
+    assert recorder._new_segments(playlist(101, 3)) == []  # 잠깐 이전 플레이리스트를 받은 경우
+    assert recorder.last_seq == 104
+
+
+def test_fetch_segment_backs_off_between_attempts(monkeypatch):
+    calls = []
+    delays = []
+
+    def handler(request):
+        calls.append(request.url)
+        return httpx.Response(503 if len(calls) < 3 else 200, content=b"segment")
+
+    async def fake_sleep(seconds):
+        delays.append(seconds)
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(hls_recorder, "get_media_client", lambda: client)
+        monkeypatch.setattr(hls_recorder.asyncio, "sleep", fake_sleep)
+        recorder = make_recorder()
+        recorder._semaphore = asyncio.Semaphore(1)
+        try:
+            return await recorder._fetch_segment("https://cdn.example/live/1.ts")
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) == b"segment"
+    assert len(calls) == 3 and delays == [1, 2]
@@ -0,0 +1,57 @@
+import subprocess
+import sys
+
+import job_journal
+from job_journal import JobJournal
+
+
+def exited_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_other_live_process_recordings_are_not_recovered(tmp_path):
+    path = str(tmp_path / "journal.db")
+    other = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        daemon = JobJournal(path)
+        daemon.pid = other.pid  # record_daemon.py가 다른 프로세스에서 녹화 중인 상황
+        daemon.recording_started("live", "live.ts")
+        daemon.save_job({"id": "job-live", "state": "running", "channel_id": "live", "path": "live.ts"})
+        gui = JobJournal(path)
+
+        assert gui.take_interrupted_recordings() == []
+        assert gui.load_jobs() == []
+    finally:
+        other.kill()
+        other.wait()
+
+
+def test_exited_process_recordings_are_recovered_once(tmp_path):
+    path = str(tmp_path / "journal.db")
+    crashed = JobJournal(path)
+    crashed.pid = exited_pid()
+    crashed.recording_started("dead", "dead.ts")
+    crashed.save_job({"id": "job-dead", "state": "running", "channel_id": "dead", "path": "dead.ts"})
+    journal = JobJournal(path)
+
+    assert [row["path"] for row in journal.take_interrupted_recordings()] == ["dead.ts"]
+    assert journal.take_interrupted_recordings() == []
+    assert [job["id"] for job in journal.load_jobs()] == ["job-dead"]
+
+
+def test_old_journal_without_owner_is_migrated(tmp_path):
+    path = str(tmp_path / "journal.db")
+    conn = job_journal.sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE recordings (id INTEGER PRIMARY KEY AUTOINCREMENT, channel_id TEXT NOT NULL,"
+        " path TEXT NOT NULL, started REAL NOT NULL, finished REAL, state TEXT NOT NULL)"
+    )
+    conn.execute("INSERT INTO recordings (channel_id, path, started, state) VALUES ('old', 'old.ts', 0, 'recording')")
+    conn.commit()
+    conn.close()
+
+    journal = JobJournal(path)
+
+    assert [row["path"] for row in journal.take_interrupted_recordings()] == ["old.ts"]
@@ -0,0 +1,31 @@
+import asyncio
+
+import live_poller
+from live_poller import LivePoller
+
+
+def test_stop_cancels_in_flight_polls(monkeypatch):
+    monkeypatch.setattr(live_poller, "get_async_client", lambda: None)
+    cancelled = []
+
+    async def fetch_metadata(channel, client):
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.append(channel["id"])
+            raise
+
+    async def scenario():
+        poller = LivePoller(fetch_metadata, interval=60)
+        poller.set_channels([{"id": "a"}, {"id": "b"}])
+        poller.start()
+        await asyncio.sleep(0.05)
+        assert len(poller._poll_tasks) == 2
+        await poller.stop()
+        return poller
+
+    poller = asyncio.run(scenario())
+
+    assert sorted(cancelled) == ["a", "b"]
+    assert not poller._poll_tasks
+    assert not poller._in_flight
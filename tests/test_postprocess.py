@@ -0,0 +1,123 @@
+import asyncio
+import io
+import subprocess
+import sys
+
+import copy_streams
+import recorder_core
+import remux_pipeline
+from job_journal import JobJournal
+from postprocess_queue import PostProcessingQueue
+from recorder_core import RecorderCore
+from remux_pipeline import PipelinedRemux
+
+
+class FailingProcess:
+    returncode = 1
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def wait(self):
+        return self.returncode
+
+    def poll(self):
+        return self.returncode
+
+
+class FailingPipeProcess(FailingProcess):
+    def __init__(self, cmd, **kwargs):
+        self.stdin = io.BytesIO()
+        open(cmd[-1], "wb").close()  # 만들다 만 출력 파일
+
+
+def make_core(tmp_path):
+    # 후처리 큐 작업 실행에 필요한 속성만 준비
+    core = object.__new__(RecorderCore)
+    core.config = {"moveAfterProcessingEnabled": True, "moveAfterProcessing": str(tmp_path / "moved")}
+    core.deleteAfterPostProcessing = False
+    core.journal = JobJournal(str(tmp_path / "journal.db"))
+    core.postprocess_queue = PostProcessingQueue(core.runPostProcessingJob, core.journal, workers=1)
+    return core
+
+
+def test_copy_specific_file_raises_when_ffmpeg_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(copy_streams.subprocess, "Popen", FailingProcess)
+    input_path = tmp_path / "record.ts"
+    input_path.write_bytes(b"\x47" * 188)
+    try:
+        copy_streams.copy_specific_file(str(input_path), str(tmp_path / "fixed_record.mp4"), True, False)
+    except subprocess.CalledProcessError:
+        pass
+    else:
+        raise AssertionError("CalledProcessError가 발생해야 합니다")
+    assert input_path.exists()  # 실패하면 원본은 지우지 않음
+
+
+def test_failed_post_processing_marks_job_failed(tmp_path, monkeypatch):
+    def fail(*args):
+        raise subprocess.CalledProcessError(1, ["ffmpeg"])
+
+    moved = []
+
+    async def move(output_path):
+        moved.append(output_path)
+
+    monkeypatch.setattr(recorder_core, "copy_specific_file", fail)
+    core = make_core(tmp_path)
+    core.moveAfterPostProcessing = move
+    input_path = tmp_path / "record.ts"
+    input_path.write_bytes(b"\x47" * 188)
+    job_id = core.postprocess_queue.submit("abc", str(input_path), str(tmp_path / "fixed_record.mp4"))
+    job = core.postprocess_queue.jobs[job_id]
+
+    asyncio.run(core.postprocess_queue._run(job))
+    core.journal.close()
+
+    assert job["state"] == "failed"
+    assert job.get("stage") != "move" and not moved
+
+
+def test_failed_pipeline_falls_back_to_queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(remux_pipeline.subprocess, "Popen", FailingPipeProcess)
+    core = make_core(tmp_path)
+    core.fixed_file_paths = {}
+    input_path = tmp_path / "record.ts"
+    input_path.write_bytes(b"\x47" * 188)
+    output_path = tmp_path / "fixed_record.ts"
+    pipeline = PipelinedRemux("abc", str(input_path), str(output_path), {})
+    pipeline.start()
+
+    asyncio.run(core.runPostProcessing("abc", str(input_path), pipeline.output_path, core.config, pipeline))
+    core.journal.close()
+
+    assert not output_path.exists()  # 만들다 만 출력은 지움
+    jobs = list(core.postprocess_queue.jobs.values())
+    assert [job["input_path"] for job in jobs] == [str(input_path)]
+    assert jobs[0]["output_path"] == str(output_path)
+
+
+def test_stop_cancels_running_jobs_and_processes(tmp_path):
+    journal = JobJournal(str(tmp_path / "journal.db"))
+    processes = []
+
+    async def run_job(job):
+        process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+        processes.append(process)
+        queue.attach_process(job, process)
+        await asyncio.get_running_loop().run_in_executor(None, process.wait)
+
+    async def run():
+        queue.start(asyncio.get_running_loop())
+        job_id = queue.submit("abc", str(tmp_path / "record.ts"), str(tmp_path / "fixed_record.ts"))
+        while not processes:
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return queue.jobs[job_id]
+
+    queue = PostProcessingQueue(run_job, journal, workers=1)
+    job = asyncio.run(run())
+    assert processes[0].poll() is not None  # ffmpeg 대신 실행한 프로세스도 종료됨
+    assert job["state"] == "queued" and not queue._running
+    assert [saved["id"] for saved in journal.load_jobs(states=("queued",))] == [job["id"]]
+    journal.close()
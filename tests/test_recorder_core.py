@@ -0,0 +1,75 @@
+import asyncio
+import json
+import sys
+
+import httpx
+
+import recorder_core
+from api import AsyncChzzkApiClient
+from metadata_cache import LiveMetadataCache
+from recorder_core import RecorderCore
+
+LIVE_DETAIL = {
+    "content": {
+        "liveTitle": "제목",
+        "status": "OPEN",
+        "channel": {"channelName": "채널"},
+        "livePlaybackJson": json.dumps({
+            "media": [{"encodingTrack": [
+                {"encodingTrackId": "1080p", "videoWidth": 1920, "videoHeight": 1080, "videoFrameRate": "60"},
+            ]}],
+        }),
+    }
+}
+
+
+def handler(request):
+    return httpx.Response(200, json=LIVE_DETAIL)
+
+
+def make_core():
+    # 설정/저널 파일을 만들지 않도록 get_live_metadata에 필요한 속성만 준비
+    core = object.__new__(RecorderCore)
+    core.config = {}
+    core.metadata_cache = LiveMetadataCache()
+    core.api_request_counts = {}
+    core.recording_status = {}
+    core.live_metadata = {}
+    core.default_thumbnail_path = "default.png"
+    return core
+
+
+def fetch(client):
+    async def run():
+        try:
+            return await make_core().get_live_metadata({"id": "abc", "name": "n"}, client, delay=0)
+        finally:
+            await client.aclose()
+    return asyncio.run(run())
+
+
+def test_get_live_metadata_with_httpx_client(monkeypatch):
+    monkeypatch.setattr(recorder_core, "get_cached_headers", lambda: {})
+    metadata = fetch(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    assert metadata is not None
+    assert metadata["open_live"] and metadata["record_quality"] == "1080p"
+
+
+def test_get_live_metadata_with_shared_api_client(monkeypatch):
+    monkeypatch.setattr(recorder_core, "get_cached_headers", lambda: {})
+    client = AsyncChzzkApiClient()
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    metadata = fetch(client)
+    assert metadata is not None
+    assert metadata["live_title"] == "제목" and metadata["frame_rate"] == "60"
+
+
+def test_chat_engine_falls_back_without_websockets(monkeypatch):
+    monkeypatch.setitem(sys.modules, "websockets", None)  # 설치되지 않은 것처럼
+    monkeypatch.delitem(sys.modules, "chat_engine", raising=False)
+    core = make_core()
+    core.config = {"chatMode": "engine"}
+    core.chat_engine = None
+    core.chat_engine_unavailable = False
+    assert core.get_chat_engine() is None  # 채널별 채팅 프로세스로 수집
+    assert core.config["chatMode"] == "engine"  # 설정은 바꾸지 않음
@@ -0,0 +1,83 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+MODULE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "module")
+
+# 채팅 하나를 받은 뒤 종료 요청이 올 때까지 recv에서 기다리는 채팅 프로세스 (네트워크 없이 run.py의 종료 처리만 확인)
+CHAT_SCRIPT = """
+import json
+import sys
+import threading
+
+import run
+from chat_log_sink import BufferedLogSink
+from cmd_type import CHZZK_CHAT_CMD
+
+class FakeSocket:
+    def __init__(self):
+        self.aborted = threading.Event()
+        self.messages = [json.dumps({"cmd": CHZZK_CHAT_CMD["chat"], "bdy": [
+            {"uid": "u1", "profile": json.dumps({"nickname": "닉네임"}), "msg": "마지막 채팅", "msgTime": 0},
+        ]})]
+
+    def recv(self):
+        if self.messages:
+            return self.messages.pop()
+        print("ready", flush=True)
+        self.aborted.wait()
+        raise ConnectionError("aborted")
+
+    def abort(self):
+        self.aborted.set()
+
+chat = object.__new__(run.ChzzkChat)
+chat.sink = BufferedLogSink(sys.argv[1], flush_bytes=1 << 20, flush_interval=60)  # 종료할 때까지 버퍼에만 쌓임
+chat.capture_sink = None
+chat.echo = False
+chat.frame_queue = run.queue.Queue()
+chat.metrics = run.ChatPipelineMetrics(run.CHAT_QUEUE_SIZE)
+chat.writer_thread = None
+chat.channel_id_refresher = run.ChatChannelIdRefresher("streamer")
+chat.stop_event = threading.Event()
+chat.sock = FakeSocket()
+run.install_stop_handlers(chat, watch_stdin=True)
+try:
+    chat.run()
+finally:
+    chat.close()
+"""
+
+
+def start_chat(tmp_path):
+    log_path = tmp_path / "chat.log"
+    env = dict(os.environ, PYTHONPATH=MODULE_DIR)
+    process = subprocess.Popen(
+        [sys.executable, "-c", CHAT_SCRIPT, str(log_path)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env, cwd=MODULE_DIR,
+    )
+    deadline = time.monotonic() + 30
+    while process.stdout.readline().strip() != b"ready":
+        assert time.monotonic() < deadline and process.poll() is None
+    return process, log_path
+
+
+def test_closing_stdin_flushes_buffered_chat(tmp_path):
+    process, log_path = start_chat(tmp_path)
+    assert log_path.read_bytes() == b""  # 아직 버퍼에만 있음
+    process.stdin.close()
+    assert process.wait(timeout=10) == 0
+    assert "마지막 채팅" in log_path.read_text(encoding="utf-8")
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGTERM") or os.name == "nt", reason="POSIX 시그널")
+def test_sigterm_flushes_buffered_chat(tmp_path):
+    process, log_path = start_chat(tmp_path)
+    process.terminate()
+    assert process.wait(timeout=10) == 0
+    process.stdin.close()
+    assert "마지막 채팅" in log_path.read_text(encoding="utf-8")
@@ -0,0 +1,50 @@
+import asyncio
+
+from job_journal import JobJournal
+from vod_batch import VODBatchQueue
+
+
+class ExistingFileDownloader:
+    """저장 경로에 최종 파일이 이미 있는 VOD (skipExisting이면 받지 않음)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.skippedExisting = False
+        self.downloaded = False
+
+    async def authenticateAndDownload(self, vodNumber, savePath, quality="best", closeClients=True, skipExisting=False):
+        if skipExisting:
+            self.skippedExisting = True
+        else:
+            self.downloaded = True
+        return self.path
+
+
+def test_existing_output_without_journal_row_is_skipped(tmp_path):
+    path = tmp_path / "[2024-01-01] channel title 1080p60.mp4"
+    path.write_bytes(b"done")
+    journal = JobJournal(str(tmp_path / "journal.db"))
+    downloaders = []
+
+    def factory(quality, save_path, bandwidth, on_progress):
+        downloaders.append(ExistingFileDownloader(str(path)))
+        return downloaders[-1]
+
+    queue = VODBatchQueue(factory, str(tmp_path), journal=journal)
+    queue.add(["123"])
+    jobs = asyncio.run(queue.run())
+
+    assert jobs[0]["state"] == "skipped"
+    assert not downloaders[0].downloaded
+    assert journal.find_vod("123", "best") == str(path)  # 호출한 쪽이 넘긴 저널은 닫지 않음
+
+
+def test_run_closes_only_its_own_journal(tmp_path, monkeypatch):
+    closed = []
+    monkeypatch.setattr(JobJournal, "close", lambda self: closed.append(self))
+    monkeypatch.setattr("vod_batch.JobJournal", lambda: JobJournal(str(tmp_path / "own.db")))
+
+    queue = VODBatchQueue(None, str(tmp_path))
+    asyncio.run(queue.run())
+
+    assert closed == [queue.journal]
@@ -0,0 +1,36 @@
+import asyncio
+
+import VOD_downloader
+from VOD_downloader import VODDownloader
+
+
+class FakeResponse:
+    def json(self):
+        return {"content": {}}  # VOD 정보 없음 -> 중간에 반환
+
+
+class FakeClient:
+    async def get(self, url, **kwargs):
+        return FakeResponse()
+
+
+def test_clients_closed_when_vod_info_is_missing(monkeypatch):
+    closed = []
+
+    async def close_async_client():
+        closed.append("api")
+
+    async def close_media_client():
+        closed.append("media")
+
+    monkeypatch.setattr(VOD_downloader, "get_async_client", lambda: FakeClient())
+    monkeypatch.setattr(VOD_downloader, "close_async_client", close_async_client)
+    monkeypatch.setattr(VOD_downloader, "close_media_client", close_media_client)
+    downloader = object.__new__(VODDownloader)
+    downloader.getSessionCookies = lambda: {"NID_AUT": "a", "NID_SES": "b"}
+    downloader.getAuthHeaders = lambda cookies: {}
+
+    path = asyncio.run(downloader.authenticateAndDownload("123", "."))
+
+    assert path is None
+    assert closed == ["api", "media"]